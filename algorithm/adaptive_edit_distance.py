@@ -2,52 +2,123 @@ from __future__ import annotations
 
 import logging
 import os
-from typing import Callable, List, Tuple
+from typing import Callable, List, Optional, Tuple
 
 import numpy as np
 
 from algorithm.model.distance_metrics import DistanceMetrics
 from algorithm.model.edit_window import EditWindow
+from algorithm.model.metric_kernels import MetricKernels
+from algorithm.workspace_pool import WorkspacePool
 
 logger = logging.getLogger(os.path.basename(__file__))
 
+PreviousMemo = Tuple[np.array, int]
+
 
 class AdaptiveEditDistance:
+    """
+    With ``cutoff``, cells costing more than the least cost of the last column so far, first row included, are set
+    to infinity, and cells without a live predecessor are skipped altogether. The traceback starts from the least
+    cost of the last column and only moves to cheaper cells, so cells costing more never change it; costs are
+    non-negative, so every cell costing no more than the cap keeps its value. Cells costing more than the least
+    cost of the last column are set to infinity once the memo is complete, so that it does not depend on the fill
+    order. Limits are those of the full memo. Previous memos are not reused under a cutoff.
+
+    The memo is taken from ``workspace`` and stays valid until the next computation using the same workspace.
+    """
+
     def __init__(
         self,
         edit_window: EditWindow,
         metrics: List[Callable],
         scaling_func: Callable,
+        previous: Optional[PreviousMemo] = None,
+        cutoff: bool = False,
+        workspace: Optional[WorkspacePool] = None,
     ) -> None:
         self.edit_window: EditWindow = edit_window
         self.metrics: List[Callable] = metrics
         self.scale: Callable = scaling_func
+        self.previous: Optional[PreviousMemo] = previous
+        self.cutoff: bool = cutoff
+        self.workspace: WorkspacePool = WorkspacePool() if workspace is None else workspace
+        self.reused_rows: int = 0
+        self.skipped_cells: int = 0
         self._memo: np.array = self._compute_memo()
 
+    @property
+    def memo(self) -> np.array:
+        return self._memo
+
+    @staticmethod
+    def converged_rows(memo: np.array, previous: PreviousMemo, row: int) -> bool:
+        """
+        ``previous`` is the memo of an earlier window whose row ``i - shift`` covers the same stream note as row
+        ``i``, and which covers every later row as well. Once two consecutive rows are equal to the shifted
+        previous ones, every later row is too: each row only depends on the two before it.
+        """
+        previous_memo, shift = previous
+        if row - 1 - shift < 0:
+            return False
+        return np.array_equal(memo[row - 1 : row + 1], previous_memo[row - 1 - shift : row + 1 - shift])
+
+    @staticmethod
+    def splice_rows(memo: np.array, previous: PreviousMemo, row: int) -> int:
+        """Copies the rows after ``row`` from the previous memo, returns how many were copied."""
+        previous_memo, shift = previous
+        memo[row + 1 :] = previous_memo[row + 1 - shift : len(memo) - shift]
+        return len(memo) - row - 1
+
+    @staticmethod
+    def prune_memo(memo: np.array) -> None:
+        """Sets the cells costing more than the least cost of the last column to infinity."""
+        memo[memo > np.min(memo[:, -1])] = np.inf
+
+    @staticmethod
+    def _reachable(memo: np.array, i: int, j: int) -> bool:
+        """Whether any cell a metric may read from is under the cutoff cap."""
+        return any(memo[i - di, j - dj] != np.inf for di, dj in MetricKernels.OFFSETS if di <= i and dj <= j)
+
     def _compute_memo(self) -> None:
         S, P = len(self.edit_window.stream_intervals), len(self.edit_window.pattern_intervals)
-        memo: np.array = np.zeros((S + 1, P + 1))
-        for j in range(1, P + 1):
-            memo[0, j] = DistanceMetrics.insertion_without_expansion(
-                memo, self.edit_window, 0, j, self.scale, sentinel=0.0
-            )
+        memo: np.array = self.workspace.buffer("memo", (S + 1, P + 1), fill=0.0)
+        first_row: Optional[np.array] = self.edit_window.first_row
+        memo[0] = DistanceMetrics.insertion_row(self.edit_window, self.scale) if first_row is None else first_row
+        cap: float = memo[0, P] if self.cutoff else np.inf
         for i in range(1, S + 1):
             for j in range(1, P + 1):
+                if self.cutoff and not self._reachable(memo, i, j):
+                    memo[i, j] = np.inf
+                    self.skipped_cells += 1
+                    continue
                 memo[i, j] = min(metric(memo, self.edit_window, i, j, self.scale) for metric in self.metrics)
+                if memo[i, j] > cap:
+                    memo[i, j] = np.inf
+            if self.cutoff:
+                cap = min(cap, memo[i, P])
+            if self.previous is not None and not self.cutoff and self.converged_rows(memo, self.previous, i):
+                self.reused_rows = self.splice_rows(memo, self.previous, i)
+                break
+        if self.cutoff:
+            self.prune_memo(memo)
         return memo
 
     def get_limits(self, pattern_complete=False) -> Tuple[int, float]:
-        S, P = len(self.edit_window.stream_intervals), len(self.edit_window.pattern_intervals)
-        i = S - np.argmin(np.flip(self._memo[:, -1]))
+        return self.trace_limits(self._memo, pattern_complete)
+
+    @staticmethod
+    def trace_limits(memo: np.array, pattern_complete=False) -> Tuple[int, float]:
+        S, P = memo.shape[0] - 1, memo.shape[1] - 1
+        i = S - np.argmin(np.flip(memo[:, -1]))
         j = P
-        logger.debug(f"\n{self._memo}")
         while i > 0 and j > 0:
-            if self._memo[i - 1][j] < self._memo[i][j]:
+            if memo[i - 1][j] < memo[i][j]:
                 i -= 1
-            elif self._memo[i][j - 1] < self._memo[i][j]:
+            elif memo[i][j - 1] < memo[i][j]:
                 if pattern_complete:
                     break
                 j -= 1
             else:
                 break
-        return i, self._memo[i, j] / (i + 1)
+        return i, memo[i, j] / (i + 1)
@@ -0,0 +1,269 @@
+from __future__ import annotations
+
+import logging
+import os
+from typing import TYPE_CHECKING, Callable, List, Optional, Tuple
+
+import numpy as np
+
+from algorithm.adaptive_edit_distance import AdaptiveEditDistance, PreviousMemo
+from algorithm.model.distance_metrics import DistanceMetrics, ScalingFunctions
+from algorithm.model.metric_kernels import MetricKernel, MetricKernels, StackedFeatures
+from algorithm.workspace_pool import WorkspacePool
+
+if TYPE_CHECKING:
+    from algorithm.model.cost_tables import CostTables
+    from algorithm.model.edit_window import EditWindow
+    from algorithm.model.sequence_features import SequenceFeatures
+
+logger = logging.getLogger(os.path.basename(__file__))
+
+Kernels = Tuple[np.array, np.array, np.array]
+
+
+class BatchedEditDistance:
+    """
+    Fills the memos of several edit windows in one stacked (B x S x P) NumPy pass.
+
+    Every recurrence reads from cells at most three anti-diagonals back, so memos are filled one
+    anti-diagonal at a time. Each memo is padded with two rows and columns of infinity so that a diagonal,
+    and each of its predecessors, is a strided view into the flattened memos. Windows of different sizes are
+    padded to the largest one: cells beyond a window's own rows or columns never feed back into it, so each
+    memo is simply cut back to its window's size. All memos are identical to ``AdaptiveEditDistance``'s.
+
+    Metrics are fused through their ``MetricKernels``: the costs of all metrics are stacked once, and each diagonal
+    gathers the predecessors of every metric at once and takes a single minimum over them.
+
+    A window given the memo of a previous, overlapping window has its remaining rows spliced in as soon as they
+    converge to it, and the sweep stops once no window needs further diagonals.
+
+    Windows given a cutoff have their cells over the cap set to infinity as in ``AdaptiveEditDistance``, the cap
+    being lowered by the last column cell of every diagonal once it is swept; flat index 0, in the padding, stands
+    for a diagonal without one. A cell can only be live if a predecessor, at most two columns to its left on the
+    three previous diagonals, is live, so each diagonal is only swept up to two columns past the live frontier of
+    the whole batch.
+
+    With ``track_starts``, every cell also carries the stream row its alignment started from, taken from the first
+    metric reaching the minimum, as in a Sellers semi-global alignment. Previous memos are not spliced then.
+
+    Costs are gathered from ``tables`` when they are valid for ``scaling_func`` and the current penalty factors.
+
+    All arrays are taken from ``workspace``, so memos are only valid until the next batch using the same workspace.
+    """
+
+    PADDING: int = 2
+
+    def __init__(
+        self,
+        edit_windows: List[EditWindow],
+        metrics: List[Callable],
+        scaling_func: Callable,
+        previous: Optional[List[Optional[PreviousMemo]]] = None,
+        cutoffs: Optional[List[bool]] = None,
+        track_starts: bool = False,
+        workspace: Optional[WorkspacePool] = None,
+        tables: Optional[CostTables] = None,
+    ) -> None:
+        self.edit_windows: List[EditWindow] = edit_windows
+        self.metrics: List[Callable] = metrics
+        self.scale: Callable = scaling_func
+        self.previous: List[Optional[PreviousMemo]] = previous or [None] * len(edit_windows)
+        self.cutoffs: List[bool] = cutoffs or [False] * len(edit_windows)
+        self.reused_rows: List[int] = [0] * len(edit_windows)
+        self.skipped_cells: List[int] = [0] * len(edit_windows)
+        self.track_starts: bool = track_starts
+        self.workspace: WorkspacePool = WorkspacePool() if workspace is None else workspace
+        self.tables: Optional[CostTables] = tables
+        self._starts: List[np.array] = list()
+        self._memos: List[np.array] = self._compute_memos()
+
+    def __len__(self) -> int:
+        return len(self.edit_windows)
+
+    def memo(self, idx: int) -> np.array:
+        return self._memos[idx]
+
+    def starts(self, idx: int) -> np.array:
+        """Start row of the alignment ending in every cell of window ``idx``, with ``track_starts``."""
+        return self._starts[idx]
+
+    def get_limits(self, idx: int, pattern_complete: bool = False) -> Tuple[int, float]:
+        return AdaptiveEditDistance.trace_limits(self._memos[idx], pattern_complete)
+
+    def _compute_memos(self) -> List[np.array]:
+        if len(self.edit_windows) == 0:
+            return list()
+        stream_lengths: List[int] = [len(edit_window.stream.intervals) for edit_window in self.edit_windows]
+        pattern_lengths: List[int] = [len(edit_window.pattern.intervals) for edit_window in self.edit_windows]
+        B, S, P = len(self.edit_windows), max(stream_lengths, default=0), max(pattern_lengths, default=0)
+        pad: int = self.PADDING
+        width: int = P + 1 + pad
+        memo: np.array = self.workspace.buffer("memo", (B, S + 1 + pad, width), fill=np.inf)
+        memo[:, pad:, pad] = 0.0
+
+        stream: StackedFeatures = self.stack(
+            self.workspace, "stream", [edit_window.stream for edit_window in self.edit_windows], S
+        )
+        pattern: StackedFeatures = self.stack(
+            self.workspace, "pattern", [edit_window.pattern for edit_window in self.edit_windows], P
+        )
+        scale: Callable = self.vectorized_scale(self.scale, self.tables)
+        self.fill_first_rows(memo, pattern, [edit_window.first_row for edit_window in self.edit_windows], scale)
+
+        costs, shifts, penalties = self.build_kernels(self.workspace, self.metrics, stream, pattern, scale, memo.shape)
+        penalize: bool = bool(penalties.any())
+        memos: List[np.array] = [
+            memo[idx, pad : pad + stream_lengths[idx] + 1, pad : pad + pattern_lengths[idx] + 1] for idx in range(B)
+        ]
+        last_diagonals: List[int] = [stream_lengths[idx] + pattern_lengths[idx] for idx in range(B)]
+        converging: List[int] = [
+            idx
+            for idx in range(B)
+            if self.previous[idx] is not None and not self.cutoffs[idx] and not self.track_starts
+        ]
+        cutoff: bool = any(self.cutoffs)
+        flat_memo: np.array = memo.reshape(B, -1)
+        step: int = width - 1
+
+        if self.track_starts:
+            starts: np.array = self.workspace.buffer("starts", memo.shape, np.int64, fill=-1)
+            starts[:, pad:, pad] = np.arange(S + 1)
+            starts[:, pad, pad:] = 0
+            flat_starts: np.array = starts.reshape(B, -1)
+            self._starts = [
+                starts[idx, pad : pad + stream_lengths[idx] + 1, pad : pad + pattern_lengths[idx] + 1]
+                for idx in range(B)
+            ]
+
+        live_columns: List[int] = [P] * (S + P + 1)
+        if cutoff:
+            S_w, P_w = np.array(stream_lengths), np.array(pattern_lengths)
+            batch, cut = np.arange(B), np.array(self.cutoffs)
+            caps: np.array = np.where(cut, memo[batch, pad, pad + P_w], np.inf)
+            last_rows: np.array = np.arange(S + P + 1)[:, None] - P_w
+            last_cells: np.array = np.where(
+                cut & (last_rows >= 1) & (last_rows <= S_w), (last_rows + pad) * width + pad + P_w, 0
+            )
+            live_columns = [d if d <= P else (0 if d <= S else -P) for d in range(S + P + 1)]
+            sweeps: List[Tuple[int, int, int]] = list()
+
+        for d in range(2, S + P + 1):
+            if d > max(last_diagonals):
+                break
+            frontier: int = max(live_columns[max(0, d - 3) : d]) + 2
+            i_low, i_high = max(1, d - P, d - frontier), min(S, d - 1)
+            if i_low > i_high:
+                continue
+            start: int = (i_low + pad) * width + (d - i_low) + pad
+            stop: int = (i_high + pad) * width + (d - i_high) + pad + 1
+            cells: np.array = np.arange(start, stop, step)
+            candidates: np.array = flat_memo[:, cells - shifts[:, None]] + costs[:, :, start:stop:step]
+            if penalize:
+                candidates += penalties[:, None]
+            best: np.array = candidates.min(axis=1)
+            if self.track_starts:
+                predecessors: np.array = cells - shifts[np.argmin(candidates, axis=1)]
+                flat_starts[:, start:stop:step] = np.take_along_axis(flat_starts, predecessors, axis=1)
+            if cutoff:
+                best[best > caps[:, None]] = np.inf
+                live_cells: np.array = np.isfinite(best).any(axis=0)
+                if live_cells.any():
+                    live_columns[d] = max(live_columns[d], d - i_low - int(np.argmax(live_cells)))
+                sweeps.append((d, i_low, i_high))
+            flat_memo[:, start:stop:step] = best
+            if cutoff:
+                caps = np.minimum(caps, flat_memo[batch, last_cells[d]])
+            for idx in converging:
+                if self._splice_converged(memos, idx, d - pattern_lengths[idx]):
+                    last_diagonals[idx] = d
+            converging = [idx for idx in converging if d < last_diagonals[idx]]
+        if cutoff:
+            d, i_low, i_high = np.array(sweeps, dtype=np.int64).reshape(-1, 3).T[:, :, None]
+            computed_cells: np.array = np.maximum(0, np.minimum(i_high, S_w) - np.maximum(i_low, d - P_w) + 1)
+            self.skipped_cells = [int(cells) for cells in S_w * P_w - computed_cells.sum(axis=0)]
+            for idx in np.flatnonzero(self.cutoffs):
+                AdaptiveEditDistance.prune_memo(memos[idx])
+        return memos
+
+    def _splice_converged(self, memos: List[np.array], idx: int, row: int) -> bool:
+        """Splices the remaining rows of window ``idx`` from its previous memo once its row ``row`` is complete."""
+        if not 1 <= row < len(memos[idx]) - 1:
+            return False
+        if not AdaptiveEditDistance.converged_rows(memos[idx], self.previous[idx], row):
+            return False
+        self.reused_rows[idx] = AdaptiveEditDistance.splice_rows(memos[idx], self.previous[idx], row)
+        return True
+
+    @staticmethod
+    def vectorized_scale(scaling_func: Callable, tables: Optional[CostTables]) -> Callable:
+        """``tables`` when they are valid for ``scaling_func`` and the current penalty factors."""
+        if tables is not None and tables.valid_for(scaling_func):
+            return tables
+        return ScalingFunctions.vectorize(scaling_func)
+
+    @classmethod
+    def fill_first_rows(
+        cls, memo: np.array, pattern: StackedFeatures, first_rows: List[Optional[np.array]], scale: Callable
+    ) -> None:
+        """Row 0 of every padded memo: its precomputed first row, or the costs of inserting the pattern."""
+        pad: int = cls.PADDING
+        if any(first_row is None for first_row in first_rows):
+            insertion_costs: np.array = MetricKernels.single_costs(pattern, scale)
+            for j in range(1, memo.shape[2] - pad):
+                memo[:, pad, pad + j] = np.where(
+                    pattern.rests[:, j - 1],
+                    0.0,
+                    memo[:, pad, pad + j - 1] + insertion_costs[:, j - 1] + DistanceMetrics.BASE_INSERTION_PENALTY,
+                )
+        else:
+            memo[:, pad, pad + 1 :] = 0.0
+        for idx, first_row in enumerate(first_rows):
+            if first_row is not None:
+                memo[idx, pad, pad : pad + len(first_row)] = first_row
+
+    @staticmethod
+    def stack(workspace: WorkspacePool, name: str, features: List[SequenceFeatures], length: int) -> StackedFeatures:
+        """Pads the singles to ``length`` and the pairs to ``length - 1`` entries; padding is marked as rests."""
+        B, pair_length = len(features), max(length - 1, 0)
+        values = workspace.buffer(f"{name}_values", (B, length), np.int64, fill=0)
+        rests = workspace.buffer(f"{name}_rests", (B, length), bool, fill=True)
+        durations = workspace.buffer(f"{name}_durations", (B, length), fill=1.0)
+        pair_values = workspace.buffer(f"{name}_pair_values", (B, pair_length), np.int64, fill=0)
+        pair_rests = workspace.buffer(f"{name}_pair_rests", (B, pair_length), bool, fill=True)
+        pair_durations = workspace.buffer(f"{name}_pair_durations", (B, pair_length), fill=1.0)
+        for idx, feature in enumerate(features):
+            S: int = len(feature.intervals)
+            values[idx, :S], rests[idx, :S], durations[idx, :S] = (
+                feature.intervals,
+                feature.rests,
+                feature.durations[:S],
+            )
+            S = max(S - 1, 0)
+            pair_values[idx, :S], pair_rests[idx, :S] = feature.interval_pairs, feature.pair_rests
+            pair_durations[idx, :S] = feature.duration_pairs[:S]
+        return StackedFeatures(values, rests, durations, pair_values, pair_rests, pair_durations)
+
+    @classmethod
+    def build_kernels(
+        cls,
+        workspace: WorkspacePool,
+        metrics: List[Callable],
+        stream: StackedFeatures,
+        pattern: StackedFeatures,
+        scale: Callable,
+        shape: Tuple[int, int, int],
+        lead: int = 0,
+    ) -> Kernels:
+        """
+        Costs of all metrics as one (B x M x cells) array, with the flat offset of each metric's predecessor.
+        The first ``lead`` stream entries only precede the memo's rows, for the pairs they start.
+        """
+        pad: int = cls.PADDING
+        kernels: List[MetricKernel] = [MetricKernels.kernel(metric) for metric in metrics]
+        costs: np.array = workspace.buffer("costs", (shape[0], len(kernels)) + shape[1:], fill=np.inf)
+        cells: Tuple[int, int, int] = (shape[0], shape[1] - pad - 1 + lead, shape[2] - pad - 1)
+        for idx, kernel in enumerate(kernels):
+            costs[:, idx, pad + 1 :, pad + 1 :] = np.broadcast_to(kernel.costs(stream, pattern, scale), cells)[:, lead:]
+        shifts: np.array = np.array([di * shape[2] + dj for di, dj in (kernel.offset for kernel in kernels)])
+        penalties: np.array = np.array([kernel.base_penalty() for kernel in kernels], dtype=np.float64)
+        return costs.reshape(shape[0], len(kernels), -1), shifts, penalties
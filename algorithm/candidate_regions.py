@@ -0,0 +1,92 @@
+from __future__ import annotations
+
+import bisect
+import logging
+import os
+from typing import Iterable, List, Optional, Set, Tuple
+
+from algorithm.interval_index import IntervalIndex
+from algorithm.kmp_soft import KMPSoft
+from algorithm.model.sequence_features import SequenceFeatures
+
+logger = logging.getLogger(os.path.basename(__file__))
+
+
+class CandidateRegions:
+    """
+    Prefilter for window propagation: stream regions that may hold a pattern match, as note indices [low, high],
+    merged. Occurrences of the pattern within an edit budget are found either with an approximate ``KMPSoft`` scan
+    of the intervals or from the seed hits of an ``IntervalIndex``, and regions hold every window start reaching one.
+    """
+
+    def __init__(self, stream_length: int, spans: Iterable[Tuple[int, int]]) -> None:
+        self.stream_length: int = stream_length
+        self.regions: List[Tuple[int, int]] = self._merge(spans)
+        self._lows: List[int] = [low for low, _ in self.regions]
+
+    @classmethod
+    def from_scan(
+        cls, stream: SequenceFeatures, pattern: SequenceFeatures, errors: int, tolerance: int, reach: int
+    ) -> CandidateRegions:
+        """
+        Every start from which a window of ``reach`` intervals holds an occurrence of the pattern within ``errors``,
+        expansions and compressions included. With an error per pattern interval, every start is kept unscanned.
+        """
+        if errors >= len(pattern.intervals):
+            return cls.everywhere(stream)
+        ends: List[int] = KMPSoft(tolerance).approximate_ends(
+            IntervalIndex.interval_values(stream), IntervalIndex.interval_values(pattern), errors, pairs=True
+        )
+        return cls(len(stream), [(end - reach + 1, end) for end in ends])
+
+    @classmethod
+    def from_seeds(
+        cls,
+        stream: SequenceFeatures,
+        interval_index: Optional[IntervalIndex],
+        pattern: SequenceFeatures,
+        errors: int,
+        reach: int,
+    ) -> CandidateRegions:
+        """
+        Every start from which a window of ``reach`` intervals holds the end of an occurrence of the pattern within
+        ``errors``, as placed by one of its seed hits at the pattern length. Without an index, as when the budget
+        leaves no seed free of errors, every start is kept.
+        """
+        if interval_index is None:
+            return cls.everywhere(stream)
+        ends: Set[int] = {
+            position - offset + len(pattern.intervals) - 1 for position, offset in interval_index.seeds(pattern, errors)
+        }
+        return cls(len(stream), [(end - reach + 1, end) for end in ends])
+
+    @classmethod
+    def everywhere(cls, stream: SequenceFeatures) -> CandidateRegions:
+        return cls(len(stream), [(0, len(stream) - 1)])
+
+    def _merge(self, spans: Iterable[Tuple[int, int]]) -> List[Tuple[int, int]]:
+        regions: List[Tuple[int, int]] = list()
+        for low, high in sorted(spans):
+            low, high = max(0, low), min(self.stream_length - 1, high)
+            if low > high:
+                continue
+            if regions and low <= regions[-1][1] + 1:
+                regions[-1] = (regions[-1][0], max(regions[-1][1], high))
+            else:
+                regions.append((low, high))
+        return regions
+
+    def next_start(self, stream_pos: int) -> Optional[int]:
+        """First stream position from ``stream_pos`` on inside a region, ``None`` past the last region."""
+        region_idx: int = bisect.bisect_right(self._lows, stream_pos) - 1
+        if region_idx >= 0 and stream_pos <= self.regions[region_idx][1]:
+            return stream_pos
+        if region_idx + 1 < len(self.regions):
+            return self.regions[region_idx + 1][0]
+        return None
+
+    @property
+    def pruned_fraction(self) -> float:
+        if self.stream_length == 0:
+            return 0.0
+        return 1 - sum(high - low + 1 for low, high in self.regions) / self.stream_length
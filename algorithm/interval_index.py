@@ -0,0 +1,105 @@
+from __future__ import annotations
+
+import itertools
+import logging
+import os
+from collections import defaultdict
+from typing import Dict, List, Optional, Set, Tuple
+
+from algorithm.kmp_soft import KMPSoft
+from algorithm.model.sequence_features import SequenceFeatures
+
+logger = logging.getLogger(os.path.basename(__file__))
+
+NGram = Tuple[Optional[int], ...]
+
+
+class IntervalIndex:
+    """
+    Positions of every interval n-gram of a stream, built once and shared by all patterns looked up in it.
+    An n-gram is made of ``size`` units, each an interval or the sum of two adjacent ones, so that compressions
+    of the pattern are indexed as well. Lookups tolerate a difference of up to ``tolerance`` on every unit by
+    probing the neighbouring n-grams; rests (``None``) match rests and unisons, as in ``KMPSoft``.
+    """
+
+    def __init__(self, stream: SequenceFeatures, size: int, tolerance: int) -> None:
+        assert size >= 1
+        self.size: int = size
+        self.tolerance: int = tolerance
+        self._positions: Dict[NGram, List[int]] = defaultdict(list)
+        values: List[Optional[int]] = self.interval_values(stream)
+        pairs: List[Optional[int]] = KMPSoft.pair_values(values)
+        for start in range(len(values)):
+            for ngram in self.ngrams(values, pairs, start, size):
+                self._positions[ngram].append(start)
+
+    @staticmethod
+    def interval_values(features: SequenceFeatures) -> List[Optional[int]]:
+        return [None if rest else int(interval) for interval, rest in zip(features.intervals, features.rests)]
+
+    @classmethod
+    def ngrams(cls, values: List[Optional[int]], pairs: List[Optional[int]], start: int, size: int) -> Set[NGram]:
+        """Every n-gram of ``size`` units from ``start``."""
+        if size == 0:
+            return {()}
+        ngrams: Set[NGram] = set()
+        if start < len(values):
+            ngrams.update((values[start],) + ngram for ngram in cls.ngrams(values, pairs, start + 1, size - 1))
+        if start < len(pairs):
+            ngrams.update((pairs[start],) + ngram for ngram in cls.ngrams(values, pairs, start + 2, size - 1))
+        return ngrams
+
+    @staticmethod
+    def seed_size(length: int, errors: int, largest: int) -> Optional[int]:
+        """
+        Largest n-gram size, up to ``largest``, such that ``errors + 1`` pieces of twice as many pattern intervals
+        fit apart in ``length``; ``None`` if not even single units do.
+        """
+        size: int = min(largest, (length - errors) // (2 * (errors + 1)))
+        return size if size >= 1 else None
+
+    def __len__(self) -> int:
+        return len(self._positions)
+
+    def neighbours(self, ngram: NGram) -> List[NGram]:
+        return list(
+            itertools.product(
+                *(
+                    (
+                        (None, 0)
+                        if value is None
+                        else tuple(range(value - self.tolerance, value + self.tolerance + 1))
+                        + ((None,) if value == 0 else ())
+                    )
+                    for value in ngram
+                )
+            )
+        )
+
+    def positions(self, ngram: NGram) -> List[int]:
+        """Stream interval indices where an n-gram within tolerance of ``ngram`` starts."""
+        return sorted(
+            {position for neighbour in self.neighbours(ngram) for position in self._positions.get(neighbour, ())}
+        )
+
+    def seeds(self, pattern: SequenceFeatures, errors: int) -> Set[Tuple[int, int]]:
+        """
+        Seed hits inside every occurrence of the pattern within ``errors``, as ``KMPSoft`` counts them with pairs, as
+        (stream interval index, pattern interval index) pairs. The pattern is split into ``errors + 1`` pieces of
+        ``2 * size`` intervals, at least one apart, so that an occurrence leaves one piece free of errors: its first
+        ``size`` units, expansions included and the first possibly taking in the interval before the piece, are
+        looked up.
+        """
+        assert 2 * self.size * (errors + 1) + errors <= len(pattern.intervals)
+        values: List[Optional[int]] = self.interval_values(pattern)
+        pairs: List[Optional[int]] = KMPSoft.pair_values(values)
+        span: int = len(values) - 2 * self.size
+        seeds: Set[Tuple[int, int]] = set()
+        for piece in range(errors + 1):
+            offset: int = piece * span // errors if errors else 0
+            for ngram in self.ngrams(values, pairs, offset, self.size):
+                seeds.update((position, offset) for position in self.positions(ngram))
+            if offset > 0:
+                for ngram in self.ngrams(values, pairs, offset + 1, self.size - 1):
+                    seeds.update((position, offset - 1) for position in self.positions((pairs[offset - 1],) + ngram))
+        return seeds
@@ -1,4 +1,4 @@
-from typing import List
+from typing import Dict, List, Optional
 
 
 class KMPSoft:
@@ -34,3 +34,64 @@ class KMPSoft:
                 prefix_idx = pi[P - 1]
                 matches.append(idx - P + 1)
         return matches
+
+    def matches(self, value_1: Optional[int], value_2: Optional[int]) -> bool:
+        """``None`` is a rest and matches another rest or a unison, which a rest replaces at no cost."""
+        if value_1 is None or value_2 is None:
+            return not value_1 and not value_2
+        return abs(value_1 - value_2) <= self.tolerance
+
+    def symbol_masks(self, stream: List[Optional[int]], pattern: List[Optional[int]]) -> Dict[Optional[int], int]:
+        """Bit ``k`` of the mask of a stream value is set when it matches ``pattern[k]``."""
+        return {
+            value: sum(1 << idx for idx, pattern_value in enumerate(pattern) if self.matches(value, pattern_value))
+            for value in set(stream)
+        }
+
+    @staticmethod
+    def pair_values(values: List[Optional[int]]) -> List[Optional[int]]:
+        """Sums of adjacent values, ``None`` when either is a rest."""
+        return [None if left is None or right is None else left + right for left, right in zip(values, values[1:])]
+
+    def approximate_ends(
+        self, stream: List[Optional[int]], pattern: List[Optional[int]], errors: int, pairs: bool = False
+    ) -> List[int]:
+        """
+        Bit-parallel shift-and (Wu-Manber): end indices of the stream substrings that are within ``errors``
+        insertions, deletions or out of tolerance replacements of the pattern.
+        Row ``d`` holds the pattern prefixes matching a stream suffix with at most ``d`` errors, one bit each.
+
+        With ``pairs``, two adjacent pattern values may also align with one stream value (expansion) and two
+        adjacent stream values with one pattern value (compression), free when their sum matches and one error
+        otherwise. Compressions extend the rows of the stream value before last.
+        """
+        masks: Dict[Optional[int], int] = self.symbol_masks(stream, pattern)
+        stream_pairs: List[Optional[int]] = [None] + self.pair_values(stream) if pairs else list()
+        expansion_masks: Dict[Optional[int], int] = {
+            value: mask << 1 for value, mask in self.symbol_masks(stream, self.pair_values(pattern)).items()
+        }
+        compression_masks: Dict[Optional[int], int] = self.symbol_masks(stream_pairs, pattern)
+        accept: int = 1 << (len(pattern) - 1)
+        prefixes: int = (accept << 1) - 1
+        rows: List[int] = [(1 << d) - 1 for d in range(errors + 1)]
+        before: Optional[List[int]] = None
+        ends: List[int] = list()
+        for idx, value in enumerate(stream):
+            mask: int = masks[value]
+            previous: List[int] = rows
+            rows = list()
+            for d in range(errors + 1):
+                row: int = ((previous[d] << 1) | 1) & mask
+                if d > 0:
+                    row |= previous[d - 1] | (previous[d - 1] << 1) | (rows[d - 1] << 1) | 1
+                if pairs:
+                    row |= ((previous[d] << 2) | 2) & expansion_masks[value]
+                    row |= (previous[d - 1] << 2) | 2 if d > 0 else 0
+                    if before is not None:
+                        row |= ((before[d] << 1) | 1) & compression_masks[stream_pairs[idx]]
+                        row |= (before[d - 1] << 1) | 1 if d > 0 else 0
+                rows.append(row & prefixes)
+            before = previous
+            if rows[errors] & accept:
+                ends.append(idx)
+        return ends
@@ -0,0 +1,88 @@
+from __future__ import annotations
+
+from typing import Dict, List, Tuple
+
+import numpy as np
+
+from model.constants import Transformation
+from model.match_view import MatchView
+from model.note_sequence import NoteSequence
+
+CANDIDATE_DTYPE: np.dtype = np.dtype(
+    [
+        ("start", np.int64),
+        ("end", np.int64),
+        ("transformation", np.int16),
+        ("weight", np.float64),
+        ("reach", np.int64),
+    ]
+)
+
+
+class CandidateTable:
+    """
+    Every candidate match of an analysis, before ``sensitivity`` and ``min_match`` are applied.
+
+    Pulled back windows advance propagation the same way whether they are accepted or not, so one propagation
+    records the candidates of all thresholds. Candidates are stored per voice, in the order they were found, as
+    ``CANDIDATE_DTYPE`` records: ``transformation`` indexes ``transformations`` and ``reach`` is the largest
+    ``min_match`` the candidate is found with, bounded by its length and, for propagated windows, by the position
+    propagation started the window from.
+    """
+
+    def __init__(
+        self,
+        streams: Dict[int, NoteSequence],
+        transformations: List[Transformation],
+        candidates: Dict[int, np.array],
+    ) -> None:
+        self.streams: Dict[int, NoteSequence] = streams
+        self.transformations: List[Transformation] = transformations
+        self.candidates: Dict[int, np.array] = candidates
+
+    def __len__(self) -> int:
+        return sum(len(candidates) for candidates in self.candidates.values())
+
+    @classmethod
+    def from_matches(
+        cls,
+        streams: Dict[int, NoteSequence],
+        voice_matches: Dict[int, List[Tuple[MatchView, Transformation, float]]],
+        reaches: Dict[int, List[int]],
+    ) -> CandidateTable:
+        """Table of matches accepted at any threshold, with the reach of each."""
+        transformations: List[Transformation] = list(
+            dict.fromkeys(transformation for matches in voice_matches.values() for _, transformation, _ in matches)
+        )
+        transformation_idx: Dict[Transformation, int] = {
+            transformation: idx for idx, transformation in enumerate(transformations)
+        }
+        return cls(
+            streams,
+            transformations,
+            {
+                voice: np.array(
+                    [
+                        (match.start, match.end, transformation_idx[transformation], weight, reach)
+                        for (match, transformation, weight), reach in zip(matches, reaches[voice])
+                    ],
+                    dtype=CANDIDATE_DTYPE,
+                )
+                for voice, matches in voice_matches.items()
+            },
+        )
+
+    def accepted(self, sensitivity: float, min_match: int) -> Dict[int, List[Tuple[MatchView, Transformation, float]]]:
+        """Matches of every voice at the given thresholds, as the analysis would have found them."""
+        voice_matches: Dict[int, List[Tuple[MatchView, Transformation, float]]] = dict()
+        for voice, candidates in self.candidates.items():
+            accepted: np.array = candidates[~(candidates["weight"] > sensitivity) & (candidates["reach"] >= min_match)]
+            voice_matches[voice] = [
+                (
+                    MatchView(self.streams[voice], int(start), int(end), voice),
+                    self.transformations[transformation],
+                    weight,
+                )
+                for start, end, transformation, weight, _ in accepted
+            ]
+        return voice_matches
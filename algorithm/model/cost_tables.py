@@ -0,0 +1,146 @@
+from __future__ import annotations
+
+from typing import Callable, Iterable, Optional, Tuple
+
+import numpy as np
+
+from algorithm.model.distance_metrics import DistanceMetrics, ScalingFunctions
+from algorithm.model.sequence_features import SequenceFeatures
+
+
+class CostTables:
+    """
+    Quantized cost lookup tables, built once per analysis from the current penalty factors.
+
+    Intervals are quantized to indices ``value + max_interval``, rests to the last index, and durations to their rank
+    among all the durations of the analysis. ``interval_costs[a, b]`` is the replacement interval cost of intervals
+    ``a`` and ``b``; ``combined_costs[c, n, d]`` is the scaled cost of interval cost ``c`` over durations ``n / d``,
+    computed with the same operations as ``DistanceMetrics._combine_costs`` so that gathered costs are identical.
+    Both tables are indexed by NumPy arrays, to gather the costs of whole batches.
+
+    Tables are handed to ``BatchedEditDistance`` and passed to the metric kernels as their ``scale``, which they
+    call as the vectorized scaling function; ``MetricKernels`` gathers costs from the tables it is given that way.
+    """
+
+    MAX_ENTRIES: int = 1 << 22
+
+    def __init__(self, max_interval: int, durations: Iterable[float], scaling_func: Callable) -> None:
+        self.factors: Tuple = self.current_factors()
+        self.scaling_func: Callable = scaling_func
+        self.scale: Callable = ScalingFunctions.vectorize(scaling_func)
+        self.max_interval: int = max_interval
+        self.rest: int = 2 * max_interval + 1
+        self.durations: np.array = np.unique(np.append(np.asarray(list(durations), dtype=np.float64), 1.0))
+        self.unit: int = int(np.searchsorted(self.durations, 1.0))
+
+        self.interval_costs: np.array = self.interval_table(max_interval)
+        self.max_cost: int = self.cost_count(self.interval_costs, max_interval) - 1
+        self.combined_costs: np.array = self.combine_costs(
+            np.arange(self.max_cost + 1)[:, None, None],
+            self.durations[None, :, None],
+            self.durations[None, None, :],
+            self.scale,
+        )
+
+    def __call__(self, values: np.array) -> np.array:
+        return self.scale(values)
+
+    @classmethod
+    def from_features(cls, features: Iterable[SequenceFeatures], scaling_func: Callable) -> Optional[CostTables]:
+        """
+        Tables covering every interval, duration and pair of ``features``, ``None`` when the combined table would
+        hold more than ``MAX_ENTRIES`` costs: it grows with the square of the number of distinct durations.
+        """
+        features = list(features)
+        max_interval: int = max((int(np.abs(feature.intervals).max(initial=0)) for feature in features), default=0)
+        durations: np.array = np.concatenate(
+            [np.concatenate([feature.durations, feature.duration_pairs]) for feature in features] or [np.ones(1)]
+        )
+        distinct: int = len(np.unique(np.append(durations, 1.0)))
+        if cls.cost_count(cls.interval_table(max_interval), max_interval) * distinct**2 > cls.MAX_ENTRIES:
+            return None
+        return cls(max_interval, durations, scaling_func)
+
+    @classmethod
+    def interval_table(cls, max_interval: int) -> np.array:
+        """Replacement interval costs of every pair of intervals up to ``max_interval``, the rest index last."""
+        values: np.array = np.append(np.arange(-max_interval, max_interval + 1), 0)
+        rests: np.array = np.arange(len(values)) == 2 * max_interval + 1
+        return cls.replacement_interval_costs(values[:, None], rests[:, None], values[None, :], rests[None, :])
+
+    @staticmethod
+    def cost_count(interval_costs: np.array, max_interval: int) -> int:
+        """Number of interval costs the combined table covers, pair costs reaching ``3 * max_interval``."""
+        return max(int(interval_costs.max()), 3 * max_interval) + 1
+
+    @staticmethod
+    def current_factors() -> Tuple:
+        return (
+            DistanceMetrics.REST_PENALTY_FACTOR,
+            DistanceMetrics.INVERSION_PENALTY_FACTOR,
+            DistanceMetrics.REPLACEMENT_TOLERANCE,
+            DistanceMetrics.DURATION_WEIGHT,
+        )
+
+    @staticmethod
+    def replacement_interval_costs(
+        s_values: np.array, s_rests: np.array, p_values: np.array, p_rests: np.array
+    ) -> np.array:
+        """Vectorized ``DistanceMetrics._safe_sub``."""
+        penalties: np.array = np.where((s_values < 0) == (p_values < 0), 1, DistanceMetrics.INVERSION_PENALTY_FACTOR)
+        interval_costs: np.array = penalties * np.maximum(
+            0, np.abs(s_values - p_values) - DistanceMetrics.REPLACEMENT_TOLERANCE
+        )
+        interval_costs = np.where(p_rests, DistanceMetrics.REST_PENALTY_FACTOR * np.abs(s_values), interval_costs)
+        interval_costs = np.where(s_rests, DistanceMetrics.REST_PENALTY_FACTOR * np.abs(p_values), interval_costs)
+        return np.where(s_rests & p_rests, 0, interval_costs)
+
+    @staticmethod
+    def combine_costs(
+        interval_costs: np.array, numerators: np.array, denominators: np.array, scale: Callable
+    ) -> np.array:
+        """Vectorized ``DistanceMetrics._combine_costs``."""
+        multipliers: np.array = np.where(interval_costs == 0, 1, interval_costs)
+        costs: np.array = scale(DistanceMetrics.DURATION_WEIGHT * multipliers * numerators / denominators)
+        return np.where((interval_costs == 0) & (numerators == denominators), 0.0, costs)
+
+    def valid_for(self, scale: Callable) -> bool:
+        """Scaling functions are compared unvectorized, as every vectorization makes a new wrapper."""
+        return ScalingFunctions.unvectorized(scale) == self.scaling_func and self.factors == self.current_factors()
+
+    def interval_index(self, values: np.array, rests: np.array) -> Optional[np.array]:
+        """``None`` when an interval is out of the tables."""
+        if np.abs(values).max(initial=0) > self.max_interval:
+            return None
+        return np.where(rests, self.rest, values + self.max_interval)
+
+    def duration_index(self, durations: np.array) -> Optional[np.array]:
+        """``None`` when a duration is out of the tables."""
+        indices: np.array = np.minimum(np.searchsorted(self.durations, durations), len(self.durations) - 1)
+        if not np.array_equal(self.durations[indices], durations):
+            return None
+        return indices
+
+    def _gather(self, interval_costs: np.array, numerators: np.array, denominators: np.array) -> Optional[np.array]:
+        if not np.issubdtype(interval_costs.dtype, np.integer):
+            return None
+        if interval_costs.max(initial=0) > self.max_cost or interval_costs.min(initial=0) < 0:
+            return None
+        return self.combined_costs[interval_costs, numerators, denominators]
+
+    def duration_ratio_costs(
+        self, interval_costs: np.array, left_durations: np.array, right_durations: np.array
+    ) -> Optional[np.array]:
+        """Gathered ``combine_costs`` over the longer by the shorter duration, ``None`` out of the tables."""
+        left: Optional[np.array] = self.duration_index(left_durations)
+        right: Optional[np.array] = self.duration_index(right_durations)
+        if left is None or right is None:
+            return None
+        return self._gather(interval_costs, np.maximum(left, right), np.minimum(left, right))
+
+    def single_costs(self, interval_costs: np.array, durations: np.array) -> Optional[np.array]:
+        """Gathered ``combine_costs`` over the duration itself, ``None`` out of the tables."""
+        indices: Optional[np.array] = self.duration_index(durations)
+        if indices is None:
+            return None
+        return self._gather(interval_costs, indices, self.unit)
@@ -1,7 +1,6 @@
 import math
-from decimal import Decimal
 from functools import lru_cache
-from typing import Any, Callable, Optional
+from typing import Any, Callable
 
 import numpy as np
 
@@ -19,6 +18,27 @@ class ScalingFunctions:
     def floored_sqrt(cls, value: int, scale: int = 1) -> float:
         return math.floor(math.sqrt(scale * value))
 
+    @staticmethod
+    def _floored_sqrt_array(values: np.array) -> np.array:
+        return np.floor(np.sqrt(values))
+
+    @classmethod
+    def vectorize(cls, scaling_func: Callable) -> Callable:
+        if scaling_func == cls.sqrt:
+            return np.sqrt
+        if scaling_func == cls.floored_sqrt:
+            return cls._floored_sqrt_array
+        return np.vectorize(scaling_func, otypes=[float])
+
+    @classmethod
+    def unvectorized(cls, scale: Callable) -> Callable:
+        """Scaling function ``scale`` was vectorized from, or ``scale`` itself when not vectorized."""
+        if scale is np.sqrt:
+            return cls.sqrt
+        if scale is cls._floored_sqrt_array:
+            return cls.floored_sqrt
+        return scale.pyfunc if isinstance(scale, np.vectorize) else scale
+
 
 class DistanceMetrics:
     REST_PENALTY_FACTOR = 5
@@ -34,33 +54,33 @@ class DistanceMetrics:
         DistanceMetrics.INVERSION_PENALTY_FACTOR = inversion_penalty_factor
 
     @classmethod
-    @lru_cache(maxsize=128)
-    def _safe_sub(cls, val_1: Optional[float], val_2: Optional[float]) -> float:
-        match (val_1, val_2):
-            case (None, None):
-                return 0.0
-            case (None, _):
-                return cls.REST_PENALTY_FACTOR * abs(val_2)
-            case (_, None):
-                return cls.REST_PENALTY_FACTOR * abs(val_1)
-            case (_, _):
-                penalty = 1 if (val_1 < 0) == (val_2 < 0) else cls.INVERSION_PENALTY_FACTOR
-                return penalty * max(0, abs(val_1 - val_2) - cls.REPLACEMENT_TOLERANCE)
+    def _safe_sub(cls, val_1: int, rest_1: bool, val_2: int, rest_2: bool) -> float:
+        if rest_1 and rest_2:
+            return 0.0
+        if rest_1:
+            return cls.REST_PENALTY_FACTOR * abs(val_2)
+        if rest_2:
+            return cls.REST_PENALTY_FACTOR * abs(val_1)
+        penalty = 1 if (val_1 < 0) == (val_2 < 0) else cls.INVERSION_PENALTY_FACTOR
+        return penalty * max(0, abs(val_1 - val_2) - cls.REPLACEMENT_TOLERANCE)
 
     @classmethod
-    @lru_cache(maxsize=64)
-    def _abs_mul(cls, val_1: Decimal, val_2: Decimal) -> Decimal:
-        return val_1 / val_2 if val_1 >= val_2 else val_2 / val_1
+    def _combine_costs(
+        cls, interval_cost: float, duration_numerator: float, duration_denominator: float, scale: Callable
+    ) -> float:
+        """
+        The duration cost is ``duration_numerator / duration_denominator``; it is divided last so that
+        the combined cost is rounded only once.
+        """
+        if interval_cost == 0 and duration_numerator == duration_denominator:
+            return 0.0
+        return scale(cls.DURATION_WEIGHT * (interval_cost or 1) * duration_numerator / duration_denominator)
 
     @classmethod
-    def _combine_costs(cls, interval_cost: float, duration_cost: Decimal, scale: Callable) -> float:
-        match (interval_cost, duration_cost):
-            case (0, 1):
-                return 0.0
-            case (0, _):
-                return scale(Decimal(str(cls.DURATION_WEIGHT)) * duration_cost)
-            case (_, _):
-                return scale(Decimal(str(cls.DURATION_WEIGHT)) * interval_cost * duration_cost)
+    def _combine_duration_ratio(
+        cls, interval_cost: float, duration_1: float, duration_2: float, scale: Callable
+    ) -> float:
+        return cls._combine_costs(interval_cost, max(duration_1, duration_2), min(duration_1, duration_2), scale)
 
     @classmethod
     def replacement_with_penalty(
@@ -72,9 +92,13 @@ class DistanceMetrics:
         scale: Callable,
         sentinel: Any = float("inf"),
     ) -> float:
-        interval_cost = cls._safe_sub(edit_window.stream_intervals[cur_i - 1], edit_window.pattern_intervals[cur_j - 1])
-        duration_cost = cls._abs_mul(edit_window.stream_durations[cur_i - 1], edit_window.pattern_durations[cur_j - 1])
-        return memo[cur_i - 1][cur_j - 1] + cls._combine_costs(interval_cost, duration_cost, scale)
+        stream, pattern = edit_window.stream, edit_window.pattern
+        interval_cost = cls._safe_sub(
+            stream.intervals[cur_i - 1], stream.rests[cur_i - 1], pattern.intervals[cur_j - 1], pattern.rests[cur_j - 1]
+        )
+        return memo[cur_i - 1][cur_j - 1] + cls._combine_duration_ratio(
+            interval_cost, stream.durations[cur_i - 1], pattern.durations[cur_j - 1], scale
+        )
 
     @classmethod
     def insertion_without_expansion(
@@ -86,16 +110,24 @@ class DistanceMetrics:
         scale: Callable,
         sentinel: Any = float("inf"),
     ) -> float:
-        if edit_window.pattern_intervals[cur_j - 1] is None:
+        if edit_window.pattern.rests[cur_j - 1]:
             return sentinel
         return (
             memo[cur_i][cur_j - 1]
             + cls._combine_costs(
-                abs(edit_window.pattern_intervals[cur_j - 1]), edit_window.pattern_durations[cur_j - 1], scale
+                abs(edit_window.pattern.intervals[cur_j - 1]), edit_window.pattern.durations[cur_j - 1], 1, scale
             )
             + cls.BASE_INSERTION_PENALTY
         )
 
+    @classmethod
+    def insertion_row(cls, edit_window: EditWindow, scale: Callable) -> np.array:
+        """Memo row 0: the cumulative insertion costs of the pattern, restarting from 0 at every rest."""
+        row: np.array = np.zeros((1, len(edit_window.pattern_intervals) + 1))
+        for j in range(1, row.shape[1]):
+            row[0, j] = cls.insertion_without_expansion(row, edit_window, 0, j, scale, sentinel=0.0)
+        return row[0]
+
     @classmethod
     def insertion_with_expansion(
         cls,
@@ -108,26 +140,15 @@ class DistanceMetrics:
     ) -> float:
         if cur_j < 2:
             return sentinel
-        if any(
-            value is None
-            for value in (
-                edit_window.pattern_intervals[cur_j - 2],
-                edit_window.pattern_intervals[cur_j - 1],
-                edit_window.stream_intervals[cur_i - 1],
-            )
-        ):
+        if edit_window.pattern.pair_rests[cur_j - 2] or edit_window.stream.rests[cur_i - 1]:
             return sentinel
-        interval_cost = abs(
-            (edit_window.pattern_intervals[cur_j - 2] + edit_window.pattern_intervals[cur_j - 1])
-            - edit_window.stream_intervals[cur_i - 1]
-        )
-        duration_cost = cls._abs_mul(
-            edit_window.pattern_durations[cur_j - 2] + edit_window.pattern_durations[cur_j - 1],
-            edit_window.stream_durations[cur_i - 1],
-        )
+        stream, pattern = edit_window.stream, edit_window.pattern
+        interval_cost = abs(pattern.interval_pairs[cur_j - 2] - stream.intervals[cur_i - 1])
         return (
             memo[cur_i - 1][cur_j - 2]
-            + cls._combine_costs(interval_cost, duration_cost, scale)
+            + cls._combine_duration_ratio(
+                interval_cost, pattern.duration_pairs[cur_j - 2], stream.durations[cur_i - 1], scale
+            )
             + cls.BASE_INSERTION_PENALTY
         )
 
@@ -141,12 +162,12 @@ class DistanceMetrics:
         scale: Callable,
         sentinel: Any = float("inf"),
     ) -> float:
-        if edit_window.stream_intervals[cur_i - 1] is None:
+        if edit_window.stream.rests[cur_i - 1]:
             return sentinel
         return (
             memo[cur_i - 1][cur_j]
             + cls._combine_costs(
-                abs(edit_window.stream_intervals[cur_i - 1]), edit_window.stream_durations[cur_i - 1], scale
+                abs(edit_window.stream.intervals[cur_i - 1]), edit_window.stream.durations[cur_i - 1], 1, scale
             )
             + cls.BASE_DELETION_PENALTY
         )
@@ -163,25 +184,14 @@ class DistanceMetrics:
     ) -> float:
         if cur_i < 2:
             return sentinel
-        if any(
-            value is None
-            for value in (
-                edit_window.stream_intervals[cur_i - 2],
-                edit_window.stream_intervals[cur_i - 1],
-                edit_window.pattern_intervals[cur_j - 1],
-            )
-        ):
+        if edit_window.stream.pair_rests[cur_i - 2] or edit_window.pattern.rests[cur_j - 1]:
             return sentinel
-        interval_cost = abs(
-            (edit_window.stream_intervals[cur_i - 2] + edit_window.stream_intervals[cur_i - 1])
-            - edit_window.pattern_intervals[cur_j - 1]
-        )
-        duration_cost = cls._abs_mul(
-            edit_window.stream_durations[cur_i - 2] + edit_window.stream_durations[cur_i - 1],
-            edit_window.pattern_durations[cur_j - 1],
-        )
+        stream, pattern = edit_window.stream, edit_window.pattern
+        interval_cost = abs(stream.interval_pairs[cur_i - 2] - pattern.intervals[cur_j - 1])
         return (
             memo[cur_i - 2][cur_j - 1]
-            + cls._combine_costs(interval_cost, duration_cost, scale)
+            + cls._combine_duration_ratio(
+                interval_cost, stream.duration_pairs[cur_i - 2], pattern.durations[cur_j - 1], scale
+            )
             + cls.BASE_DELETION_PENALTY
         )
@@ -1,41 +1,60 @@
 from __future__ import annotations
 
 from dataclasses import dataclass
-from typing import TYPE_CHECKING, List, Optional
+from typing import TYPE_CHECKING, Optional
 
+from algorithm.model.sequence_features import SequenceFeatures
 from model.constants import Transformation
-from model.note_sequence import NoteSequence
-from model.transformed_sequence import TransformedSequence
 
 if TYPE_CHECKING:
-    from decimal import Decimal
+    import numpy as np
 
 
 @dataclass
 class EditWindow:
-    stream_intervals: List[Optional[int]]
-    stream_durations: List[Decimal]
-    pattern_intervals: List[Optional[int]]
-    pattern_durations: List[Decimal]
+    """``first_row``, when given, is memo row 0 precomputed for ``pattern`` under the scaling function in use."""
+
+    stream: SequenceFeatures
+    pattern: SequenceFeatures
+    first_row: Optional[np.array] = None
+
+    @property
+    def stream_intervals(self) -> np.array:
+        return self.stream.intervals
+
+    @property
+    def stream_durations(self) -> np.array:
+        return self.stream.durations
+
+    @property
+    def pattern_intervals(self) -> np.array:
+        return self.pattern.intervals
+
+    @property
+    def pattern_durations(self) -> np.array:
+        return self.pattern.durations
 
     def transform_pattern(self, transformation: Transformation) -> None:
-        transformer: TransformedSequence = TransformedSequence(self.pattern_intervals, self.pattern_durations)
-        self.pattern_intervals = transformer.get_interval_transformation(transformation)
-        self.pattern_durations = transformer.get_duration_transformation(transformation)
+        self.pattern = self.pattern.transformed(transformation)
+        self.first_row = None
+
+    @staticmethod
+    def stream_end(
+        stream: SequenceFeatures, pattern: SequenceFeatures, stream_start: int, padding_factor: int = 2
+    ) -> int:
+        return min(stream_start + int(padding_factor * len(pattern.intervals)) - 1, len(stream) - 1)
 
     @staticmethod
     def build(
-        stream: NoteSequence, pattern: NoteSequence, stream_start: int, padding_factor: int = 2, reverse: bool = False
+        stream: SequenceFeatures,
+        pattern: SequenceFeatures,
+        stream_start: int,
+        padding_factor: int = 2,
+        reverse: bool = False,
     ) -> EditWindow:
-        pattern_intervals: List[int] = pattern.raw_intervals
-        stream_end: int = min(stream_start + int(padding_factor * len(pattern_intervals)) - 1, len(stream) - 1)
-        stream_intervals: List[int] = stream.raw_intervals_range(stream_start, stream_end)
-
-        pattern_durations: List[Decimal] = pattern.raw_durations
-        stream_durations: List[Decimal] = stream.raw_durations_range(stream_start, stream_end)
+        stream_end: int = EditWindow.stream_end(stream, pattern, stream_start, padding_factor)
+        stream_window: SequenceFeatures = stream.window(stream_start, stream_end)
 
         if reverse:
-            return EditWindow(
-                stream_intervals[::-1], stream_durations[::-1], pattern_intervals[::-1], pattern_durations[::-1]
-            )
-        return EditWindow(stream_intervals, stream_durations, pattern_intervals, pattern_durations)
+            return EditWindow(stream_window.reversed(), pattern.reversed())
+        return EditWindow(stream_window, pattern)
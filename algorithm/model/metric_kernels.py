@@ -0,0 +1,157 @@
+from __future__ import annotations
+
+from collections import namedtuple
+from typing import Callable, Dict, Optional, Tuple
+
+import numpy as np
+
+from algorithm.model.cost_tables import CostTables
+from algorithm.model.distance_metrics import DistanceMetrics
+
+StackedFeatures = namedtuple(
+    "StackedFeatures", ("values", "rests", "durations", "pair_values", "pair_rests", "pair_durations")
+)
+MetricKernel = namedtuple("MetricKernel", ("costs", "offset", "base_penalty"))
+
+
+class MetricKernels:
+    """
+    Vectorized forms of the distance metrics, as used by ``BatchedEditDistance``.
+
+    A kernel reaches cell ``(i, j)`` from its predecessor ``(i - di, j - dj)``, ``offset`` being ``(di, dj)``.
+    Its ``costs`` function maps the stacked stream and pattern features of a batch to the cost of every cell
+    ``(i, j)``, ``i, j >= 1``, as an array broadcastable to (B x S x P), infinity forbidding the transition;
+    ``base_penalty`` returns the penalty added last. Predecessors lie at most two rows and two columns back, and
+    at most three anti-diagonals back. Custom metrics are registered along with their per-cell form, which
+    ``AdaptiveEditDistance`` keeps using.
+
+    ``scale`` is the vectorized scaling function, or ``CostTables`` valid for it, from which costs are then gathered.
+    """
+
+    OFFSETS: Tuple[Tuple[int, int], ...] = ((0, 1), (0, 2), (1, 0), (1, 1), (1, 2), (2, 0), (2, 1))
+
+    _kernels: Dict[Callable, MetricKernel] = dict()
+
+    @classmethod
+    def valid_offset(cls, offset: Tuple[int, int]) -> bool:
+        return tuple(offset) in cls.OFFSETS
+
+    @classmethod
+    def register(
+        cls, metric: Callable, offset: Tuple[int, int], base_penalty: Callable[[], float] = lambda: 0.0
+    ) -> Callable:
+        """Decorator registering the costs function of ``metric``'s kernel."""
+        if not cls.valid_offset(offset):
+            raise ValueError(f"Unsupported predecessor offset for metric {metric.__name__}: {offset}")
+
+        def decorator(costs: Callable) -> Callable:
+            cls._kernels[metric] = MetricKernel(costs, offset, base_penalty)
+            return costs
+
+        return decorator
+
+    @classmethod
+    def kernel(cls, metric: Callable) -> MetricKernel:
+        if metric not in cls._kernels:
+            raise ValueError(f"No vectorized form for metric: {metric.__name__}")
+        return cls._kernels[metric]
+
+    @staticmethod
+    def tables(scale: Callable) -> Optional[CostTables]:
+        return scale if isinstance(scale, CostTables) else None
+
+    @classmethod
+    def duration_ratio_costs(
+        cls, interval_costs: np.array, left_durations: np.array, right_durations: np.array, scale: Callable
+    ) -> np.array:
+        tables: Optional[CostTables] = cls.tables(scale)
+        if tables is not None:
+            costs: Optional[np.array] = tables.duration_ratio_costs(interval_costs, left_durations, right_durations)
+            if costs is not None:
+                return costs
+        return CostTables.combine_costs(
+            interval_costs,
+            np.maximum(left_durations, right_durations),
+            np.minimum(left_durations, right_durations),
+            scale,
+        )
+
+    @classmethod
+    def single_costs(cls, features: StackedFeatures, scale: Callable) -> np.array:
+        """Costs of inserting or deleting every single interval, rests being forbidden."""
+        interval_costs: np.array = np.abs(features.values)
+        tables: Optional[CostTables] = cls.tables(scale)
+        costs: Optional[np.array] = None if tables is None else tables.single_costs(interval_costs, features.durations)
+        if costs is None:
+            costs = CostTables.combine_costs(
+                interval_costs, features.durations, np.ones_like(features.durations), scale
+            )
+        return np.where(features.rests, np.inf, costs)
+
+    @classmethod
+    def interval_costs(cls, stream: StackedFeatures, pattern: StackedFeatures, scale: Callable) -> np.array:
+        """Replacement interval costs of every stream interval against every pattern interval."""
+        tables: Optional[CostTables] = cls.tables(scale)
+        if tables is not None:
+            stream_indices: Optional[np.array] = tables.interval_index(stream.values, stream.rests)
+            pattern_indices: Optional[np.array] = tables.interval_index(pattern.values, pattern.rests)
+            if stream_indices is not None and pattern_indices is not None:
+                return tables.interval_costs[stream_indices[..., :, None], pattern_indices[..., None, :]]
+        return CostTables.replacement_interval_costs(
+            stream.values[..., :, None],
+            stream.rests[..., :, None],
+            pattern.values[..., None, :],
+            pattern.rests[..., None, :],
+        )
+
+    @classmethod
+    def pair_costs(cls, pairs: StackedFeatures, singles: StackedFeatures, scale: Callable) -> np.array:
+        """Costs of matching the pairs of ``pairs`` against the singles of ``singles``, rests being forbidden."""
+        pair_values, pair_rests = pairs.pair_values[..., :, None], pairs.pair_rests[..., :, None]
+        pair_durations: np.array = pairs.pair_durations[..., :, None]
+        values, rests = singles.values[..., None, :], singles.rests[..., None, :]
+        durations: np.array = singles.durations[..., None, :]
+        costs: np.array = cls.duration_ratio_costs(np.abs(pair_values - values), pair_durations, durations, scale)
+        return np.where(pair_rests | rests, np.inf, costs)
+
+
+@MetricKernels.register(DistanceMetrics.replacement_with_penalty, (1, 1))
+def replacement_costs(stream: StackedFeatures, pattern: StackedFeatures, scale: Callable) -> np.array:
+    return MetricKernels.duration_ratio_costs(
+        MetricKernels.interval_costs(stream, pattern, scale),
+        stream.durations[..., :, None],
+        pattern.durations[..., None, :],
+        scale,
+    )
+
+
+@MetricKernels.register(
+    DistanceMetrics.insertion_without_expansion, (0, 1), lambda: DistanceMetrics.BASE_INSERTION_PENALTY
+)
+def insertion_costs(stream: StackedFeatures, pattern: StackedFeatures, scale: Callable) -> np.array:
+    return MetricKernels.single_costs(pattern, scale)[:, None, :]
+
+
+@MetricKernels.register(
+    DistanceMetrics.insertion_with_expansion, (1, 2), lambda: DistanceMetrics.BASE_INSERTION_PENALTY
+)
+def expansion_costs(stream: StackedFeatures, pattern: StackedFeatures, scale: Callable) -> np.array:
+    costs: np.array = np.full(stream.values.shape + pattern.values.shape[1:], np.inf)
+    costs[:, :, 1:] = np.swapaxes(MetricKernels.pair_costs(pattern, stream, scale), 1, 2)
+    return costs
+
+
+@MetricKernels.register(
+    DistanceMetrics.deletion_without_compression, (1, 0), lambda: DistanceMetrics.BASE_DELETION_PENALTY
+)
+def deletion_costs(stream: StackedFeatures, pattern: StackedFeatures, scale: Callable) -> np.array:
+    return MetricKernels.single_costs(stream, scale)[:, :, None]
+
+
+@MetricKernels.register(
+    DistanceMetrics.deletion_with_compression, (2, 1), lambda: DistanceMetrics.BASE_DELETION_PENALTY
+)
+def compression_costs(stream: StackedFeatures, pattern: StackedFeatures, scale: Callable) -> np.array:
+    costs: np.array = np.full(stream.values.shape + pattern.values.shape[1:], np.inf)
+    costs[:, 1:, :] = MetricKernels.pair_costs(stream, pattern, scale)
+    return costs
@@ -0,0 +1,123 @@
+from __future__ import annotations
+
+from dataclasses import dataclass
+from numbers import Real
+from typing import TYPE_CHECKING, List, Optional
+
+import numpy as np
+
+from model.constants import Transformation
+
+if TYPE_CHECKING:
+    from model.note_sequence import NoteSequence
+
+
+@dataclass(frozen=True)
+class SequenceFeatures:
+    """
+    Numeric cost features of a note sequence, built once and sliced into windows without copying.
+
+    ``intervals[k]`` is the integer interval between notes ``k`` and ``k + 1``, ``rests[k]`` is set when either
+    note is a rest (the interval is then stored as 0), ``durations[k]`` is the duration of note ``k`` in ticks,
+    as a float since diminution halves it.
+    The pair arrays hold sums of adjacent entries, as used by the expansion and compression metrics.
+    ``None`` intervals are converted here and never reach the matching core.
+    """
+
+    intervals: np.array
+    durations: np.array
+    rests: np.array
+    interval_pairs: np.array
+    duration_pairs: np.array
+    pair_rests: np.array
+
+    def __len__(self) -> int:
+        return len(self.durations)
+
+    @classmethod
+    def from_arrays(cls, intervals: np.array, rests: np.array, durations: np.array) -> SequenceFeatures:
+        intervals = np.where(rests, 0, intervals)
+        pair_rests: np.array = rests[:-1] | rests[1:]
+        return SequenceFeatures(
+            intervals,
+            durations,
+            rests,
+            np.where(pair_rests, 0, intervals[:-1] + intervals[1:]),
+            durations[:-1] + durations[1:],
+            pair_rests,
+        )
+
+    @classmethod
+    def from_values(cls, intervals: List[Optional[int]], durations: List[Real]) -> SequenceFeatures:
+        return cls.from_arrays(
+            np.array([0 if interval is None else interval for interval in intervals], dtype=np.int64),
+            np.array([interval is None for interval in intervals], dtype=bool),
+            np.asarray(durations, dtype=np.float64),
+        )
+
+    @classmethod
+    def from_sequence(cls, sequence: NoteSequence) -> SequenceFeatures:
+        """Built once per state of ``sequence``, as one of its views."""
+        return sequence.view(
+            "features",
+            lambda: cls.from_arrays(
+                sequence.interval_values(), sequence.interval_rests(), sequence.ticks.astype(np.float64)
+            ),
+        )
+
+    def window(self, low: int, high: int) -> SequenceFeatures:
+        """[low, high]"""
+        assert low >= 0
+        assert high < len(self)
+        return SequenceFeatures(
+            self.intervals[low:high],
+            self.durations[low : high + 1],
+            self.rests[low:high],
+            self.interval_pairs[low : max(low, high - 1)],
+            self.duration_pairs[low:high],
+            self.pair_rests[low : max(low, high - 1)],
+        )
+
+    def reversed(self) -> SequenceFeatures:
+        return SequenceFeatures(
+            self.intervals[::-1],
+            self.durations[::-1],
+            self.rests[::-1],
+            self.interval_pairs[::-1],
+            self.duration_pairs[::-1],
+            self.pair_rests[::-1],
+        )
+
+    def transformed(self, transformation: Transformation) -> SequenceFeatures:
+        """Numeric counterpart of ``TransformedSequence``."""
+        intervals, rests, durations = self.intervals, self.rests, self.durations
+        match transformation:
+            case Transformation.REVERSAL:
+                intervals, rests, durations = intervals[::-1], rests[::-1], durations[::-1]
+            case Transformation.INVERSION:
+                intervals = -intervals
+            case Transformation.REVERSAL_INVERSION:
+                intervals, rests, durations = -intervals[::-1], rests[::-1], durations[::-1]
+            case Transformation.AUGMENTATION:
+                durations = durations * 2
+            case Transformation.DIMINUTION:
+                durations = durations / 2
+            case Transformation.SCALING:
+                return self.ratio_encoded()
+        return SequenceFeatures.from_arrays(intervals, rests, durations)
+
+    def ratio_encoded(self) -> SequenceFeatures:
+        """
+        Durations as the ratio of the next duration to the current one, a difference of log-durations: scaling every
+        duration by the same factor leaves them unchanged. Pairs hold the ratio of the note after a pair to the pair.
+        The last duration and pair have no next note and are set to 1; the metrics never read them.
+        """
+        durations: np.array = np.ones(len(self.durations))
+        duration_pairs: np.array = np.ones(len(self.duration_pairs))
+        np.divide(self.durations[1:], self.durations[:-1], out=durations[:-1], where=self.durations[:-1] > 0)
+        np.divide(
+            self.durations[2:], self.duration_pairs[:-1], out=duration_pairs[:-1], where=self.duration_pairs[:-1] > 0
+        )
+        return SequenceFeatures(
+            self.intervals, durations, self.rests, self.interval_pairs, duration_pairs, self.pair_rests
+        )
@@ -1,9 +1,9 @@
 from __future__ import annotations
 
 import pprint
-from decimal import Decimal
-from itertools import accumulate, chain
-from typing import TYPE_CHECKING, Dict, Iterable, List, Tuple
+from typing import TYPE_CHECKING, Dict, List, Tuple
+
+import numpy as np
 
 if TYPE_CHECKING:
     from model.note import Note
@@ -44,25 +44,16 @@ class SkipSequence:
         for voice in voices.values():
             voice.optimize()
 
-        timestamp_sequences: Iterable[Iterable[Decimal]] = (
-            accumulate(
-                voice.notes,
-                lambda cur_timestamp, note: cur_timestamp + note.duration.raw_duration,
-                initial=Decimal("0.0"),
-            )
-            for voice in voices.values()
-        )
-        unique_timestamps: List[Decimal] = sorted(set(chain.from_iterable(timestamp_sequences)))
-        timestamp_by_idx: Dict[int, Decimal] = {timestamp: idx for idx, timestamp in enumerate(unique_timestamps)}
-
-        result: List[Dict[int, SkipNode]] = [dict() for _ in unique_timestamps]
+        timestamp_sequences: Dict[int, np.array] = {
+            voice_idx: np.concatenate(([0], np.cumsum(voice.ticks))) for voice_idx, voice in voices.items()
+        }
+        unique_timestamps: np.array = np.unique(np.concatenate(list(timestamp_sequences.values())))
+
+        result: List[Dict[int, SkipNode]] = [dict() for _ in range(len(unique_timestamps))]
         for voice_idx, note_sequence in voices.items():
-            cur_time = Decimal("0.0")
-            for i in range(len(voices[voice_idx])):
-                result[timestamp_by_idx[cur_time]][voice_idx] = SkipNode(
-                    note_sequence[i], timestamp_by_idx[cur_time + note_sequence[i].duration.raw_duration]
-                )
-                cur_time += note_sequence[i].duration.raw_duration
+            moments: List[int] = np.searchsorted(unique_timestamps, timestamp_sequences[voice_idx]).tolist()
+            for i, note in enumerate(note_sequence):
+                result[moments[i]][voice_idx] = SkipNode(note, moments[i + 1])
 
         return result
 
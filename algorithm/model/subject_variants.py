@@ -0,0 +1,96 @@
+from __future__ import annotations
+
+from collections import namedtuple
+from fractions import Fraction
+from typing import Callable, Dict, Iterable, Iterator
+
+import numpy as np
+
+from algorithm.model.distance_metrics import DistanceMetrics
+from algorithm.model.edit_window import EditWindow
+from algorithm.model.sequence_features import SequenceFeatures
+from model.constants import Transformation
+
+SubjectVariant = namedtuple("SubjectVariant", ("features", "reversed", "first_row", "reversed_first_row"))
+
+
+class SubjectVariants:
+    """
+    The subject under every requested transformation, built once per analysis and shared by all voices.
+
+    Each ``SubjectVariant`` holds the transformed features, the reversed features forward windows are matched
+    against, and memo row 0 of both under ``scaling_func``. All arrays are read-only.
+
+    ``Transformation.SCALING`` matches durations as ratios to the next one, alike for the stream, so a match is found
+    in one pass whatever its augmentation or diminution factor. The factor is then read off the match durations, and
+    the match reported as ``scaled(factor)``.
+    """
+
+    MAX_FACTOR_DENOMINATOR: int = 4
+
+    def __init__(
+        self, pattern: SequenceFeatures, transformations: Iterable[Transformation], scaling_func: Callable
+    ) -> None:
+        self.pattern: SequenceFeatures = pattern
+        self.scale: Callable = scaling_func
+        self._variants: Dict[Transformation, SubjectVariant] = {
+            transformation: self.build_variant(pattern, transformation, scaling_func)
+            for transformation in transformations
+        }
+
+    def __getitem__(self, transformation: Transformation) -> SubjectVariant:
+        return self._variants[transformation]
+
+    def __iter__(self) -> Iterator[Transformation]:
+        return iter(self._variants)
+
+    def __len__(self) -> int:
+        return len(self._variants)
+
+    @staticmethod
+    def scaled(factor: Fraction) -> str:
+        """Transformation reported for a ``Transformation.SCALING`` match at duration factor ``factor``."""
+        return f"{Transformation.SCALING}_{factor}"
+
+    def scaling_factor(self, stream: SequenceFeatures, start: int, end: int) -> Fraction:
+        """
+        Median duration ratio of stream notes [start, end) to the subject notes, as the nearest simple ratio.
+
+        Notes are paired from the start of both, over the shorter of the match and the subject, so that a partial
+        match is compared with the subject prefix it covers; the last paired note is left out, as it is often held.
+        """
+        count: int = max(1, min(end - start, len(self.pattern)) - 1)
+        ratios: np.array = stream.durations[start : start + count] / self.pattern.durations[:count]
+        return Fraction(float(np.median(ratios))).limit_denominator(self.MAX_FACTOR_DENOMINATOR)
+
+    def reported(self, transformation: Transformation, stream: SequenceFeatures, start: int, end: int) -> str:
+        """Transformation a match of stream notes [start, end) is reported as."""
+        if transformation != Transformation.SCALING:
+            return transformation
+        return self.scaled(self.scaling_factor(stream, start, end))
+
+    @classmethod
+    def build_variant(
+        cls, pattern: SequenceFeatures, transformation: Transformation, scaling_func: Callable
+    ) -> SubjectVariant:
+        """Reversed forms are transformed after reversal, as windows built by ``EditWindow.build`` are."""
+        features: SequenceFeatures = cls._frozen(pattern.transformed(transformation))
+        reversed_features: SequenceFeatures = cls._frozen(pattern.reversed().transformed(transformation))
+        return SubjectVariant(
+            features,
+            reversed_features,
+            cls._first_row(features, scaling_func),
+            cls._first_row(reversed_features, scaling_func),
+        )
+
+    @staticmethod
+    def _first_row(pattern: SequenceFeatures, scaling_func: Callable) -> np.array:
+        first_row: np.array = DistanceMetrics.insertion_row(EditWindow(pattern, pattern), scaling_func)
+        first_row.setflags(write=False)
+        return first_row
+
+    @staticmethod
+    def _frozen(features: SequenceFeatures) -> SequenceFeatures:
+        for values in vars(features).values():
+            values.setflags(write=False)
+        return features
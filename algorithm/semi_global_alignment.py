@@ -0,0 +1,146 @@
+from __future__ import annotations
+
+import logging
+import os
+from collections import namedtuple
+from typing import TYPE_CHECKING, Callable, List, Optional
+
+import numpy as np
+
+from algorithm.batched_edit_distance import BatchedEditDistance
+from algorithm.model.metric_kernels import StackedFeatures
+from algorithm.workspace_pool import WorkspacePool
+
+if TYPE_CHECKING:
+    from algorithm.model.cost_tables import CostTables
+    from algorithm.model.edit_window import EditWindow
+
+logger = logging.getLogger(os.path.basename(__file__))
+
+Alignment = namedtuple("Alignment", ("start", "end", "weight"))
+
+
+class SemiGlobalAlignment:
+    """
+    Sellers-style semi-global alignment of a pattern against whole streams, in a single O(L x P) pass per stream
+    instead of propagated windows. The stream start is free; each end row carries the start row of its best
+    alignment, so no traceback walk is needed. Weights are normalized as window weights are: the alignment cost
+    over its number of notes.
+
+    Memos are filled anti-diagonal by anti-diagonal as in ``BatchedEditDistance``, but ``BLOCK_ROWS`` stream rows
+    at a time: predecessors lie at most two rows back, so the last two rows of a block, and their starts, are carried
+    into the padding rows of the next one. Only the last column of every memo is kept, so memory is bounded by the
+    block and pattern lengths, whatever the stream length; every cell is computed as in one full pass.
+    """
+
+    BLOCK_ROWS: int = 512
+
+    def __init__(
+        self,
+        edit_windows: List[EditWindow],
+        metrics: List[Callable],
+        scaling_func: Callable,
+        tables: Optional[CostTables] = None,
+        workspace: Optional[WorkspacePool] = None,
+    ) -> None:
+        self.edit_windows: List[EditWindow] = edit_windows
+        self.metrics: List[Callable] = metrics
+        self.scale: Callable = BatchedEditDistance.vectorized_scale(scaling_func, tables)
+        self.workspace: WorkspacePool = WorkspacePool() if workspace is None else workspace
+        self._costs: List[np.array] = [np.full(len(edit_window.stream), np.inf) for edit_window in edit_windows]
+        self._starts: List[np.array] = [np.full(len(edit_window.stream), -1) for edit_window in edit_windows]
+        self._align()
+
+    def __len__(self) -> int:
+        return len(self.edit_windows)
+
+    def costs(self, idx: int) -> np.array:
+        """Last memo column of stream ``idx``: the cost of the best alignment of the whole pattern ending at each row."""
+        return self._costs[idx]
+
+    def starts(self, idx: int) -> np.array:
+        """Start row of the alignment ending at each row of stream ``idx``."""
+        return self._starts[idx]
+
+    def _align(self) -> None:
+        if len(self.edit_windows) == 0:
+            return
+        stream_lengths: List[int] = [len(edit_window.stream.intervals) for edit_window in self.edit_windows]
+        pattern_lengths: List[int] = [len(edit_window.pattern.intervals) for edit_window in self.edit_windows]
+        B, S, P = len(self.edit_windows), max(stream_lengths), max(pattern_lengths)
+        R: int = max(1, min(self.BLOCK_ROWS, S))
+        pad: int = BatchedEditDistance.PADDING
+        width: int = P + 1 + pad
+        memo: np.array = self.workspace.buffer("memo", (B, R + 1 + pad, width), fill=np.inf)
+        starts: np.array = self.workspace.buffer("starts", memo.shape, np.int64, fill=-1)
+        memo[:, pad:, pad] = 0.0
+        starts[:, pad, pad:] = 0
+        pattern: StackedFeatures = BatchedEditDistance.stack(
+            self.workspace, "pattern", [edit_window.pattern for edit_window in self.edit_windows], P
+        )
+        BatchedEditDistance.fill_first_rows(
+            memo, pattern, [edit_window.first_row for edit_window in self.edit_windows], self.scale
+        )
+        columns: np.array = pad + np.array(pattern_lengths)
+        self._keep(memo, starts, columns, 0, 1, 0)
+        flat_memo, flat_starts = memo.reshape(B, -1), starts.reshape(B, -1)
+        step: int = width - 1
+        batch: np.array = np.arange(B)[:, None]
+
+        for first in range(1, S + 1, R):
+            rows: int = min(R, S - first + 1)
+            lead: int = min(first - 1, 1)
+            stream: StackedFeatures = BatchedEditDistance.stack(
+                self.workspace,
+                "stream",
+                [
+                    edit_window.stream.window(min(first - 1 - lead, length), min(first - 1 + rows, length))
+                    for edit_window, length in zip(self.edit_windows, stream_lengths)
+                ],
+                R + lead,
+            )
+            costs, shifts, penalties = BatchedEditDistance.build_kernels(
+                self.workspace, self.metrics, stream, pattern, self.scale, memo.shape, lead
+            )
+            penalize: bool = bool(penalties.any())
+            memo[:, pad + 1 :, pad] = 0.0
+            starts[:, pad + 1 :, pad] = np.arange(first, first + R)
+            for d in range(2, rows + P + 1):
+                i_low, i_high = max(1, d - P), min(rows, d - 1)
+                start: int = (i_low + pad) * width + (d - i_low) + pad
+                stop: int = (i_high + pad) * width + (d - i_high) + pad + 1
+                cells: np.array = np.arange(start, stop, step)
+                candidates: np.array = flat_memo[:, cells - shifts[:, None]] + costs[:, :, start:stop:step]
+                if penalize:
+                    candidates += penalties[:, None]
+                predecessors: np.array = cells - shifts[np.argmin(candidates, axis=1)]
+                flat_starts[:, start:stop:step] = flat_starts[batch, predecessors]
+                flat_memo[:, start:stop:step] = candidates.min(axis=1)
+            self._keep(memo, starts, columns, first, rows, 1)
+            memo[:, pad - 1 : pad + 1] = memo[:, pad + rows - 1 : pad + rows + 1].copy()
+            starts[:, pad - 1 : pad + 1] = starts[:, pad + rows - 1 : pad + rows + 1].copy()
+
+    def _keep(self, memo: np.array, starts: np.array, columns: np.array, first: int, rows: int, row: int) -> None:
+        """Copies the last column of ``rows`` memo rows from ``row`` on, stream rows from ``first`` on."""
+        pad: int = BatchedEditDistance.PADDING
+        for idx, column in enumerate(columns):
+            count: int = max(0, min(rows, len(self._costs[idx]) - first))
+            self._costs[idx][first : first + count] = memo[idx, pad + row : pad + row + count, column]
+            self._starts[idx][first : first + count] = starts[idx, pad + row : pad + row + count, column]
+
+    def alignments(self, idx: int) -> List[Alignment]:
+        """
+        Best alignment of the whole pattern for every start note of stream ``idx``, as note indices [start, end],
+        ordered by start.
+        """
+        ends: np.array = np.arange(1, len(self._costs[idx]))
+        costs: np.array = self._costs[idx][1:]
+        starts: np.array = self._starts[idx][1:]
+        weights: np.array = costs / (ends - starts + 1)
+        order: np.array = np.lexsort((ends, weights, starts))
+        best: np.array = order[np.r_[True, starts[order][1:] != starts[order][:-1]]] if len(order) else order
+        return [
+            Alignment(int(starts[end_idx]), int(ends[end_idx]), float(weights[end_idx]))
+            for end_idx in best
+            if np.isfinite(weights[end_idx])
+        ]
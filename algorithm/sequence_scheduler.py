@@ -1,15 +1,15 @@
 from typing import List, Tuple
 from collections import namedtuple
 
-from model.note_sequence import NoteSequence
+from model.match_view import MatchView
 
 ScheduleItem = namedtuple("ScheduleItem", ("sequence_id", "weight", "start", "end"))
 
 
 class SequenceScheduler:
-    def __init__(self, weighted_sequences: List[Tuple[NoteSequence, float]]) -> None:
+    def __init__(self, weighted_sequences: List[Tuple[MatchView, float]]) -> None:
         assert len(weighted_sequences) > 0
-        self.weighted_sequences: List[Tuple[NoteSequence, float]] = weighted_sequences
+        self.weighted_sequences: List[Tuple[MatchView, float]] = weighted_sequences
         self._max_weight: float = max(match_info[1] for match_info in self.weighted_sequences)
 
     def _compute_memo(self, items: List[ScheduleItem]) -> List[int]:
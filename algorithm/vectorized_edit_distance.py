@@ -0,0 +1,22 @@
+from __future__ import annotations
+
+import logging
+import os
+
+import numpy as np
+
+from algorithm.adaptive_edit_distance import AdaptiveEditDistance
+from algorithm.batched_edit_distance import BatchedEditDistance
+
+logger = logging.getLogger(os.path.basename(__file__))
+
+
+class VectorizedEditDistance(AdaptiveEditDistance):
+    """NumPy engine producing the same memo as ``AdaptiveEditDistance``, as a batch of one window."""
+
+    def _compute_memo(self) -> np.array:
+        batch: BatchedEditDistance = BatchedEditDistance(
+            [self.edit_window], self.metrics, self.scale, [self.previous], [self.cutoff], workspace=self.workspace
+        )
+        self.reused_rows, self.skipped_cells = batch.reused_rows[0], batch.skipped_cells[0]
+        return batch.memo(0)
@@ -0,0 +1,57 @@
+from __future__ import annotations
+
+import logging
+import math
+import os
+from typing import Any, Dict, Optional, Tuple
+
+import numpy as np
+
+logger = logging.getLogger(os.path.basename(__file__))
+
+
+class WorkspacePool:
+    """
+    Named NumPy buffers reused across edit distance computations.
+
+    Each name owns one flat buffer, grown to the largest size requested under it; a request returns a view of its
+    leading cells, so once the largest window has been seen matching allocates no new buffers. Views returned under
+    a name are only valid until the next request under that name: results kept any longer must be copied out.
+    """
+
+    def __init__(self) -> None:
+        self._buffers: Dict[str, np.array] = dict()
+        self.allocations: int = 0
+        self.reuses: int = 0
+
+    def __len__(self) -> int:
+        return len(self._buffers)
+
+    @property
+    def allocated_bytes(self) -> int:
+        return sum(flat.nbytes for flat in self._buffers.values())
+
+    def buffer(
+        self, name: str, shape: Tuple[int, ...], dtype: Any = np.float64, fill: Optional[Any] = None
+    ) -> np.array:
+        size: int = math.prod(shape)
+        flat: Optional[np.array] = self._buffers.get(name)
+        if flat is None or flat.dtype != np.dtype(dtype) or flat.size < size:
+            capacity: int = size if flat is None or flat.dtype != np.dtype(dtype) else max(size, 2 * flat.size)
+            flat = self._buffers[name] = np.empty(capacity, dtype=dtype)
+            self.allocations += 1
+        else:
+            self.reuses += 1
+        view: np.array = flat[:size].reshape(shape)
+        if fill is not None:
+            view.fill(fill)
+        return view
+
+    def keep(self, name: str, values: np.array) -> np.array:
+        """Copies ``values`` into the buffer ``name``, to outlive the buffer they are a view of."""
+        kept: np.array = self.buffer(name, values.shape, values.dtype)
+        np.copyto(kept, values)
+        return kept
+
+    def log_counters(self) -> None:
+        logger.debug(f"WORKSPACE: {self.allocations} allocations, {self.reuses} reuses, {self.allocated_bytes} bytes")
@@ -9,9 +9,12 @@ from typing import Dict, List, Tuple, Set
 
 import numpy as np
 
+from algorithm.model.candidate_table import CandidateTable
 from config import get_config
-from model.constants import Transformation
+from model.constants import EditDistanceEngine, MatchingStrategy, Prefilter, Transformation
+from model.match_view import MatchView
 from model.note_sequence import NoteSequence
+from utility.tracer import Tracer
 from workers.encoders.musicxml.musicxml_encoder import MusicXMLEncoder
 from workers.fugue_analyzer import FugueAnalyzer
 from workers.parsers.musicxml.musicxml_parser import MusicXMLParser
@@ -44,6 +47,8 @@ def get_transformations(args) -> Set[Transformation]:
         transformations.add(Transformation.AUGMENTATION)
     if args.diminution:
         transformations.add(Transformation.DIMINUTION)
+    if args.scaling:
+        transformations.add(Transformation.SCALING)
     if args.all:
         transformations |= {
             Transformation.INVERSION,
@@ -65,10 +70,79 @@ def parse_args():
     )
     parser.add_argument("--augmentation", "--aug", action="store_true", help="Enable subject augmentation detection.")
     parser.add_argument("--diminution", "--dim", action="store_true", help="Enable subject diminution detection.")
-    parser.add_argument("--all", action="store_true", help="Enable all subject transformation detection.")
+    parser.add_argument(
+        "--scaling",
+        action="store_true",
+        help="Enable ratio-invariant subject detection, augmented or diminished by any factor, reported per match.",
+    )
+    parser.add_argument(
+        "--all",
+        action="store_true",
+        help="Enable all subject transformation detection but --scaling, which also matches the unscaled subject.",
+    )
+    parser.add_argument(
+        "--engine",
+        type=str.upper,
+        choices=(EditDistanceEngine.PYTHON, EditDistanceEngine.NUMPY),
+        default=EditDistanceEngine.NUMPY,
+        help="Edit distance engine used for window matching.",
+    )
+    parser.add_argument(
+        "--strategy",
+        type=str.upper,
+        choices=(MatchingStrategy.WINDOWED, MatchingStrategy.SEMI_GLOBAL),
+        default=MatchingStrategy.WINDOWED,
+        help="Subject matching strategy: propagated windows or one semi-global alignment per voice.",
+    )
+    parser.add_argument(
+        "--cutoff",
+        action="store_true",
+        help="Skip edit distance cells of pulled back windows that cannot change their traceback (python engine only).",
+    )
+    parser.add_argument(
+        "--prefilter",
+        type=str.upper,
+        nargs="?",
+        choices=(Prefilter.NONE, Prefilter.SCAN, Prefilter.SEEDS),
+        const=Prefilter.SCAN,
+        default=Prefilter.NONE,
+        help="Only propagate windows in voice regions that may hold the whole subject within the sensitivity, found "
+        "by an interval scan or from interval n-gram seed hits (faster), and only accept windows matching the whole "
+        "subject.",
+    )
+    parser.add_argument(
+        "--jobs",
+        type=int,
+        default=1,
+        help="Number of processes propagating windows, split by voice, transformation and stream segment "
+        "(same output as a single process; the semi-global strategy and tracing run in one process).",
+    )
+    parser.add_argument(
+        "--sweep-sensitivity",
+        type=float,
+        nargs="+",
+        default=None,
+        help="Sensitivities to report match counts for, from one table of candidates, or one per sensitivity with "
+        "--prefilter (windows run in one process).",
+    )
+    parser.add_argument(
+        "--sweep-min-match",
+        type=int,
+        nargs="+",
+        default=None,
+        help="Min matches to report match counts for, from the tables of candidates of the swept sensitivities "
+        "(windows run in one process).",
+    )
+    parser.add_argument("--trace", type=str, default=None, help="Path to a binary trace of every matched window.")
+    parser.add_argument(
+        "--trace-memos", action="store_true", help="Dump the memo of every traced window as .npy next to the trace."
+    )
     parser.add_argument("--debug", action="store_true", help="Toggle debug mode for logging.")
     parser.add_argument("--logfile", type=str, default="log.txt", help="Path to log file for stdout and stderr.")
-    return parser.parse_args()
+    args = parser.parse_args()
+    if args.cutoff and args.engine != EditDistanceEngine.PYTHON:
+        parser.error("--cutoff requires --engine=python")
+    return args
 
 
 if __name__ == "__main__":
@@ -82,9 +156,34 @@ if __name__ == "__main__":
 
     t0 = time()
 
-    analyzer: FugueAnalyzer = FugueAnalyzer(composition, float(config["sensitivity"]), int(config["min-match"]))
+    analyzer: FugueAnalyzer = FugueAnalyzer(
+        composition,
+        float(config["sensitivity"]),
+        int(config["min-match"]),
+        args.engine,
+        args.cutoff,
+        args.strategy,
+        args.prefilter,
+        args.jobs,
+    )
+    if args.trace is not None:
+        Tracer.open(args.trace, memos=args.trace_memos)
     subject: NoteSequence = analyzer.extract_subject()
-    matches: Dict[int, List[Tuple[NoteSequence, Transformation]]] = analyzer.match_subject(subject, transformations)
+    if args.sweep_sensitivity is None and args.sweep_min_match is None:
+        matches: Dict[int, List[Tuple[MatchView, Transformation]]] = analyzer.match_subject(subject, transformations)
+    else:
+        sensitivities: List[float] = args.sweep_sensitivity or [analyzer.sensitivity]
+        min_matches: List[int] = args.sweep_min_match or [analyzer.min_match]
+        tables: Dict[float, CandidateTable] = analyzer.candidate_tables(
+            subject, transformations, list(dict.fromkeys(sensitivities + [analyzer.sensitivity]))
+        )
+        grid = FugueAnalyzer.sweep({sensitivity: tables[sensitivity] for sensitivity in sensitivities}, min_matches)
+        for (sensitivity, min_match), grid_matches in grid.items():
+            print(f"Sensitivity {sensitivity}, min match {min_match}: {sum(map(len, grid_matches.values()))} matches")
+        matches = FugueAnalyzer.sweep({analyzer.sensitivity: tables[analyzer.sensitivity]}, [analyzer.min_match])[
+            (analyzer.sensitivity, analyzer.min_match)
+        ]
+    Tracer.close()
 
     logger.debug(f"Total time: {round(time() - t0, 5)}")
 
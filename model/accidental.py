@@ -3,6 +3,8 @@ from typing import Optional
 
 
 class Accidental:
+    __slots__ = ("alter",)
+
     ALTER_MAP = {
         -3: AccidentalSymbol.TripleFlat,
         -2: AccidentalSymbol.DoubleFlat,
@@ -47,3 +47,31 @@ class Transformation:
     REVERSAL_INVERSION = "REVERSAL_INVERSION"
     AUGMENTATION = "AUGMENTATION"
     DIMINUTION = "DIMINUTION"
+    SCALING = "SCALING"
+
+
+@dataclass(frozen=True)
+class MatchingStrategy:
+    WINDOWED = "WINDOWED"
+    SEMI_GLOBAL = "SEMI_GLOBAL"
+
+
+@dataclass(frozen=True)
+class Prefilter:
+    NONE = "NONE"
+    SCAN = "SCAN"
+    SEEDS = "SEEDS"
+
+
+@dataclass(frozen=True)
+class TraceEvent:
+    WINDOW = 0
+    MATCHED = 1
+    SKIPPED = 2
+    NOT_FOUND = 3
+
+
+@dataclass(frozen=True)
+class EditDistanceEngine:
+    PYTHON = "PYTHON"
+    NUMPY = "NUMPY"
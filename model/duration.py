@@ -1,13 +1,26 @@
 from __future__ import annotations
 
 from decimal import Decimal
-from typing import List
+from functools import lru_cache
+from typing import Dict, Tuple
 
 from model.constants import RawDuration
 
 
 class Duration:
-    SCALE: Decimal = Decimal("1")
+    """
+    An immutable duration in integer ticks, ``SCALE`` ticks making a quarter note.
+
+    Durations are interned: there is one instance per distinct tick count, so building and adding durations costs
+    an integer add and a dict lookup. Arithmetic stays on ints; ``real_duration`` and the decomposition into
+    ``parts``, real partitions in quarter notes, are only for display. The decomposition is computed on first use
+    and cached per tick count and scale; it counts in ``UNITS_PER_QUARTER``-ths of a tick, which the smallest
+    partition divides.
+    """
+
+    __slots__ = ("raw_duration",)
+
+    SCALE: int = 1
     PARTITIONS = (
         RawDuration.NoteWhole,
         RawDuration.NoteHalf,
@@ -17,41 +30,70 @@ class Duration:
         RawDuration.Note32th,
         RawDuration.Note64th,
     )
+    UNITS_PER_QUARTER: int = 16
+    PARTITION_UNITS = (64, 32, 16, 8, 4, 2, 1)
+
+    _interned: Dict[int, Duration] = dict()
+
+    def __new__(cls, raw_duration: int) -> Duration:
+        raw_duration = int(raw_duration)
+        duration: Duration = cls._interned.get(raw_duration)
+        if duration is None:
+            duration = cls._interned[raw_duration] = super().__new__(cls)
+            object.__setattr__(duration, "raw_duration", raw_duration)
+        return duration
 
-    def __init__(self, raw_duration: Decimal) -> None:
-        self.raw_duration: Decimal = raw_duration
-        self.parts: List[Decimal] = self._build_parts(raw_duration)
+    def __setattr__(self, name: str, value) -> None:
+        raise AttributeError(f"{type(self).__name__} is immutable")
+
+    def __reduce__(self) -> Tuple:
+        return Duration, (self.raw_duration,)
+
+    def __eq__(self, other: object) -> bool:
+        return isinstance(other, Duration) and self.raw_duration == other.raw_duration
+
+    def __hash__(self) -> int:
+        return hash(self.raw_duration)
 
     def __add__(self, other: Duration) -> Duration:
         return Duration(self.raw_duration + other.raw_duration)
 
     def __sub__(self, other: Duration) -> Duration:
-        return Duration((self.raw_duration - other.raw_duration).abs())
+        return Duration(abs(self.raw_duration - other.raw_duration))
 
     def __repr__(self) -> str:
-        def format_ratio(numerator: int, denominator: int) -> str:
-            return str(numerator) if denominator == 1 else f"{numerator}/{denominator}"
-
-        return "+".join(format_ratio(*(part / Duration.SCALE).as_integer_ratio()) for part in self.parts)
+        return self._format(self.raw_duration, Duration.SCALE)
 
     @staticmethod
-    def set_scale(value: Decimal) -> None:
+    def set_scale(value: int) -> None:
         Duration.SCALE = value
 
     @property
     def real_duration(self) -> Decimal:
-        return self.raw_duration / Duration.SCALE
+        return Decimal(self.raw_duration) / Duration.SCALE
+
+    @property
+    def parts(self) -> Tuple[Decimal, ...]:
+        return self._build_parts(self.raw_duration, Duration.SCALE)
 
     @property
     def is_compound(self):
         return len(self.parts) > 1
 
-    def _build_parts(cls, raw_duration: Decimal) -> List[RawDuration]:
+    @classmethod
+    @lru_cache(maxsize=None)
+    def _format(cls, raw_duration: int, scale: int) -> str:
+        def format_ratio(numerator: int, denominator: int) -> str:
+            return str(numerator) if denominator == 1 else f"{numerator}/{denominator}"
+
+        return "+".join(format_ratio(*part.as_integer_ratio()) for part in cls._build_parts(raw_duration, scale))
+
+    @classmethod
+    @lru_cache(maxsize=None)
+    def _build_parts(cls, raw_duration: int, scale: int) -> Tuple[Decimal, ...]:
         parts = list()
-        for real_partition in cls.PARTITIONS:
-            scaled_partition = real_partition * Duration.SCALE
-            if real_partition <= raw_duration:
-                count: Decimal = raw_duration // scaled_partition
-                raw_duration -= count * scaled_partition
-                parts.extend([scaled_partition for _ in range(int(count))])
-        return parts
+        remaining: int = raw_duration * cls.UNITS_PER_QUARTER
+        for real_partition, partition_units in zip(cls.PARTITIONS, cls.PARTITION_UNITS):
+            count, remaining = divmod(remaining, partition_units * scale)
+            parts.extend([real_partition] * count)
+        return tuple(parts)
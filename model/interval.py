@@ -6,6 +6,8 @@ if TYPE_CHECKING:
 
 
 class Interval:
+    __slots__ = ("value",)
+
     def __init__(self, left_position: Position, right_position: Position) -> None:
         self.value: int = right_position.abs_position - left_position.abs_position
 
@@ -0,0 +1,71 @@
+from __future__ import annotations
+
+from typing import TYPE_CHECKING, Iterator, List, Optional
+
+import numpy as np
+
+if TYPE_CHECKING:
+    from model.note import Note
+    from model.note_sequence import NoteSequence
+
+
+class MatchView:
+    """
+    Zero-copy match: notes [start, end) of the stream of voice ``voice``.
+
+    Provides the read-only ``NoteSequence`` accessors used on matches from the stream's columns; notes are only
+    materialized when indexed or iterated, and ``materialize`` copies the match into a ``NoteSequence`` of its own.
+    A view is valid as long as its stream is left unchanged.
+    """
+
+    __slots__ = ("stream", "voice", "start", "end")
+
+    def __init__(self, stream: NoteSequence, start: int, end: int, voice: Optional[int] = None) -> None:
+        assert 0 <= start <= end <= len(stream)
+        self.stream: NoteSequence = stream
+        self.voice: Optional[int] = voice
+        self.start: int = start
+        self.end: int = end
+
+    def __len__(self) -> int:
+        return self.end - self.start
+
+    def __getitem__(self, idx: int) -> Note:
+        if idx < 0:
+            idx += len(self)
+        if not 0 <= idx < len(self):
+            raise IndexError("match index out of range")
+        return self.stream[self.start + idx]
+
+    def __iter__(self) -> Iterator[Note]:
+        return (self.stream[idx] for idx in range(self.start, self.end))
+
+    def __repr__(self) -> str:
+        return f"MatchView(voice={self.voice}, [{self.start}, {self.end}))"
+
+    @property
+    def notes(self) -> List[Note]:
+        return list(self)
+
+    @property
+    def rests(self) -> np.array:
+        return self.stream.rests[self.start : self.end]
+
+    @property
+    def first_note(self) -> Note:
+        return self[int(np.flatnonzero(~self.rests)[0])]
+
+    @property
+    def last_note(self) -> Note:
+        return self[int(np.flatnonzero(~self.rests)[-1])]
+
+    @property
+    def raw_intervals(self) -> List[Optional[int]]:
+        return self.stream.raw_intervals_range(self.start, self.end - 1) if len(self) else list()
+
+    @property
+    def raw_durations(self) -> List[int]:
+        return self.stream.ticks[self.start : self.end].tolist()
+
+    def materialize(self) -> NoteSequence:
+        return self.stream[self.start : self.end]
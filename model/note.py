@@ -1,13 +1,14 @@
 from __future__ import annotations
 
-from decimal import Decimal
-from typing import Optional
+from typing import Optional, Tuple
 
 from model.duration import Duration
 from model.position import Position
 
 
 class Note:
+    __slots__ = ("position", "duration")
+
     def __init__(self, position: Optional[Position], duration: Duration) -> None:
         self.position: Optional[Position] = position
         self.duration: Duration = duration
@@ -15,11 +16,17 @@ class Note:
     def __repr__(self) -> str:
         return f"{'Rest' if self.is_rest() else 'Note'}({self.position}{{{self.duration}}})"
 
+    def _key(self) -> Tuple:
+        return type(self), self.position, self.duration
+
+    def __eq__(self, other: object) -> bool:
+        return isinstance(other, Note) and self._key() == other._key()
+
     def __hash__(self) -> int:
-        return hash(repr(self))
+        return hash(self._key())
 
     @classmethod
-    def from_raw(cls, abs_position: Optional[int], raw_duration: Decimal) -> Note:
+    def from_raw(cls, abs_position: Optional[int], raw_duration: int) -> Note:
         return cls(None if abs_position is None else Position(abs_position), Duration(raw_duration))
 
     def is_rest(self):
@@ -6,6 +6,8 @@ from typing import Optional
 
 
 class NoteName:
+    __slots__ = ("name", "accidental")
+
     NAME_MAP = {
         BaseNoteName.C: 0,
         BaseNoteName.D: 2,
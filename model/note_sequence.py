@@ -1,35 +1,144 @@
 from __future__ import annotations
 
-from decimal import Decimal
-from typing import TYPE_CHECKING, List, Optional
+from collections import namedtuple
+from typing import TYPE_CHECKING, Any, Callable, Dict, Iterable, Iterator, List, Optional, Union
 
+import numpy as np
+
+from model.duration import Duration
 from model.note import Note
+from model.position import Position
+from model.tagged.note import TaggedNote
 
 if TYPE_CHECKING:
-    from model.duration import Duration
     from model.interval import Interval
 
+ViewStats = namedtuple("ViewStats", ("hits", "misses"))
+
 
 class NoteSequence:
-    def __init__(self, notes: List[Note] = None) -> None:
-        self.notes: List[Note] = notes or list()
+    """
+    Columnar note sequence.
+
+    ``pitches`` holds absolute positions (``REST`` for rests), ``ticks`` the tick durations and ``rests`` the rest
+    mask; the ids of note ``k`` are ``note_ids[id_offsets[k] : id_offsets[k + 1]]``, an empty range marking an
+    untagged note. Columns grow by doubling on append, and ``Note`` objects are only materialized by indexing.
+
+    Derived views (interval and duration lists, first and last notes, features) are built once through ``view``
+    and dropped whenever the sequence changes; they are shared, so callers must not modify them.
+    """
+
+    REST: int = np.iinfo(np.int16).min
+    INITIAL_CAPACITY: int = 16
 
-    def __getitem__(self, idx) -> Note:
-        return self.notes[idx]
+    def __init__(self, notes: Iterable[Note] = None) -> None:
+        self._length: int = 0
+        self._id_count: int = 0
+        self._pitches: np.array = np.empty(self.INITIAL_CAPACITY, dtype=np.int16)
+        self._ticks: np.array = np.empty(self.INITIAL_CAPACITY, dtype=np.int64)
+        self._rests: np.array = np.empty(self.INITIAL_CAPACITY, dtype=bool)
+        self._id_offsets: np.array = np.zeros(self.INITIAL_CAPACITY + 1, dtype=np.int64)
+        self._note_ids: np.array = np.empty(self.INITIAL_CAPACITY, dtype=np.int64)
+        self._views: Dict[str, Any] = dict()
+        self.view_hits: int = 0
+        self.view_misses: int = 0
+        for note in notes or ():
+            self.append_note(note)
+
+    @classmethod
+    def from_columns(
+        cls, pitches: np.array, ticks: np.array, rests: np.array, note_ids: np.array, id_offsets: np.array
+    ) -> NoteSequence:
+        """Sequence owning the given columns; ``id_offsets`` may start anywhere in ``note_ids``."""
+        sequence: NoteSequence = cls()
+        sequence._length, sequence._id_count = len(pitches), int(id_offsets[-1] - id_offsets[0])
+        sequence._pitches, sequence._ticks, sequence._rests = pitches, ticks, rests
+        sequence._note_ids = note_ids[id_offsets[0] : id_offsets[-1]]
+        sequence._id_offsets = id_offsets - id_offsets[0] if id_offsets[0] else id_offsets
+        return sequence
+
+    def __getitem__(self, idx: Union[int, slice]) -> Union[Note, NoteSequence]:
+        if isinstance(idx, slice):
+            low, high, step = idx.indices(self._length)
+            assert step == 1, "Note sequences only slice contiguously!"
+            high = max(low, high)
+            return NoteSequence.from_columns(
+                self.pitches[low:high].copy(),
+                self.ticks[low:high].copy(),
+                self.rests[low:high].copy(),
+                self.note_ids[self.id_offsets[low] : self.id_offsets[high]].copy(),
+                self.id_offsets[low : high + 1] - self.id_offsets[low],
+            )
+        if idx < 0:
+            idx += self._length
+        if not 0 <= idx < self._length:
+            raise IndexError("note sequence index out of range")
+        position: Optional[Position] = None if self._rests[idx] else Position(int(self._pitches[idx]))
+        duration: Duration = Duration(self._ticks[idx])
+        if self._id_offsets[idx] == self._id_offsets[idx + 1]:
+            return Note(position, duration)
+        return TaggedNote(
+            position, duration, self._note_ids[self._id_offsets[idx] : self._id_offsets[idx + 1]].tolist()
+        )
+
+    def __iter__(self) -> Iterator[Note]:
+        return (self[idx] for idx in range(self._length))
 
     def __len__(self) -> int:
-        return len(self.notes)
+        return self._length
 
     def __add__(self, other: NoteSequence) -> NoteSequence:
-        return NoteSequence(self.notes + other.notes)
+        result: NoteSequence = self[:]
+        result.extend_notes(other)
+        return result
+
+    @property
+    def view_stats(self) -> ViewStats:
+        return ViewStats(self.view_hits, self.view_misses)
+
+    def view(self, name: str, build: Callable[[], Any]) -> Any:
+        """Derived view ``name``, built by ``build`` on first use and kept until the sequence changes."""
+        if name in self._views:
+            self.view_hits += 1
+            return self._views[name]
+        self.view_misses += 1
+        self._views[name] = build()
+        return self._views[name]
+
+    def _invalidate(self) -> None:
+        self._views.clear()
+
+    @property
+    def pitches(self) -> np.array:
+        return self._pitches[: self._length]
+
+    @property
+    def ticks(self) -> np.array:
+        return self._ticks[: self._length]
+
+    @property
+    def rests(self) -> np.array:
+        return self._rests[: self._length]
+
+    @property
+    def id_offsets(self) -> np.array:
+        return self._id_offsets[: self._length + 1]
+
+    @property
+    def note_ids(self) -> np.array:
+        return self._note_ids[: self._id_count]
+
+    @property
+    def notes(self) -> List[Note]:
+        return list(self)
 
     @property
     def first_note(self) -> Note:
-        return next(note for note in self.notes if not note.is_rest())
+        return self.view("first_note", lambda: self[int(np.flatnonzero(~self.rests)[0])])
 
     @property
     def last_note(self) -> Note:
-        return next(note for note in reversed(self.notes) if not note.is_rest())
+        return self.view("last_note", lambda: self[int(np.flatnonzero(~self.rests)[-1])])
 
     @property
     def intervals(self) -> List[Optional[Interval]]:
@@ -38,85 +147,133 @@ class NoteSequence:
                 return None
             return right_note.position - left_note.position
 
-        return [parse(self.notes[i - 1], self.notes[i]) for i in range(1, len(self.notes))]
+        def build() -> List[Optional[Interval]]:
+            notes: List[Note] = self.notes
+            return [parse(notes[i - 1], notes[i]) for i in range(1, len(notes))]
+
+        return self.view("intervals", build)
 
     @property
     def durations(self) -> List[Duration]:
-        return [self.notes[i].duration for i in range(len(self.notes))]
+        return self.view("durations", lambda: [Duration(ticks) for ticks in self.ticks.tolist()])
+
+    def interval_values(self, low: int = 0, high: Optional[int] = None) -> np.array:
+        """Intervals between notes [low, high] as int64, 0 where either note is a rest."""
+        high = self._length - 1 if high is None else high
+        pitches: np.array = self.pitches[low : high + 1].astype(np.int64)
+        return np.where(self.interval_rests(low, high), 0, np.diff(pitches))
+
+    def interval_rests(self, low: int = 0, high: Optional[int] = None) -> np.array:
+        """Whether either note of each interval between notes [low, high] is a rest."""
+        high = self._length - 1 if high is None else high
+        rests: np.array = self.rests[low : high + 1]
+        return rests[:-1] | rests[1:]
 
     @property
     def raw_intervals(self) -> List[Optional[int]]:
-        def parse(left_note: Note, right_note: Note) -> Optional[int]:
-            if left_note.is_rest() or right_note.is_rest():
-                return None
-            return (right_note.position - left_note.position).value
-
-        return [parse(self.notes[i - 1], self.notes[i]) for i in range(1, len(self.notes))]
+        return self.view(
+            "raw_intervals", lambda: self.raw_intervals_range(0, self._length - 1) if self._length else list()
+        )
 
     @property
-    def raw_durations(self) -> List[Decimal]:
-        return [self.notes[i].duration.raw_duration for i in range(len(self.notes))]
+    def raw_durations(self) -> List[int]:
+        return self.view("raw_durations", self.ticks.tolist)
 
     def raw_intervals_range(self, low: int, high: int) -> List[Optional[int]]:
         """[low, high]"""
         assert low >= 0
-        assert high < len(self.notes)
+        assert high < self._length
+        return [
+            None if rest else interval
+            for interval, rest in zip(self.interval_values(low, high).tolist(), self.interval_rests(low, high).tolist())
+        ]
 
-        def parse(left_note: Note, right_note: Note) -> Optional[int]:
-            if left_note.is_rest() or right_note.is_rest():
-                return None
-            return (right_note.position - left_note.position).value
-
-        return [parse(self.notes[i - 1], self.notes[i]) for i in range(low + 1, high + 1)]
-
-    def raw_durations_range(self, low: int, high: int) -> List[Decimal]:
+    def raw_durations_range(self, low: int, high: int) -> List[int]:
         """[low, high]"""
         assert low >= 0
-        assert high < len(self.notes)
-        return [self.notes[i].duration.raw_duration for i in range(low, high + 1)]
+        assert high < self._length
+        return self.ticks[low : high + 1].tolist()
+
+    def _reserve(self, note_count: int, id_count: int) -> None:
+        if self._length + note_count > len(self._pitches):
+            capacity: int = max(self._length + note_count, 2 * len(self._pitches))
+            self._pitches = np.resize(self._pitches, capacity)
+            self._ticks = np.resize(self._ticks, capacity)
+            self._rests = np.resize(self._rests, capacity)
+            self._id_offsets = np.resize(self._id_offsets, capacity + 1)
+        if self._id_count + id_count > len(self._note_ids):
+            self._note_ids = np.resize(self._note_ids, max(self._id_count + id_count, 2 * len(self._note_ids)))
 
     def append_note(self, note: Note) -> None:
-        self.notes.append(note)
+        ids: List[int] = note.ids if note.is_tagged() else list()
+        self._reserve(1, len(ids))
+        idx: int = self._length
+        self._pitches[idx] = self.REST if note.is_rest() else note.position.abs_position
+        self._ticks[idx] = note.duration.raw_duration
+        self._rests[idx] = note.is_rest()
+        self._note_ids[self._id_count : self._id_count + len(ids)] = ids
+        self._id_count += len(ids)
+        self._id_offsets[idx + 1] = self._id_count
+        self._length += 1
+        self._invalidate()
 
     def extend_notes(self, other: NoteSequence) -> None:
-        self.notes.extend(other.notes)
+        self._reserve(len(other), len(other.note_ids))
+        low, high = self._length, self._length + len(other)
+        self._pitches[low:high], self._ticks[low:high], self._rests[low:high] = other.pitches, other.ticks, other.rests
+        self._note_ids[self._id_count : self._id_count + len(other.note_ids)] = other.note_ids
+        self._id_offsets[low + 1 : high + 1] = other.id_offsets[1:] + self._id_count
+        self._length, self._id_count = high, self._id_count + len(other.note_ids)
+        self._invalidate()
 
     def merge_last_note(self, other: Note) -> None:
-        self.notes[-1].extend_duration(other)
+        """Extends the last note by ``other``, which must share its position, as a tie does."""
+        idx: int = self._length - 1
+        assert self._rests[idx] == other.is_rest()
+        assert other.is_rest() or self._pitches[idx] == other.position.abs_position
+        ids: List[int] = other.ids if other.is_tagged() else list()
+        self._reserve(0, len(ids))
+        self._ticks[idx] += other.duration.raw_duration
+        self._note_ids[self._id_count : self._id_count + len(ids)] = ids
+        self._id_count += len(ids)
+        self._id_offsets[idx + 1] = self._id_count
+        self._invalidate()
 
     def next_note_idx(self, start: int = 0) -> Optional[int]:
-        ref = start + 1
-        while ref < len(self.notes):
-            if not self.notes[ref].is_rest():
-                return ref
-            ref += 1
-        return None
+        notes: np.array = np.flatnonzero(~self.rests[start + 1 :])
+        return None if len(notes) == 0 else start + 1 + int(notes[0])
 
     def next_rest_idx(self, start: int = 0) -> Optional[int]:
-        ref = start + 1
-        while ref < len(self.notes):
-            if self.notes[ref].is_rest():
-                return ref
-            ref += 1
-        return None
+        rests: np.array = np.flatnonzero(self.rests[start + 1 :])
+        return None if len(rests) == 0 else start + 1 + int(rests[0])
 
     def lstrip_rests(self) -> None:
         strip_idx = self.next_note_idx(0)
-        if not self.notes[0].is_rest() and strip_idx == 1:
+        if not self._rests[0] and strip_idx == 1:
             return
-        del self.notes[:strip_idx]
+        self._replace(NoteSequence() if strip_idx is None else self[strip_idx:])
+
+    def _replace(self, other: NoteSequence) -> None:
+        self._length, self._id_count = other._length, other._id_count
+        self._pitches, self._ticks, self._rests = other._pitches, other._ticks, other._rests
+        self._id_offsets, self._note_ids = other._id_offsets, other._note_ids
+        self._invalidate()
 
     def optimize(self) -> NoteSequence:
-        if len(self.notes) <= 0:
+        """Merges consecutive rests that are either all tagged or all untagged."""
+        if self._length <= 0:
             return self
-        result: List[Note] = [self.notes[0]]
-        for i in range(1, len(self.notes)):
-            if self.notes[i].is_rest() and result[-1].is_rest():
-                if self.notes[i].is_tagged() == result[-1].is_tagged():
-                    result[-1].extend_duration(self.notes[i])
-                else:
-                    result.append(self.notes[i])
-            else:
-                result.append(self.notes[i])
-        self.notes = result
+        rests, id_offsets = self.rests, self.id_offsets
+        tagged: np.array = id_offsets[1:] > id_offsets[:-1]
+        merged: np.array = rests[1:] & rests[:-1] & (tagged[1:] == tagged[:-1])
+        starts: np.array = np.flatnonzero(np.concatenate(([True], ~merged)))
+        self._replace(
+            NoteSequence.from_columns(
+                self.pitches[starts],
+                np.add.reduceat(self.ticks, starts),
+                rests[starts],
+                self.note_ids.copy(),
+                np.append(id_offsets[starts], id_offsets[-1]),
+            )
+        )
         return self
@@ -1,16 +1,38 @@
 from __future__ import annotations
 
+from typing import Dict, Tuple
+
 from model.constants import OCTAVE_SUBDIVISIONS
 from model.interval import Interval
 
 
 class Position:
-    def __init__(self, abs_position: int) -> None:
-        self.abs_position: int = abs_position
-        self.octave, self.rel_position = divmod(self.abs_position, OCTAVE_SUBDIVISIONS)
+    """Immutable pitch position, interned: there is one instance per absolute position."""
+
+    __slots__ = ("abs_position", "octave", "rel_position")
+
+    _interned: Dict[int, Position] = dict()
+
+    def __new__(cls, abs_position: int) -> Position:
+        position: Position = cls._interned.get(abs_position)
+        if position is None:
+            position = cls._interned[abs_position] = super().__new__(cls)
+            object.__setattr__(position, "abs_position", abs_position)
+            for name, value in zip(("octave", "rel_position"), divmod(abs_position, OCTAVE_SUBDIVISIONS)):
+                object.__setattr__(position, name, value)
+        return position
+
+    def __setattr__(self, name: str, value) -> None:
+        raise AttributeError(f"{type(self).__name__} is immutable")
+
+    def __reduce__(self) -> Tuple:
+        return Position, (self.abs_position,)
 
     def __eq__(self, other: Position) -> bool:
-        return self.abs_position == other.abs_position
+        return isinstance(other, Position) and self.abs_position == other.abs_position
+
+    def __hash__(self) -> int:
+        return hash(self.abs_position)
 
     def __repr__(self) -> str:
         return f"{self.octave}[{self.rel_position}]"
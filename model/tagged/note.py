@@ -1,24 +1,43 @@
 from __future__ import annotations
 from model.duration import Duration
 from model.position import Position
-from decimal import Decimal
-from typing import Optional, List
+from typing import Iterable, Optional, Sequence, Tuple
 from model.note import Note
 
 
 class TaggedNote(Note):
-    def __init__(self, position: Optional[Position], duration: Duration, ids: List[int]) -> None:
+    __slots__ = ("ids",)
+
+    def __init__(self, position: Optional[Position], duration: Duration, ids: Iterable[int]) -> None:
         super().__init__(position, duration)
-        self.ids: List[int] = ids
+        self.ids: Sequence[int] = self.compact_ids(ids)
 
     def __repr__(self) -> str:
-        return f"{'TaggedRest' if self.is_rest() else 'TaggedNote'}({self.position}{{{self.duration}}})@{self.ids}"
+        return (
+            f"{'TaggedRest' if self.is_rest() else 'TaggedNote'}({self.position}{{{self.duration}}})@{list(self.ids)}"
+        )
+
+    def _key(self) -> Tuple:
+        return super()._key() + (tuple(self.ids),)
+
+    @staticmethod
+    def compact_ids(ids: Iterable[int]) -> Sequence[int]:
+        """A ``range`` for consecutive ids, as those of tied notes and merged rests are, a tuple otherwise."""
+        if isinstance(ids, range):
+            return ids
+        ids = tuple(ids)
+        if ids and ids == tuple(range(ids[0], ids[0] + len(ids))):
+            return range(ids[0], ids[0] + len(ids))
+        return ids
 
     @classmethod
-    def from_raw(cls, abs_position: Optional[int], raw_duration: Decimal, ids: List[int]) -> Note:
+    def from_raw(cls, abs_position: Optional[int], raw_duration: int, ids: Iterable[int]) -> Note:
         return cls(None if abs_position is None else Position(abs_position), Duration(raw_duration), ids)
 
     def extend_duration(self, other: TaggedNote) -> None:
         assert self.position == other.position
         self.duration += other.duration
-        self.ids.extend(other.ids)
+        if isinstance(self.ids, range) and isinstance(other.ids, range) and self.ids.stop == other.ids.start:
+            self.ids = range(self.ids.start, other.ids.stop)
+        else:
+            self.ids = self.compact_ids(tuple(self.ids) + tuple(other.ids))
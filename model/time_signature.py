@@ -3,16 +3,23 @@ from decimal import Decimal
 
 
 class TimeSignature:
-    DURATION_SCALE: int = Decimal("4")
+    QUARTERS_PER_WHOLE: int = 4
 
-    def __init__(self, beat_count: int, real_beat_duration: Decimal) -> None:
+    def __init__(self, beat_count: int, beat_type: int) -> None:
         self.beat_count: int = beat_count
-        self.real_beat_duration: Decimal = real_beat_duration
+        self.beat_type: int = beat_type
+
+    @property
+    def real_beat_duration(self) -> Decimal:
+        return Decimal(self.QUARTERS_PER_WHOLE) / self.beat_type
 
     @property
     def real_measure_duration(self) -> Decimal:
         return self.beat_count * self.real_beat_duration
 
+    def measure_ticks(self, ticks_per_quarter: int) -> int:
+        return self.beat_count * self.QUARTERS_PER_WHOLE * ticks_per_quarter // self.beat_type
+
     @classmethod
-    def from_raw(self, beat_count: int, beat_duration: Decimal) -> TimeSignature:
-        return TimeSignature(beat_count, self.DURATION_SCALE / beat_duration)
+    def from_raw(self, beat_count: int, beat_type: int) -> TimeSignature:
+        return TimeSignature(beat_count, beat_type)
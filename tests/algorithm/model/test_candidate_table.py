@@ -0,0 +1,108 @@
+import random
+from decimal import Decimal
+from typing import Final, List
+
+import pytest
+
+from model.composition import Composition
+from model.constants import EditDistanceEngine, MatchingStrategy, Prefilter
+from model.note import Note
+from model.note_sequence import NoteSequence
+from model.tagged.note import TaggedNote
+from tests.workers.conftest import (
+    build_varied_voice,
+    build_voice,
+    subject_pitches,
+    subject_rhythm,
+    window_transformations,
+)
+from workers.fugue_analyzer import FugueAnalyzer
+
+test_sensitivities: Final[List[float]] = [0.0, 0.1, 0.3, 0.6]
+test_min_matches: Final[List[int]] = [1, 4, 8, 12]
+# Prefilter regions only prune at low sensitivities.
+test_prefilter_sensitivities: Final[List[float]] = [0.02, 0.05, 0.1, 0.2]
+
+
+def located(voice_matches):
+    return {
+        voice: [(match.start, match.end, transformation) for match, transformation in matches]
+        for voice, matches in voice_matches.items()
+    }
+
+
+class TestCandidateTable:
+    @pytest.mark.parametrize("seed", range(2))
+    @pytest.mark.parametrize(
+        "strategy, prefilter",
+        [
+            (MatchingStrategy.WINDOWED, Prefilter.NONE),
+            (MatchingStrategy.SEMI_GLOBAL, Prefilter.NONE),
+        ],
+    )
+    def test_sweep_identical_to_analysis(self, seed, strategy, prefilter):
+        rng = random.Random(seed)
+        composition = Composition({voice: build_voice(rng, rng.randint(40, 80)) for voice in range(2)})
+        subject = NoteSequence([Note.from_raw(pitch, Decimal(1)) for pitch in subject_pitches])
+        transformations = set(window_transformations)
+        tables = FugueAnalyzer(composition, 0.3, 4, strategy=strategy, prefilter=prefilter).candidate_tables(
+            subject, transformations, test_sensitivities
+        )
+        grid = FugueAnalyzer.sweep(tables, test_min_matches)
+        for sensitivity in test_sensitivities:
+            for min_match in test_min_matches:
+                analyzer = FugueAnalyzer(composition, sensitivity, min_match, strategy=strategy, prefilter=prefilter)
+                assert located(grid[(sensitivity, min_match)]) == located(
+                    analyzer.match_subject(subject, transformations)
+                )
+        assert any(matches for matches in grid[(0.6, 1)].values())
+
+    def test_cutoff_identical(self):
+        rng = random.Random(0)
+        composition = Composition({0: build_voice(rng, 60)})
+        subject = NoteSequence([Note.from_raw(pitch, Decimal(1)) for pitch in subject_pitches])
+        tables = [
+            FugueAnalyzer(composition, 0.1, 4, EditDistanceEngine.PYTHON, cutoff=cutoff).candidate_table(
+                subject, set(window_transformations)
+            )
+            for cutoff in (False, True)
+        ]
+        assert (tables[0].candidates[0] == tables[1].candidates[0]).all()
+        assert tables[0].transformations == tables[1].transformations
+
+    @pytest.mark.parametrize("seed", range(4))
+    @pytest.mark.parametrize("prefilter", [Prefilter.SCAN, Prefilter.SEEDS])
+    def test_prefiltered_sweep_identical_to_analysis(self, seed, prefilter):
+        rng = random.Random(seed)
+        composition = Composition({voice: build_varied_voice(rng, rng.randint(40, 80)) for voice in range(2)})
+        subject = NoteSequence(
+            [Note.from_raw(pitch, Decimal(ticks)) for pitch, ticks in zip(subject_pitches, subject_rhythm)]
+        )
+        transformations = set(window_transformations)
+        tables = FugueAnalyzer(composition, 0.3, 4, prefilter=prefilter).candidate_tables(
+            subject, transformations, test_prefilter_sensitivities
+        )
+        assert len({id(table) for table in tables.values()}) == len(test_prefilter_sensitivities)
+        grid = FugueAnalyzer.sweep(tables, test_min_matches)
+        for sensitivity in test_prefilter_sensitivities:
+            for min_match in test_min_matches:
+                analyzer = FugueAnalyzer(composition, sensitivity, min_match, prefilter=prefilter)
+                assert located(grid[(sensitivity, min_match)]) == located(
+                    analyzer.match_subject(subject, transformations)
+                )
+        assert any(matches for matches in grid[(0.2, 1)].values())
+
+    def test_min_match_bounds_propagation(self):
+        voice = NoteSequence(TaggedNote.from_raw(pitch, 1, [idx]) for idx, pitch in enumerate(subject_pitches))
+        subject = NoteSequence([Note.from_raw(pitch, Decimal(1)) for pitch in subject_pitches])
+        table = FugueAnalyzer(Composition({0: voice}), 0.3, 1).candidate_table(subject, set(window_transformations))
+        min_matches = [len(subject_pitches) - 1, len(subject_pitches)]
+        grid = FugueAnalyzer.sweep({0.3: table}, min_matches)
+        for min_match in min_matches:
+            analyzer = FugueAnalyzer(Composition({0: voice}), 0.3, min_match)
+            expected = located(analyzer.match_subject(subject, set(window_transformations)))
+            assert located(grid[(0.3, min_match)]) == expected
+        assert [(match.start, match.end) for match, _ in grid[(0.3, len(subject_pitches) - 1)][0]] == [
+            (0, len(subject_pitches))
+        ]
+        assert grid[(0.3, len(subject_pitches))][0] == []
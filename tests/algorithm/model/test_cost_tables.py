@@ -0,0 +1,96 @@
+import random
+from typing import Callable, Final
+
+import numpy as np
+import pytest
+
+from algorithm.adaptive_edit_distance import AdaptiveEditDistance
+from algorithm.batched_edit_distance import BatchedEditDistance
+from algorithm.model.cost_tables import CostTables
+from algorithm.model.distance_metrics import DistanceMetrics, ScalingFunctions
+from algorithm.model.metric_kernels import MetricKernels
+from tests.algorithm.test_vectorized_edit_distance import build_random_window, test_metrics
+
+test_scaling_funcs: Final[list] = [ScalingFunctions.sqrt, ScalingFunctions.floored_sqrt]
+
+
+def assert_identical_to_reference(edit_windows, scaling_func: Callable, tables: CostTables) -> None:
+    batch = BatchedEditDistance(edit_windows, test_metrics, scaling_func, tables=tables)
+    for idx, edit_window in enumerate(edit_windows):
+        reference = AdaptiveEditDistance(edit_window, test_metrics, scaling_func)
+        assert np.array_equal(reference.memo, batch.memo(idx))
+
+
+class TestCostTables:
+    @pytest.mark.parametrize("seed", range(10))
+    @pytest.mark.parametrize("scaling_func", test_scaling_funcs)
+    def test_gathered_costs_identical_to_computed(self, seed, scaling_func):
+        rng = random.Random(seed)
+        edit_window = build_random_window(rng, 30, 12)
+        tables = CostTables.from_features([edit_window.stream, edit_window.pattern], scaling_func)
+        scale = ScalingFunctions.vectorize(scaling_func)
+        interval_costs = np.abs(edit_window.stream.interval_pairs[:, None] - edit_window.pattern.intervals[None, :])
+        left, right = edit_window.stream.duration_pairs[:-1, None], edit_window.pattern.durations[None, :-1]
+        expected = CostTables.combine_costs(interval_costs, np.maximum(left, right), np.minimum(left, right), scale)
+        assert np.array_equal(tables.duration_ratio_costs(interval_costs, left, right), expected)
+        singles = np.abs(edit_window.stream.intervals)
+        durations = edit_window.stream.durations[:-1]
+        expected = CostTables.combine_costs(singles, durations, np.ones_like(durations), scale)
+        assert np.array_equal(tables.single_costs(singles, durations), expected)
+
+    @pytest.mark.parametrize("seed", range(10))
+    @pytest.mark.parametrize("scaling_func", test_scaling_funcs)
+    def test_memo_identical_with_tables(self, seed, scaling_func):
+        rng = random.Random(seed)
+        edit_windows = [build_random_window(rng, rng.randint(0, 30), rng.randint(1, 15)) for _ in range(4)]
+        tables = CostTables.from_features(
+            [features for edit_window in edit_windows for features in (edit_window.stream, edit_window.pattern)],
+            scaling_func,
+        )
+        assert tables.valid_for(scaling_func)
+        assert_identical_to_reference(edit_windows, scaling_func, tables)
+
+    @pytest.mark.parametrize("seed", range(5))
+    def test_out_of_table_values_fall_back(self, seed):
+        tables = CostTables(2, [1.0], ScalingFunctions.sqrt)
+        assert tables.interval_index(np.array([3]), np.array([False])) is None
+        assert tables.duration_index(np.array([0.5])) is None
+        assert_identical_to_reference([build_random_window(random.Random(seed), 30, 12)], ScalingFunctions.sqrt, tables)
+
+    def test_tables_keyed_on_scaling_function(self):
+        def halved(value: int, scale: int = 1) -> float:
+            return scale * value / 2
+
+        edit_window = build_random_window(random.Random(0), 30, 12)
+        tables = CostTables.from_features([edit_window.stream, edit_window.pattern], halved)
+        for scaling_func in (halved, ScalingFunctions.vectorize(halved), ScalingFunctions.vectorize(halved)):
+            assert tables.valid_for(scaling_func)
+        assert not tables.valid_for(np.sqrt)
+        assert_identical_to_reference([edit_window], halved, tables)
+        assert_identical_to_reference([edit_window], ScalingFunctions.sqrt, tables)
+
+    def test_changed_factors_invalidate_tables(self, monkeypatch):
+        edit_window = build_random_window(random.Random(0), 30, 12)
+        tables = CostTables.from_features([edit_window.stream, edit_window.pattern], ScalingFunctions.sqrt)
+        assert tables.valid_for(np.sqrt)
+        assert not tables.valid_for(ScalingFunctions.vectorize(ScalingFunctions.floored_sqrt))
+        monkeypatch.setattr(DistanceMetrics, "REST_PENALTY_FACTOR", 7)
+        assert not tables.valid_for(np.sqrt)
+        assert_identical_to_reference([edit_window], ScalingFunctions.sqrt, tables)
+
+    def test_tables_scoped_to_batch(self):
+        edit_window = build_random_window(random.Random(0), 30, 12)
+        tables = CostTables.from_features([edit_window.stream, edit_window.pattern], ScalingFunctions.sqrt)
+        assert BatchedEditDistance([edit_window], test_metrics, ScalingFunctions.sqrt, tables=tables).tables is tables
+        assert BatchedEditDistance([edit_window], test_metrics, ScalingFunctions.sqrt).tables is None
+        assert MetricKernels.tables(np.sqrt) is None
+        assert MetricKernels.tables(tables) is tables
+
+    def test_oversized_tables_not_built(self, monkeypatch):
+        edit_window = build_random_window(random.Random(0), 30, 12)
+        features = [edit_window.stream, edit_window.pattern]
+        tables = CostTables.from_features(features, ScalingFunctions.sqrt)
+        monkeypatch.setattr(CostTables, "MAX_ENTRIES", tables.combined_costs.size)
+        assert CostTables.from_features(features, ScalingFunctions.sqrt) is not None
+        monkeypatch.setattr(CostTables, "MAX_ENTRIES", tables.combined_costs.size - 1)
+        assert CostTables.from_features(features, ScalingFunctions.sqrt) is None
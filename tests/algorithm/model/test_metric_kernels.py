@@ -0,0 +1,65 @@
+import random
+from typing import Callable, Final, List
+
+import numpy as np
+import pytest
+
+from algorithm.adaptive_edit_distance import AdaptiveEditDistance
+from algorithm.batched_edit_distance import BatchedEditDistance
+from algorithm.model.distance_metrics import DistanceMetrics, ScalingFunctions
+from algorithm.model.metric_kernels import MetricKernels
+from tests.algorithm.test_vectorized_edit_distance import build_random_window, test_metrics
+
+test_skip_cost: Final[float] = 3.0
+
+
+def skip_two_pattern_notes(memo, edit_window, cur_i, cur_j, scale, sentinel=float("inf")):
+    """Custom metric: inserts two pattern intervals at once, at a fixed cost."""
+    if cur_j < 2 or edit_window.pattern.pair_rests[cur_j - 2]:
+        return sentinel
+    return memo[cur_i][cur_j - 2] + test_skip_cost
+
+
+@MetricKernels.register(skip_two_pattern_notes, (0, 2))
+def skip_two_pattern_notes_costs(stream, pattern, scale):
+    costs = np.full(pattern.values.shape, np.inf)
+    costs[:, 1:] = np.where(pattern.pair_rests, np.inf, test_skip_cost)
+    return costs[:, None, :]
+
+
+class TestMetricKernels:
+    def test_registered_metrics(self):
+        for metric in test_metrics:
+            assert MetricKernels.valid_offset(MetricKernels.kernel(metric).offset)
+
+    @pytest.mark.parametrize("offset", [(0, 0), (3, 0), (2, 2), (-1, 1)])
+    def test_unsupported_offset_raises(self, offset):
+        with pytest.raises(ValueError):
+            MetricKernels.register(DistanceMetrics.replacement_with_penalty, offset)
+
+    @pytest.mark.parametrize("seed", range(10))
+    def test_custom_metric_identical_to_reference(self, seed):
+        rng = random.Random(seed)
+        metrics: List[Callable] = rng.sample(test_metrics, rng.randint(1, len(test_metrics))) + [skip_two_pattern_notes]
+        edit_windows = [build_random_window(rng, rng.randint(0, 30), rng.randint(1, 15)) for _ in range(4)]
+        batch = BatchedEditDistance(edit_windows, metrics, ScalingFunctions.sqrt)
+        for idx, edit_window in enumerate(edit_windows):
+            reference = AdaptiveEditDistance(edit_window, metrics, ScalingFunctions.sqrt)
+            assert np.array_equal(reference.memo, batch.memo(idx))
+
+    @pytest.mark.parametrize("seed", range(5))
+    def test_custom_metric_cutoff_identical_to_reference(self, seed):
+        rng = random.Random(seed)
+        metrics: List[Callable] = [DistanceMetrics.replacement_with_penalty, skip_two_pattern_notes]
+        edit_window = build_random_window(rng, 30, 12)
+        reference = AdaptiveEditDistance(edit_window, metrics, ScalingFunctions.sqrt, cutoff=True)
+        batch = BatchedEditDistance([edit_window], metrics, ScalingFunctions.sqrt, cutoffs=[True])
+        assert np.array_equal(reference.memo, batch.memo(0))
+
+    def test_base_penalty_read_on_use(self, monkeypatch):
+        edit_window = build_random_window(random.Random(0), 20, 10)
+        monkeypatch.setattr(DistanceMetrics, "BASE_DELETION_PENALTY", 2)
+        reference = AdaptiveEditDistance(edit_window, test_metrics, ScalingFunctions.sqrt)
+        assert np.array_equal(
+            reference.memo, BatchedEditDistance([edit_window], test_metrics, ScalingFunctions.sqrt).memo(0)
+        )
@@ -0,0 +1,49 @@
+from decimal import Decimal
+from typing import Final, List, Optional
+
+import numpy as np
+import pytest
+
+from algorithm.model.sequence_features import SequenceFeatures
+
+test_intervals: Final[List[Optional[int]]] = [2, -1, None, None, 3, 4, -2, 5]
+test_durations: Final[List[Decimal]] = [Decimal(value) for value in (1, 2, 1, 4, 1, 1, 2, 3, 1)]
+
+
+class TestSequenceFeatures:
+    @pytest.fixture(scope="class")
+    def sequence_features(self):
+        return SequenceFeatures.from_values(test_intervals, test_durations)
+
+    def test_pairs(self, sequence_features):
+        assert list(sequence_features.interval_pairs) == [1, 0, 0, 0, 7, 2, 3]
+        assert list(sequence_features.pair_rests) == [False, True, True, True, False, False, False]
+        assert list(sequence_features.duration_pairs) == [3, 3, 5, 5, 2, 3, 5, 4]
+
+    @pytest.mark.parametrize("low, high", [(0, 8), (0, 0), (1, 2), (2, 6), (3, 8), (8, 8)])
+    @pytest.mark.parametrize("reverse", [False, True])
+    def test_window_equal_to_rebuilt_features(self, sequence_features, low, high, reverse):
+        step = -1 if reverse else 1
+        window = sequence_features.window(low, high)
+        expected = SequenceFeatures.from_values(
+            test_intervals[low:high][::step], test_durations[low : high + 1][::step]
+        )
+        if reverse:
+            window = window.reversed()
+        assert list(window.intervals) == list(expected.intervals)
+        assert list(window.durations) == list(expected.durations)
+        assert list(window.rests) == list(expected.rests)
+        assert list(window.interval_pairs) == list(expected.interval_pairs)
+        assert list(window.pair_rests) == list(expected.pair_rests)
+        assert list(window.duration_pairs) == list(expected.duration_pairs)
+
+    def test_numeric_features(self, sequence_features):
+        assert sequence_features.intervals.dtype == np.int64
+        assert sequence_features.durations.dtype == np.float64
+        assert list(sequence_features.intervals) == [2, -1, 0, 0, 3, 4, -2, 5]
+        assert list(sequence_features.rests) == [False, False, True, True, False, False, False, False]
+
+    def test_window_is_view(self, sequence_features):
+        window = sequence_features.window(2, 6)
+        assert window.intervals.base is sequence_features.intervals
+        assert window.reversed().durations.base is sequence_features.durations
@@ -0,0 +1,113 @@
+import random
+from fractions import Fraction
+from typing import Final, List
+
+import numpy as np
+import pytest
+
+from algorithm.adaptive_edit_distance import AdaptiveEditDistance
+from algorithm.batched_edit_distance import BatchedEditDistance
+from algorithm.model.distance_metrics import ScalingFunctions
+from algorithm.model.edit_window import EditWindow
+from algorithm.model.sequence_features import SequenceFeatures
+from algorithm.model.subject_variants import SubjectVariants
+from model.constants import Transformation
+from tests.algorithm.test_vectorized_edit_distance import build_random_window, test_metrics
+
+test_transformations: Final[List[Transformation]] = [
+    Transformation.DEFAULT,
+    Transformation.INVERSION,
+    Transformation.REVERSAL,
+    Transformation.REVERSAL_INVERSION,
+    Transformation.AUGMENTATION,
+    Transformation.DIMINUTION,
+    Transformation.SCALING,
+]
+
+
+def assert_same_features(left, right) -> None:
+    for name in ("intervals", "durations", "rests", "interval_pairs", "duration_pairs", "pair_rests"):
+        assert np.array_equal(getattr(left, name), getattr(right, name))
+
+
+class TestSubjectVariants:
+    @pytest.mark.parametrize("seed", range(5))
+    @pytest.mark.parametrize("forward", [False, True])
+    def test_same_windows_as_transformed(self, seed, forward):
+        voice = build_random_window(random.Random(seed), 60, 12)
+        variants = SubjectVariants(voice.pattern, test_transformations, ScalingFunctions.sqrt)
+        for transformation in test_transformations:
+            edit_window = EditWindow.build(voice.stream, voice.pattern, 10, 1.6, reverse=forward)
+            edit_window.transform_pattern(transformation)
+            variant = variants[transformation]
+            assert_same_features(edit_window.pattern, variant.reversed if forward else variant.features)
+            first_row = variant.reversed_first_row if forward else variant.first_row
+            reference = AdaptiveEditDistance(edit_window, test_metrics, ScalingFunctions.sqrt)
+            assert np.array_equal(first_row, reference.memo[0])
+
+    @pytest.mark.parametrize("seed", range(5))
+    def test_precomputed_first_rows_identical(self, seed):
+        rng = random.Random(seed)
+        edit_windows = [build_random_window(rng, rng.randint(0, 30), rng.randint(1, 15)) for _ in range(4)]
+        precomputed = [
+            EditWindow(
+                edit_window.stream,
+                edit_window.pattern,
+                SubjectVariants.build_variant(
+                    edit_window.pattern, Transformation.DEFAULT, ScalingFunctions.sqrt
+                ).first_row,
+            )
+            for edit_window in edit_windows
+        ]
+        batch = BatchedEditDistance(edit_windows, test_metrics, ScalingFunctions.sqrt)
+        for mixed in (precomputed, precomputed[:2] + edit_windows[2:]):
+            precomputed_batch = BatchedEditDistance(mixed, test_metrics, ScalingFunctions.sqrt, cutoffs=[True] * 4)
+            cutoff_batch = BatchedEditDistance(edit_windows, test_metrics, ScalingFunctions.sqrt, cutoffs=[True] * 4)
+            for idx in range(len(edit_windows)):
+                assert np.array_equal(precomputed_batch.memo(idx), cutoff_batch.memo(idx))
+        precomputed_batch = BatchedEditDistance(precomputed, test_metrics, ScalingFunctions.sqrt)
+        for idx in range(len(edit_windows)):
+            assert np.array_equal(precomputed_batch.memo(idx), batch.memo(idx))
+
+    def test_read_only(self):
+        voice = build_random_window(random.Random(0), 20, 8)
+        variants = SubjectVariants(voice.pattern, [Transformation.INVERSION], ScalingFunctions.sqrt)
+        for transformation in variants:
+            variant = variants[transformation]
+            for values in (variant.features.intervals, variant.reversed.durations, variant.first_row):
+                with pytest.raises(ValueError):
+                    values[0] = 1
+
+    @pytest.mark.parametrize("factor", [Fraction(1, 4), Fraction(2, 3), Fraction(3, 2), Fraction(5)])
+    def test_scaling_ratio_invariant(self, factor):
+        voice = build_random_window(random.Random(0), 20, 8)
+        pattern = voice.pattern
+        scaled = SequenceFeatures.from_arrays(pattern.intervals, pattern.rests, pattern.durations * float(factor))
+        for encoded, scaled_encoded in (
+            (pattern.transformed(Transformation.SCALING), scaled.transformed(Transformation.SCALING)),
+            (pattern.reversed().ratio_encoded(), scaled.reversed().ratio_encoded()),
+        ):
+            assert np.array_equal(encoded.intervals, scaled_encoded.intervals)
+            assert np.allclose(encoded.durations, scaled_encoded.durations)
+            assert np.allclose(encoded.duration_pairs, scaled_encoded.duration_pairs)
+        variants = SubjectVariants(pattern, [Transformation.SCALING], ScalingFunctions.sqrt)
+        assert variants.reported(Transformation.SCALING, scaled, 0, len(scaled)) == f"SCALING_{factor}"
+        assert variants.reported(Transformation.DEFAULT, scaled, 0, len(scaled)) == Transformation.DEFAULT
+
+    @pytest.mark.parametrize("factor", [Fraction(1), Fraction(1, 2), Fraction(3, 2), Fraction(2)])
+    @pytest.mark.parametrize("length", [4, 8, 12])
+    def test_scaling_factor_of_partial_match(self, factor, length):
+        voice = build_random_window(random.Random(1), 20, 12)
+        pattern = voice.pattern
+        durations = pattern.durations[:length] * float(factor)
+        durations[-1] *= 3
+        match = SequenceFeatures.from_arrays(pattern.intervals[:length], pattern.rests[:length], durations)
+        variants = SubjectVariants(pattern, [Transformation.SCALING], ScalingFunctions.sqrt)
+        assert variants.scaling_factor(match, 0, length) == factor
+
+    def test_ratio_encoded_windows(self):
+        stream = build_random_window(random.Random(0), 40, 8).stream
+        encoded = stream.ratio_encoded()
+        window = stream.window(5, 20).ratio_encoded()
+        assert np.array_equal(window.durations[:-1], encoded.durations[5:20])
+        assert np.array_equal(window.duration_pairs[:-1], encoded.duration_pairs[5:19])
@@ -0,0 +1,76 @@
+import random
+
+import numpy as np
+import pytest
+
+from algorithm.adaptive_edit_distance import AdaptiveEditDistance
+from algorithm.batched_edit_distance import BatchedEditDistance
+from algorithm.model.distance_metrics import ScalingFunctions
+from algorithm.model.edit_window import EditWindow
+from algorithm.vectorized_edit_distance import VectorizedEditDistance
+from tests.algorithm.test_vectorized_edit_distance import build_random_window, test_metrics
+
+
+class TestBatchedEditDistance:
+    @pytest.mark.parametrize("seed", range(10))
+    def test_ragged_batch_identical_to_reference(self, seed):
+        rng = random.Random(seed)
+        edit_windows = [build_random_window(rng, rng.randint(0, 30), rng.randint(1, 15)) for _ in range(6)]
+        batch = BatchedEditDistance(edit_windows, test_metrics, ScalingFunctions.sqrt)
+        assert len(batch) == len(edit_windows)
+        for idx, edit_window in enumerate(edit_windows):
+            reference = AdaptiveEditDistance(edit_window, test_metrics, ScalingFunctions.sqrt)
+            assert np.array_equal(reference._memo, batch.memo(idx))
+            assert reference.get_limits(pattern_complete=True) == batch.get_limits(idx, pattern_complete=True)
+
+    def test_empty_batch(self):
+        assert len(BatchedEditDistance([], test_metrics, ScalingFunctions.sqrt)) == 0
+
+    @pytest.mark.parametrize("seed", range(10))
+    @pytest.mark.parametrize("engine", [AdaptiveEditDistance, VectorizedEditDistance])
+    def test_reused_memo_identical_to_fresh(self, seed, engine):
+        rng = random.Random(seed)
+        voice = build_random_window(rng, 80, 12)
+        stream, pattern = voice.stream, voice.pattern
+        reused_rows, previous_start = 0, 0
+        previous = engine(EditWindow.build(stream, pattern, 0, 1.6, reverse=True), test_metrics, ScalingFunctions.sqrt)
+        for stream_start in sorted(rng.sample(range(1, 60), 8)):
+            shift = EditWindow.stream_end(stream, pattern, stream_start, 1.6) - EditWindow.stream_end(
+                stream, pattern, previous_start, 1.6
+            )
+            edit_window = EditWindow.build(stream, pattern, stream_start, 1.6, reverse=True)
+            fresh = engine(edit_window, test_metrics, ScalingFunctions.sqrt)
+            reused = engine(edit_window, test_metrics, ScalingFunctions.sqrt, (previous.memo, shift))
+            assert np.array_equal(fresh.memo, reused.memo)
+            reused_rows += reused.reused_rows
+            previous, previous_start = reused, stream_start
+        assert reused_rows > 0
+
+    @pytest.mark.parametrize("seed", range(20))
+    def test_cutoff_identical_to_reference(self, seed):
+        rng = random.Random(seed)
+        edit_windows = [build_random_window(rng, rng.randint(0, 30), rng.randint(1, 15)) for _ in range(4)]
+        cutoffs = [True, False, True, True]
+        batch = BatchedEditDistance(edit_windows, test_metrics, ScalingFunctions.sqrt, cutoffs=cutoffs)
+        for idx, edit_window in enumerate(edit_windows):
+            reference = AdaptiveEditDistance(edit_window, test_metrics, ScalingFunctions.sqrt, cutoff=cutoffs[idx])
+            assert np.array_equal(reference.memo, batch.memo(idx))
+
+    @pytest.mark.parametrize("seed", range(20))
+    @pytest.mark.parametrize("pattern_complete", [False, True])
+    def test_cutoff_limits_identical(self, seed, pattern_complete):
+        rng = random.Random(seed)
+        edit_window = build_random_window(rng, rng.randint(1, 30), rng.randint(1, 15))
+        full = AdaptiveEditDistance(edit_window, test_metrics, ScalingFunctions.sqrt).memo.copy()
+        cut = AdaptiveEditDistance(edit_window, test_metrics, ScalingFunctions.sqrt, cutoff=True)
+        assert cut.get_limits(pattern_complete) == AdaptiveEditDistance.trace_limits(full, pattern_complete)
+        kept = full <= np.min(full[:, -1])
+        assert np.array_equal(cut.memo[kept], full[kept])
+        assert np.isinf(cut.memo[~kept]).all()
+        assert np.count_nonzero(np.isinf(cut.memo[1:, 1:])) >= cut.skipped_cells
+
+    def test_cutoff_skips_cells(self):
+        rng = random.Random(0)
+        edit_windows = [build_random_window(rng, 30, 12) for _ in range(4)]
+        batch = BatchedEditDistance(edit_windows, test_metrics, ScalingFunctions.sqrt, cutoffs=[True] * 4)
+        assert all(skipped_cells > 0 for skipped_cells in batch.skipped_cells)
@@ -0,0 +1,117 @@
+import random
+from typing import Final, List, Optional, Tuple
+
+import pytest
+
+from algorithm.candidate_regions import CandidateRegions
+from algorithm.interval_index import IntervalIndex
+from algorithm.kmp_soft import KMPSoft
+from algorithm.model.sequence_features import SequenceFeatures
+
+test_tolerance: Final[int] = 1
+test_stream_intervals: Final[List[Optional[int]]] = [12, 12, 5, -2, 7, 3, 12, None, 12, 4, -1, 8, 3, 12, 12]
+
+
+def build_features(intervals: List[Optional[int]]) -> SequenceFeatures:
+    return SequenceFeatures.from_values(intervals, [1] * (len(intervals) + 1))
+
+
+class TestIntervalIndex:
+    @pytest.fixture(scope="class")
+    def interval_index(self):
+        return IntervalIndex(build_features(test_stream_intervals), 3, test_tolerance)
+
+    @pytest.mark.parametrize(
+        "ngram, expected",
+        [
+            ((5, -2, 7), [2, 9]),
+            ((4, -1, 8), [2, 9]),
+            ((5, -2, 9), [2, 9]),
+            ((3, 7, 3), [2, 9]),
+            ((5, 2, 7), []),
+            ((12, None, 12), [6]),
+            ((12, 12, 12), [11]),
+        ],
+    )
+    def test_positions_within_tolerance(self, interval_index, ngram, expected):
+        assert interval_index.positions(ngram) == expected
+
+    @pytest.mark.parametrize("seed", range(10))
+    def test_positions_equal_to_brute_force(self, seed):
+        generator = random.Random(seed)
+        values = [None, -2, -1, 0, 1, 3]
+        stream = [generator.choice(values) for _ in range(80)]
+        interval_index = IntervalIndex(build_features(stream), 2, test_tolerance)
+        kmp_soft = KMPSoft(test_tolerance)
+        pairs = KMPSoft.pair_values(stream)
+
+        def units(start: int) -> List[Tuple[int, Optional[int]]]:
+            """Widths and values of the units starting at ``start``."""
+            units: List[Tuple[int, Optional[int]]] = [(1, stream[start])] if start < len(stream) else list()
+            if start < len(pairs):
+                units.append((2, pairs[start]))
+            return units
+
+        for ngram in {(first, second) for first in values for second in values}:
+            expected = [
+                start
+                for start in range(len(stream))
+                if any(
+                    kmp_soft.matches(first, ngram[0]) and kmp_soft.matches(second, ngram[1])
+                    for width, first in units(start)
+                    for _, second in units(start + width)
+                )
+            ]
+            assert interval_index.positions(ngram) == expected
+
+    @pytest.mark.parametrize("seed", range(40))
+    @pytest.mark.parametrize("errors", [0, 1, 2])
+    def test_seeds_inside_every_occurrence(self, seed, errors):
+        generator = random.Random(seed)
+        pattern = [generator.randint(-5, 5) for _ in range(generator.randint(13, 20))]
+        occurrence, edits, position = list(), 0, 0
+        while position < len(pattern):
+            choice = generator.random()
+            if choice < 0.15 and position + 1 < len(pattern):
+                occurrence.append(pattern[position] + pattern[position + 1])
+                position += 2
+                continue
+            if choice < 0.3:
+                split = generator.randint(-3, 3)
+                occurrence.extend([split, pattern[position] - split])
+            elif choice < 0.4 and edits < errors:
+                occurrence.extend(generator.choice([[], [30], [30, pattern[position]], [pattern[position], 30]]))
+                edits += 1
+            else:
+                occurrence.append(pattern[position] + generator.randint(-test_tolerance, test_tolerance))
+            position += 1
+        lead = [generator.choice([20, -20]) for _ in range(generator.randint(0, 10))]
+        stream = lead + occurrence + [generator.choice([20, -20]) for _ in range(10)]
+        size = IntervalIndex.seed_size(len(pattern), errors, 4)
+        interval_index = IntervalIndex(build_features(stream), size, test_tolerance)
+        seeds = interval_index.seeds(build_features(pattern), errors)
+        assert any(len(lead) <= position < len(lead) + len(occurrence) for position, _ in seeds)
+
+    def test_seed_size_fits_pieces(self):
+        assert IntervalIndex.seed_size(20, 0, 4) == 4
+        assert IntervalIndex.seed_size(20, 1, 4) == 4
+        assert IntervalIndex.seed_size(20, 2, 4) == 3
+        assert IntervalIndex.seed_size(20, 6, 4) == 1
+        assert IntervalIndex.seed_size(20, 7, 4) is None
+
+    def test_seeds_inside_occurrences(self):
+        interval_index = IntervalIndex(build_features(test_stream_intervals), 2, test_tolerance)
+        assert interval_index.seeds(build_features([5, -2, 7, 3]), 0) == {(2, 0), (9, 0)}
+
+    def test_seed_regions(self):
+        stream = build_features(test_stream_intervals)
+        interval_index = IntervalIndex(stream, 2, test_tolerance)
+        candidate_regions = CandidateRegions.from_seeds(stream, interval_index, build_features([5, -2, 7, 3]), 0, 4)
+        assert candidate_regions.regions == [(2, 5), (9, 12)]
+        assert candidate_regions.pruned_fraction == pytest.approx(1 - 8 / 16)
+
+    def test_no_seeds_keeps_every_start(self):
+        stream = build_features(test_stream_intervals)
+        candidate_regions = CandidateRegions.from_seeds(stream, None, build_features([5, -2, 7, 3]), 2, 4)
+        assert candidate_regions.regions == [(0, 15)]
+        assert candidate_regions.pruned_fraction == 0
@@ -0,0 +1,109 @@
+import random
+from typing import Final, List, Optional
+
+import pytest
+
+from algorithm.candidate_regions import CandidateRegions
+from algorithm.kmp_soft import KMPSoft
+from algorithm.model.sequence_features import SequenceFeatures
+
+test_tolerance: Final[int] = 1
+
+
+class TestKMPSoft:
+    @staticmethod
+    def brute_force_ends(
+        kmp_soft: KMPSoft,
+        stream: List[Optional[int]],
+        pattern: List[Optional[int]],
+        errors: int,
+        pairs: bool = False,
+    ) -> List[int]:
+        """Sellers edit distance with a free start in the stream, with expansions and compressions if ``pairs``."""
+        stream_pairs: List[Optional[int]] = [None] + KMPSoft.pair_values(stream)
+        pattern_pairs: List[Optional[int]] = [None] + KMPSoft.pair_values(pattern)
+        columns: List[List[int]] = [list(range(len(pattern) + 1))]
+        ends: List[int] = list()
+        for idx, value in enumerate(stream):
+            column: List[int] = columns[-1]
+            next_column: List[int] = [0]
+            for k, pattern_value in enumerate(pattern):
+                costs: List[int] = [
+                    column[k] + (0 if kmp_soft.matches(value, pattern_value) else 1),
+                    column[k + 1] + 1,
+                    next_column[k] + 1,
+                ]
+                if pairs and k > 0:
+                    costs.append(column[k - 1] + (0 if kmp_soft.matches(value, pattern_pairs[k]) else 1))
+                if pairs and idx > 0:
+                    costs.append(columns[-2][k] + (0 if kmp_soft.matches(stream_pairs[idx], pattern_value) else 1))
+                next_column.append(min(costs))
+            columns.append(next_column)
+            if next_column[-1] <= errors:
+                ends.append(idx)
+        return ends
+
+    @pytest.mark.parametrize("seed", range(20))
+    @pytest.mark.parametrize("errors", [0, 1, 3])
+    @pytest.mark.parametrize("pairs", [False, True])
+    def test_approximate_ends_equal_to_brute_force(self, seed, errors, pairs):
+        generator = random.Random(seed)
+        values = [None, -3, -2, -1, 0, 1, 2, 5]
+        stream = [generator.choice(values) for _ in range(generator.randint(0, 60))]
+        pattern = [generator.choice(values) for _ in range(generator.randint(1, 12))]
+        kmp_soft = KMPSoft(test_tolerance)
+        assert kmp_soft.approximate_ends(stream, pattern, errors, pairs) == self.brute_force_ends(
+            kmp_soft, stream, pattern, errors, pairs
+        )
+
+    def test_ends_within_tolerance(self):
+        stream = [1, 2, 3, 1, 3, 3, 0, 2, 2]
+        assert KMPSoft(test_tolerance).approximate_ends(stream, [1, 2, 3], 0) == [2, 5, 8]
+        assert KMPSoft(0).approximate_ends(stream, [1, 2, 3], 0) == [2]
+
+    def test_rest_matches_unison(self):
+        assert KMPSoft(0).approximate_ends([3, None, 4, 0, 4], [0, 4], 0) == [2, 4]
+
+    def test_expansions_and_compressions(self):
+        kmp_soft = KMPSoft(0)
+        assert kmp_soft.approximate_ends([9, 5, 7, 9], [2, 3, 7], 0) == list()
+        assert kmp_soft.approximate_ends([9, 5, 7, 9], [2, 3, 7], 0, pairs=True) == [2]
+        assert kmp_soft.approximate_ends([9, 1, 4, 7, 9], [5, 7], 0, pairs=True) == [3]
+
+
+class TestCandidateRegions:
+    @staticmethod
+    def features(intervals: List[Optional[int]]) -> SequenceFeatures:
+        return SequenceFeatures.from_values(intervals, [1] * (len(intervals) + 1))
+
+    def test_regions_around_occurrences(self):
+        pattern = self.features([5, -2, 7, 3])
+        stream = self.features([12] * 10 + [5, -2, 7, 3] + [12] * 20 + [5, -2, 8, 3] + [12] * 10)
+        candidate_regions = CandidateRegions.from_scan(stream, pattern, 0, test_tolerance, 4)
+        assert candidate_regions.regions == [(10, 13), (34, 37)]
+        assert candidate_regions.pruned_fraction == pytest.approx(1 - 8 / 49)
+
+    def test_regions_within_reach(self):
+        pattern = self.features([5, -2, 7, 3])
+        stream = self.features([12] * 10 + [5, -2, 7, 3] + [12] * 10)
+        assert CandidateRegions.from_scan(stream, pattern, 0, test_tolerance, 6).regions == [(8, 13)]
+
+    def test_full_region_within_budget(self):
+        pattern = self.features([5, -2])
+        candidate_regions = CandidateRegions.from_scan(self.features([12] * 10), pattern, 2, test_tolerance, 2)
+        assert candidate_regions.regions == [(0, 10)]
+        assert candidate_regions.pruned_fraction == 0
+
+    @pytest.mark.parametrize("stream_pos, expected", [(0, 10), (10, 10), (13, 13), (14, 34), (37, 37), (38, None)])
+    def test_next_start(self, stream_pos, expected):
+        pattern = self.features([5, -2, 7, 3])
+        stream = self.features([12] * 10 + [5, -2, 7, 3] + [12] * 20 + [5, -2, 7, 3] + [12] * 10)
+        assert CandidateRegions.from_scan(stream, pattern, 0, test_tolerance, 4).next_start(stream_pos) == expected
+
+    def test_no_regions(self):
+        candidate_regions = CandidateRegions.from_scan(
+            self.features([12] * 10), self.features([5, -2]), 0, test_tolerance, 2
+        )
+        assert candidate_regions.regions == list()
+        assert candidate_regions.next_start(0) is None
+        assert candidate_regions.pruned_fraction == 1
@@ -0,0 +1,62 @@
+import random
+from decimal import Decimal
+
+import numpy as np
+import pytest
+
+from algorithm.adaptive_edit_distance import AdaptiveEditDistance
+from algorithm.model.distance_metrics import ScalingFunctions
+from algorithm.model.edit_window import EditWindow
+from algorithm.model.sequence_features import SequenceFeatures
+from algorithm.semi_global_alignment import SemiGlobalAlignment
+from algorithm.workspace_pool import WorkspacePool
+from tests.algorithm.test_vectorized_edit_distance import build_random_window, test_metrics
+
+
+def build_pattern(rng: random.Random, length: int) -> SequenceFeatures:
+    """Without rests, a pattern inserted before the stream costs the same in row 0 as in any other row."""
+    return SequenceFeatures.from_values(
+        [rng.randint(-9, 9) for _ in range(length)], [Decimal(rng.choice([1, 2, 4])) for _ in range(length + 1)]
+    )
+
+
+class TestSemiGlobalAlignment:
+    @pytest.mark.parametrize("seed", range(5))
+    @pytest.mark.parametrize("block_rows", [1, 7, 512])
+    def test_start_of_every_end_reproduces_its_cost(self, seed, block_rows, monkeypatch):
+        monkeypatch.setattr(SemiGlobalAlignment, "BLOCK_ROWS", block_rows)
+        rng = random.Random(seed)
+        edit_windows = [EditWindow(build_random_window(rng, 60, 1).stream, build_pattern(rng, 8)) for _ in range(3)]
+        edit_windows.append(EditWindow(edit_windows[0].stream.window(0, 40), build_pattern(rng, 6)))
+        alignment = SemiGlobalAlignment(edit_windows, test_metrics, ScalingFunctions.sqrt)
+        for idx, edit_window in enumerate(edit_windows):
+            costs, starts = alignment.costs(idx), alignment.starts(idx)
+            reference = AdaptiveEditDistance(edit_window, test_metrics, ScalingFunctions.sqrt)
+            assert np.array_equal(costs, reference.memo[:, -1])
+            for end in range(1, len(costs)):
+                window = EditWindow(edit_window.stream.window(starts[end], end), edit_window.pattern)
+                assert AdaptiveEditDistance(window, test_metrics, ScalingFunctions.sqrt).memo[-1, -1] == costs[end]
+
+    def test_memory_bounded_by_block(self):
+        rng = random.Random(0)
+        pattern = build_pattern(rng, 8)
+        allocated_bytes = list()
+        for length in (600, 6000):
+            workspace = WorkspacePool()
+            stream = build_random_window(rng, length, 1).stream
+            SemiGlobalAlignment([EditWindow(stream, pattern)], test_metrics, ScalingFunctions.sqrt, workspace=workspace)
+            allocated_bytes.append(workspace.allocated_bytes)
+        assert allocated_bytes[0] == allocated_bytes[1]
+
+    def test_best_alignment_per_start(self):
+        rng = random.Random(0)
+        edit_window = EditWindow(build_random_window(rng, 60, 1).stream, build_pattern(rng, 8))
+        alignment = SemiGlobalAlignment([edit_window], test_metrics, ScalingFunctions.sqrt)
+        alignments = alignment.alignments(0)
+        starts = [entry.start for entry in alignments]
+        assert starts == sorted(set(starts))
+        costs, tracked = alignment.costs(0), alignment.starts(0)
+        for entry in alignments:
+            ends = [end for end in range(1, len(costs)) if tracked[end] == entry.start]
+            assert entry.weight == min(costs[end] / (end - entry.start + 1) for end in ends)
+            assert entry.end in ends
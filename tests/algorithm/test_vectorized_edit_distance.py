@@ -0,0 +1,62 @@
+import random
+from decimal import Decimal
+from typing import Callable, Final, List
+
+import numpy as np
+import pytest
+
+from algorithm.adaptive_edit_distance import AdaptiveEditDistance
+from algorithm.model.distance_metrics import DistanceMetrics, ScalingFunctions
+from algorithm.model.edit_window import EditWindow
+from algorithm.model.sequence_features import SequenceFeatures
+from algorithm.vectorized_edit_distance import VectorizedEditDistance
+
+test_metrics: Final[List[Callable]] = [
+    DistanceMetrics.replacement_with_penalty,
+    DistanceMetrics.insertion_without_expansion,
+    DistanceMetrics.insertion_with_expansion,
+    DistanceMetrics.deletion_without_compression,
+    DistanceMetrics.deletion_with_compression,
+]
+
+
+def build_random_window(rng: random.Random, stream_length: int, pattern_length: int) -> EditWindow:
+    def intervals(length: int) -> List:
+        return [None if rng.random() < 0.1 else rng.randint(-9, 9) for _ in range(length)]
+
+    def durations(length: int) -> List[Decimal]:
+        return [Decimal(rng.choice([1, 2, 3, 4, 6, 8])) / rng.choice([1, 2]) for _ in range(length + 1)]
+
+    return EditWindow(
+        SequenceFeatures.from_values(intervals(stream_length), durations(stream_length)),
+        SequenceFeatures.from_values(intervals(pattern_length), durations(pattern_length)),
+    )
+
+
+class TestVectorizedEditDistance:
+    @pytest.mark.parametrize("seed", range(20))
+    @pytest.mark.parametrize("scaling_func", [ScalingFunctions.sqrt, ScalingFunctions.floored_sqrt])
+    def test_memo_identical_to_reference(self, seed, scaling_func):
+        rng = random.Random(seed)
+        edit_window = build_random_window(rng, rng.randint(0, 40), rng.randint(1, 20))
+        reference = AdaptiveEditDistance(edit_window, test_metrics, scaling_func)
+        vectorized = VectorizedEditDistance(edit_window, test_metrics, scaling_func)
+        assert np.array_equal(reference._memo, vectorized._memo)
+        assert reference.get_limits() == vectorized.get_limits()
+        assert reference.get_limits(pattern_complete=True) == vectorized.get_limits(pattern_complete=True)
+
+    @pytest.mark.parametrize("seed", range(10))
+    def test_metric_subset_identical_to_reference(self, seed):
+        rng = random.Random(seed)
+        metrics = rng.sample(test_metrics, rng.randint(1, len(test_metrics)))
+        edit_window = build_random_window(rng, 24, 15)
+        reference = AdaptiveEditDistance(edit_window, metrics, ScalingFunctions.sqrt)
+        vectorized = VectorizedEditDistance(edit_window, metrics, ScalingFunctions.sqrt)
+        assert np.array_equal(reference._memo, vectorized._memo)
+
+    def test_unknown_metric_raises(self):
+        def custom_metric(memo, edit_window, cur_i, cur_j, scale):
+            return 0.0
+
+        with pytest.raises(ValueError):
+            VectorizedEditDistance(build_random_window(random.Random(0), 4, 3), [custom_metric], ScalingFunctions.sqrt)
@@ -0,0 +1,59 @@
+import random
+
+import numpy as np
+import pytest
+
+from algorithm.batched_edit_distance import BatchedEditDistance
+from algorithm.model.distance_metrics import ScalingFunctions
+from algorithm.workspace_pool import WorkspacePool
+from tests.algorithm.test_vectorized_edit_distance import build_random_window, test_metrics
+
+
+class TestWorkspacePool:
+    def test_buffer_grows_then_reused(self):
+        workspace = WorkspacePool()
+        assert workspace.buffer("memo", (3, 4), fill=0.0).shape == (3, 4)
+        assert workspace.buffer("memo", (2, 2), fill=1.0).sum() == 4
+        assert workspace.buffer("memo", (4, 4)).shape == (4, 4)
+        assert workspace.buffer("memo", (4, 5)).shape == (4, 5)
+        assert (workspace.allocations, workspace.reuses) == (2, 2)
+        assert workspace.allocated_bytes == 8 * 24
+
+    def test_names_and_dtypes_apart(self):
+        workspace = WorkspacePool()
+        workspace.buffer("memo", (3, 3), fill=np.inf)
+        assert workspace.buffer("starts", (3, 3), np.int64, fill=-1).dtype == np.int64
+        assert workspace.buffer("memo", (3, 3), bool, fill=True).dtype == bool
+        assert workspace.allocations == 3
+
+    def test_keep_outlives_buffer(self):
+        workspace = WorkspacePool()
+        memo = workspace.buffer("memo", (2, 3), fill=1.0)
+        kept = workspace.keep("kept", memo)
+        workspace.buffer("memo", (2, 3), fill=2.0)
+        assert np.array_equal(kept, np.ones((2, 3)))
+
+    @pytest.mark.parametrize("track_starts", [False, True])
+    def test_steady_state_batches_allocate_nothing(self, track_starts):
+        rng = random.Random(0)
+        workspace = WorkspacePool()
+        batches = [[build_random_window(rng, rng.randint(0, 30), 12) for _ in range(4)] for _ in range(5)]
+        BatchedEditDistance(
+            batches[0], test_metrics, ScalingFunctions.sqrt, track_starts=track_starts, workspace=workspace
+        )
+        BatchedEditDistance(
+            [build_random_window(rng, 30, 12) for _ in range(4)],
+            test_metrics,
+            ScalingFunctions.sqrt,
+            track_starts=track_starts,
+            workspace=workspace,
+        )
+        allocations = workspace.allocations
+        for edit_windows in batches[1:]:
+            pooled = BatchedEditDistance(
+                edit_windows, test_metrics, ScalingFunctions.sqrt, track_starts=track_starts, workspace=workspace
+            )
+            fresh = BatchedEditDistance(edit_windows, test_metrics, ScalingFunctions.sqrt, track_starts=track_starts)
+            for idx in range(len(edit_windows)):
+                assert np.array_equal(pooled.memo(idx), fresh.memo(idx))
+        assert workspace.allocations == allocations
@@ -0,0 +1,42 @@
+import pickle
+
+import pytest
+
+from model.duration import Duration
+
+
+@pytest.fixture
+def scale():
+    previous: int = Duration.SCALE
+    Duration.set_scale(8)
+    yield 8
+    Duration.set_scale(previous)
+
+
+class TestDuration:
+    def test_interned(self):
+        assert Duration(12) is Duration(12)
+        assert Duration(4) + Duration(8) is Duration(12)
+        assert Duration(4) - Duration(16) is Duration(12)
+
+    def test_immutable(self):
+        with pytest.raises(AttributeError):
+            Duration(12).raw_duration = 13
+
+    def test_pickle_keeps_interning(self):
+        assert pickle.loads(pickle.dumps(Duration(12))) is Duration(12)
+
+    @pytest.mark.parametrize(
+        "raw_duration, expected_repr",
+        [(8, "1"), (12, "1+1/2"), (14, "1+1/2+1/4"), (1, "1/8"), (40, "4+1"), (3, "1/4+1/8")],
+    )
+    def test_lazy_parts(self, scale, raw_duration, expected_repr):
+        duration = Duration(raw_duration)
+        assert repr(duration) == expected_repr
+        assert duration.is_compound == ("+" in expected_repr)
+        assert sum(duration.parts) * scale == raw_duration
+
+    def test_parts_follow_scale(self, scale):
+        assert repr(Duration(8)) == "1"
+        Duration.set_scale(4)
+        assert repr(Duration(8)) == "2"
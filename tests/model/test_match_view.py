@@ -0,0 +1,48 @@
+import random
+import tracemalloc
+
+import numpy as np
+import pytest
+
+from model.match_view import MatchView
+from model.note_sequence import NoteSequence
+from tests.model.test_note_sequence import as_tuples, build_notes
+
+
+@pytest.fixture
+def stream() -> NoteSequence:
+    return NoteSequence(build_notes(random.Random(0), 200))
+
+
+class TestMatchView:
+    @pytest.mark.parametrize("start, end", [(0, 10), (37, 80), (150, 200), (20, 21)])
+    def test_same_as_materialized(self, stream, start, end):
+        view, sequence = MatchView(stream, start, end, 1), stream[start:end]
+        assert len(view) == len(sequence)
+        assert as_tuples(view) == as_tuples(sequence) == as_tuples(view.materialize())
+        assert view.raw_intervals == sequence.raw_intervals
+        assert view.raw_durations == sequence.raw_durations
+        assert np.array_equal(view.rests, sequence.rests)
+        if not view.rests.all():
+            assert as_tuples([view.first_note, view.last_note]) == as_tuples([sequence.first_note, sequence.last_note])
+
+    def test_shares_stream_columns(self, stream):
+        view = MatchView(stream, 10, 50)
+        assert np.shares_memory(view.rests, stream.rests)
+
+    def test_out_of_range(self, stream):
+        with pytest.raises(IndexError):
+            MatchView(stream, 10, 20)[10]
+        with pytest.raises(AssertionError):
+            MatchView(stream, 10, 201)
+
+    def test_constant_memory_per_match(self, stream):
+        tracemalloc.start()
+        try:
+            start = tracemalloc.get_traced_memory()[0]
+            views = [MatchView(stream, idx, idx + 100, 1) for idx in range(100)]
+            used = tracemalloc.get_traced_memory()[0] - start
+        finally:
+            tracemalloc.stop()
+        assert len(views) == 100
+        assert used / len(views) < 128
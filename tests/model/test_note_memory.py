@@ -0,0 +1,63 @@
+import random
+import tracemalloc
+from typing import Callable, Final, List
+
+import pytest
+
+from model.note_name import NoteName
+from model.note_sequence import NoteSequence
+from model.position import Position
+from model.tagged.note import TaggedNote
+
+test_note_count: Final[int] = 20000
+# Bytes per note measured by ``bytes_per_note`` on the same notes before the note model was slotted, when notes
+# held a ``__dict__``, a ``Position`` of their own and a list of ids.
+baseline_tagged_note_bytes: Final[int] = 287
+
+
+def build_notes(count: int) -> List[TaggedNote]:
+    rng = random.Random(0)
+    return [
+        TaggedNote.from_raw(
+            (
+                None
+                if rng.random() < 0.1
+                else NoteName.from_raw(rng.choice("CDEFGAB"), rng.choice([-1, 0, 1]))
+                .as_position(rng.randint(2, 6))
+                .abs_position
+            ),
+            rng.choice([1, 2, 4, 8]),
+            [idx],
+        )
+        for idx in range(count)
+    ]
+
+
+def bytes_per_note(build: Callable[[], object], count: int) -> float:
+    tracemalloc.start()
+    try:
+        start: int = tracemalloc.get_traced_memory()[0]
+        kept = build()
+        used: int = tracemalloc.get_traced_memory()[0] - start
+    finally:
+        tracemalloc.stop()
+    assert kept is not None
+    return used / count
+
+
+class TestNoteMemory:
+    """Memory benchmark against the bytes per note recorded before the note model was slotted."""
+
+    def test_tagged_note_bytes(self):
+        used: float = bytes_per_note(lambda: build_notes(test_note_count), test_note_count)
+        assert used < 0.7 * baseline_tagged_note_bytes
+
+    def test_note_sequence_bytes(self):
+        notes: List[TaggedNote] = build_notes(test_note_count)
+        used: float = bytes_per_note(lambda: NoteSequence(notes), test_note_count)
+        assert used < 64
+
+    @pytest.mark.parametrize("abs_position", [0, 60, 127])
+    def test_positions_interned(self, abs_position):
+        assert Position(abs_position) is Position(abs_position)
+        assert not hasattr(Position(abs_position), "__dict__")
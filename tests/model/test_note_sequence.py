@@ -0,0 +1,148 @@
+import random
+from typing import Final, List
+
+import numpy as np
+import pytest
+
+from model.note import Note
+from model.note_sequence import NoteSequence
+from model.tagged.note import TaggedNote
+
+test_pitches: Final[List] = [60, 62, None, None, 64, 65, None, 67, 60]
+
+
+def build_notes(rng: random.Random, length: int) -> List[Note]:
+    notes: List[Note] = list()
+    for idx in range(length):
+        pitch = None if rng.random() < 0.3 else rng.randint(40, 80)
+        if pitch is None and rng.random() < 0.3:
+            notes.append(Note.from_raw(None, rng.choice([1, 2, 4])))
+        else:
+            notes.append(TaggedNote.from_raw(pitch, rng.choice([1, 2, 4]), [idx]))
+    return notes
+
+
+def as_tuples(notes) -> List:
+    return [
+        (note.is_rest(), None if note.is_rest() else note.position.abs_position, note.duration.raw_duration)
+        + ((tuple(note.ids),) if note.is_tagged() else ())
+        for note in notes
+    ]
+
+
+class TestNoteSequence:
+    @pytest.mark.parametrize("seed", range(5))
+    def test_notes_round_trip(self, seed):
+        notes = build_notes(random.Random(seed), 50)
+        sequence = NoteSequence(notes)
+        assert len(sequence) == 50
+        assert as_tuples(sequence) == as_tuples(notes)
+        assert as_tuples([sequence[-1]]) == as_tuples(notes[-1:])
+
+    @pytest.mark.parametrize("seed", range(5))
+    def test_raw_intervals_from_columns(self, seed):
+        notes = build_notes(random.Random(seed), 50)
+        sequence = NoteSequence(notes)
+        expected = [
+            None if left.is_rest() or right.is_rest() else (right.position - left.position).value
+            for left, right in zip(notes, notes[1:])
+        ]
+        assert sequence.raw_intervals == expected
+        assert sequence.raw_intervals_range(10, 20) == expected[10:20]
+        assert sequence.raw_durations_range(10, 20) == [note.duration.raw_duration for note in notes[10:21]]
+
+    def test_slice_keeps_ids(self):
+        sequence = NoteSequence(TaggedNote.from_raw(pitch, 1, [idx]) for idx, pitch in enumerate(test_pitches))
+        window = sequence[4:8]
+        assert isinstance(window, NoteSequence)
+        assert [list(note.ids) for note in window] == [[4], [5], [6], [7]]
+        assert window.first_note.ids == range(4, 5) and window.last_note.ids == range(7, 8)
+        assert len(sequence[5:5]) == 0
+
+    @pytest.mark.parametrize("seed", range(5))
+    def test_slice_copies_own_ids(self, seed):
+        rng = random.Random(seed)
+        notes = build_notes(rng, 50)
+        sequence = NoteSequence(notes)
+        low = rng.randint(0, 40)
+        high = rng.randint(low, 50)
+        window = sequence[low:high]
+        assert as_tuples(window) == as_tuples(notes[low:high])
+        assert len(window.note_ids) == sum(len(note.ids) for note in notes[low:high] if note.is_tagged())
+        assert window.id_offsets[0] == 0
+        assert not np.shares_memory(window.note_ids, sequence.note_ids)
+        owner = window.note_ids if window.note_ids.base is None else window.note_ids.base
+        assert owner.size == len(window.note_ids)
+
+    def test_merge_last_note(self):
+        sequence = NoteSequence([TaggedNote.from_raw(60, 2, [0])])
+        sequence.merge_last_note(TaggedNote.from_raw(60, 3, [1]))
+        sequence.append_note(TaggedNote.from_raw(62, 1, [2]))
+        assert as_tuples(sequence) == [(False, 60, 5, (0, 1)), (False, 62, 1, (2,))]
+
+    def test_optimize_merges_rests_by_tagging(self):
+        sequence = NoteSequence(
+            [
+                TaggedNote.from_raw(60, 1, [0]),
+                TaggedNote.from_raw(None, 1, [1]),
+                TaggedNote.from_raw(None, 2, [2]),
+                Note.from_raw(None, 4),
+                Note.from_raw(None, 4),
+                TaggedNote.from_raw(None, 1, [3]),
+                TaggedNote.from_raw(62, 1, [4]),
+            ]
+        )
+        assert as_tuples(sequence.optimize()) == [
+            (False, 60, 1, (0,)),
+            (True, None, 3, (1, 2)),
+            (True, None, 8),
+            (True, None, 1, (3,)),
+            (False, 62, 1, (4,)),
+        ]
+
+    def test_add_and_extend(self):
+        left, right = build_notes(random.Random(0), 20), build_notes(random.Random(1), 30)
+        assert as_tuples(NoteSequence(left) + NoteSequence(right)) == as_tuples(left + right)
+
+    def test_columns(self):
+        sequence = NoteSequence(TaggedNote.from_raw(pitch, 1, [idx]) for idx, pitch in enumerate(test_pitches))
+        assert sequence.pitches.dtype == np.int16
+        assert list(sequence.rests) == [pitch is None for pitch in test_pitches]
+        assert list(sequence.id_offsets) == list(range(len(test_pitches) + 1))
+
+    def test_views_cached(self):
+        sequence = NoteSequence(TaggedNote.from_raw(pitch, 1, [idx]) for idx, pitch in enumerate(test_pitches))
+        assert sequence.raw_intervals is sequence.raw_intervals
+        assert sequence.first_note is sequence.first_note
+        assert sequence.view_stats == (2, 2)
+
+    def test_lstrip_rests(self):
+        sequence = NoteSequence(TaggedNote.from_raw(pitch, 1, [idx]) for idx, pitch in enumerate([None] + test_pitches))
+        sequence.lstrip_rests()
+        expected = [TaggedNote.from_raw(pitch, 1, [idx + 1]) for idx, pitch in enumerate(test_pitches)]
+        assert as_tuples(sequence) == as_tuples(expected)
+
+    def test_lstrip_rests_only_rests(self):
+        sequence = NoteSequence(TaggedNote.from_raw(None, 1, [idx]) for idx in range(3))
+        sequence.lstrip_rests()
+        assert len(sequence) == 0
+        assert list(sequence.notes) == []
+
+    @pytest.mark.parametrize(
+        "mutate",
+        [
+            lambda sequence: sequence.append_note(TaggedNote.from_raw(70, 1, [100])),
+            lambda sequence: sequence.extend_notes(NoteSequence([TaggedNote.from_raw(70, 1, [100])])),
+            lambda sequence: sequence.merge_last_note(TaggedNote.from_raw(60, 1, [100])),
+            lambda sequence: sequence.lstrip_rests(),
+            lambda sequence: sequence.optimize(),
+        ],
+    )
+    def test_views_invalidated_on_change(self, mutate):
+        sequence = NoteSequence(TaggedNote.from_raw(pitch, 1, [idx]) for idx, pitch in enumerate([None] + test_pitches))
+        raw_intervals, raw_durations = sequence.raw_intervals, sequence.raw_durations
+        mutate(sequence)
+        assert sequence.raw_intervals is not raw_intervals
+        assert sequence.raw_durations is not raw_durations
+        assert sequence.raw_intervals == NoteSequence(sequence.notes).raw_intervals
+        assert sequence.raw_durations == NoteSequence(sequence.notes).raw_durations
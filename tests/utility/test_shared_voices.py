@@ -0,0 +1,53 @@
+import random
+from multiprocessing.shared_memory import SharedMemory
+
+import numpy as np
+import pytest
+
+from model.note_sequence import NoteSequence
+from model.tagged.note import TaggedNote
+from tests.workers.conftest import build_voice
+from utility.shared_voices import SharedVoices
+
+
+class TestSharedVoices:
+    @pytest.fixture
+    def voices(self):
+        rng = random.Random(0)
+        return {voice: build_voice(rng, rng.randint(0, 40)) for voice in range(3)}
+
+    def test_attach_round_trip(self, voices):
+        voices[3] = NoteSequence([TaggedNote.from_raw(60, 1, [0, 1]), TaggedNote.from_raw(None, 2, [])])
+        with SharedVoices(voices) as shared_voices:
+            for voice, sequence in voices.items():
+                attached = SharedVoices.attach(shared_voices.descriptors[voice])
+                for name in SharedVoices.COLUMNS:
+                    assert np.array_equal(getattr(attached, name), getattr(sequence, name))
+                assert attached.notes == sequence.notes
+                assert [getattr(note, "ids", None) for note in attached] == [
+                    getattr(note, "ids", None) for note in sequence
+                ]
+
+    def test_zero_copy(self, voices):
+        with SharedVoices(voices) as shared_voices:
+            descriptor = shared_voices.descriptors[0]
+            attached = SharedVoices.attach(descriptor)
+            for name in SharedVoices.COLUMNS:
+                assert not getattr(attached, name).flags.owndata
+                with pytest.raises(ValueError):
+                    getattr(attached, name)[0] = 0
+            block = SharedMemory(descriptor.name)
+            try:
+                offset = descriptor.columns[SharedVoices.COLUMNS.index("ticks")].offset
+                block.buf[offset : offset + 8] = np.int64(1234).tobytes()
+            finally:
+                block.close()
+            assert attached.ticks[0] == 1234
+
+    def test_close_releases_blocks(self, voices):
+        shared_voices = SharedVoices(voices)
+        names = [descriptor.name for descriptor in shared_voices.descriptors.values()]
+        shared_voices.close()
+        for name in names:
+            with pytest.raises(FileNotFoundError):
+                SharedMemory(name)
@@ -0,0 +1,47 @@
+import random
+from decimal import Decimal
+
+import numpy as np
+import pytest
+
+from model.constants import EditDistanceEngine, TraceEvent
+from model.note import Note
+from model.note_sequence import NoteSequence
+from tests.workers.conftest import build_voice, subject_pitches, window_metrics, window_transformations
+from utility.tracer import Tracer
+from workers.stream_matcher import StreamMatcher
+from workers.window_evaluator import WindowEvaluator
+
+
+class TestTracer:
+    @pytest.fixture
+    def subject(self):
+        return NoteSequence([Note.from_raw(pitch, Decimal(1)) for pitch in subject_pitches])
+
+    @pytest.mark.parametrize("engine", [EditDistanceEngine.PYTHON, EditDistanceEngine.NUMPY])
+    def test_trace_of_propagation(self, tmp_path, subject, engine):
+        path = str(tmp_path / "trace.bin")
+        stream_matcher = StreamMatcher(build_voice(random.Random(0), 20), 0.3, 4, window_metrics, engine)
+        Tracer.open(path, memos=True)
+        try:
+            results = WindowEvaluator(window_metrics, engine).run(
+                stream_matcher.propagations(subject, window_transformations)
+            )
+        finally:
+            Tracer.close()
+        records = Tracer.read(path)
+        windows = records[records["event"] == TraceEvent.WINDOW]
+        assert len(windows) > 0
+        assert np.count_nonzero(records["event"] == TraceEvent.MATCHED) == sum(len(matches) for matches in results)
+        assert list(windows["memo"]) == list(range(len(windows)))
+        for window in windows[:10]:
+            memo = Tracer.read_memo(path, window["memo"])
+            assert memo.shape[1] == len(subject_pitches)
+            assert window["stream_end"] - window["stream_start"] + 1 == memo.shape[0]
+
+    def test_disabled_by_default(self, tmp_path):
+        assert not Tracer.enabled
+        assert Tracer.next_matcher() == 0
+        Tracer.emit(TraceEvent.WINDOW, window_transformations[0], 0, 0)
+        assert Tracer.dump(np.zeros((2, 2))) == -1
+        assert list(tmp_path.iterdir()) == list()
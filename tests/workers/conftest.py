@@ -0,0 +1,58 @@
+import random
+from decimal import Decimal
+from typing import Callable, Final, List
+
+from algorithm.model.distance_metrics import DistanceMetrics
+from model.constants import Transformation
+from model.note_sequence import NoteSequence
+from model.tagged.note import TaggedNote
+
+window_metrics: Final[List[Callable]] = [
+    DistanceMetrics.replacement_with_penalty,
+    DistanceMetrics.insertion_without_expansion,
+    DistanceMetrics.insertion_with_expansion,
+    DistanceMetrics.deletion_without_compression,
+    DistanceMetrics.deletion_with_compression,
+]
+window_transformations: Final[List[Transformation]] = [
+    Transformation.DEFAULT,
+    Transformation.INVERSION,
+    Transformation.REVERSAL,
+]
+subject_pitches: Final[List[int]] = [60, 62, 64, 65, 67, 65, 64, 62, 60]
+subject_rhythm: Final[List[int]] = [2, 1, 1, 2, 4, 1, 1, 2, 4]
+
+
+def build_voice(rng: random.Random, length: int) -> NoteSequence:
+    """Random walk of tagged notes and rests, with the subject pitches inserted at random."""
+    pitches, position = list(), 60
+    for _ in range(length):
+        if rng.random() < 0.2:
+            pitches.extend(subject_pitches)
+        position += rng.randint(-4, 4)
+        pitches.append(None if rng.random() < 0.05 else position)
+    return NoteSequence(TaggedNote.from_raw(pitch, rng.choice([1, 2]), [idx]) for idx, pitch in enumerate(pitches))
+
+
+def build_varied_voice(rng: random.Random, length: int) -> NoteSequence:
+    """Tagged leaps between transposed subjects, some with a note split in two or two notes merged."""
+    notes, position = list(), 60
+    for _ in range(length):
+        if rng.random() < 0.15:
+            pitches, ticks = list(subject_pitches), list(subject_rhythm)
+            idx = rng.randrange(1, len(pitches) - 1)
+            variation = rng.random()
+            if variation < 0.3 and ticks[idx] > 1:
+                pitches[idx : idx + 1] = [pitches[idx], pitches[idx] + rng.choice([-1, 1])]
+                ticks[idx : idx + 1] = [ticks[idx] - 1, 1]
+            elif 0.3 <= variation < 0.6:
+                pitches[idx : idx + 2] = [pitches[idx]]
+                ticks[idx : idx + 2] = [ticks[idx] + ticks[idx + 1]]
+            shift = rng.randint(-5, 5)
+            notes.extend(
+                TaggedNote.from_raw(pitch + shift, Decimal(tick), [len(notes) + idx])
+                for idx, (pitch, tick) in enumerate(zip(pitches, ticks))
+            )
+        position = max(30, min(90, position + rng.choice([-9, -7, 7, 9])))
+        notes.append(TaggedNote.from_raw(position, Decimal(rng.choice([1, 3])), [len(notes)]))
+    return NoteSequence(notes)
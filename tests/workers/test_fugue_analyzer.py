@@ -0,0 +1,30 @@
+import random
+from decimal import Decimal
+
+import pytest
+
+from model.composition import Composition
+from model.constants import EditDistanceEngine
+from model.note import Note
+from model.note_sequence import NoteSequence
+from tests.workers.conftest import build_voice, subject_pitches, window_transformations
+from workers.fugue_analyzer import FugueAnalyzer
+
+
+class TestFugueAnalyzer:
+    @pytest.mark.parametrize("seed", range(3))
+    def test_cutoff_identical_to_full(self, seed):
+        rng = random.Random(seed)
+        composition = Composition({voice: build_voice(rng, rng.randint(40, 80)) for voice in range(2)})
+        subject = NoteSequence([Note.from_raw(pitch, Decimal(1)) for pitch in subject_pitches])
+        voice_matches = [
+            {
+                voice: [(match.start, match.end, transformation) for match, transformation in matches]
+                for voice, matches in FugueAnalyzer(composition, 0.3, 4, EditDistanceEngine.PYTHON, cutoff=cutoff)
+                .match_subject(subject, set(window_transformations))
+                .items()
+            }
+            for cutoff in (False, True)
+        ]
+        assert voice_matches[0] == voice_matches[1]
+        assert any(voice_matches[0].values())
@@ -0,0 +1,67 @@
+from typing import Final, List
+
+import pytest
+
+from algorithm.model.skip_sequence import SkipSequence
+from model.duration import Duration
+from workers.parsers.musicxml.musicxml_parser import MusicXMLParser
+
+
+def note(step: str, duration: int, voice: int = 1) -> str:
+    return (
+        f"<note><pitch><step>{step}</step><octave>4</octave></pitch>"
+        f"<duration>{duration}</duration><voice>{voice}</voice></note>"
+    )
+
+
+def rest(duration: int, voice: int = 1) -> str:
+    return f"<note><rest/><duration>{duration}</duration><voice>{voice}</voice></note>"
+
+
+def attributes(divisions: int = None, beats: int = None) -> str:
+    divisions_element: str = "" if divisions is None else f"<divisions>{divisions}</divisions>"
+    time_element: str = "" if beats is None else f"<time><beats>{beats}</beats><beat-type>4</beat-type></time>"
+    return f"<attributes>{divisions_element}{time_element}</attributes>"
+
+
+test_measures: Final[List[str]] = [
+    attributes(divisions=2, beats=2) + note("C", 2) + note("D", 2) + rest(4, voice=2),
+    attributes(divisions=3) + note("E", 1) + note("F", 1) + note("G", 1) + note("A", 3),
+    note("B", 1) + note("C", 2) + attributes(divisions=2) + note("D", 1) + note("E", 1) + note("F", 2, voice=2),
+]
+
+
+@pytest.fixture
+def test_score(tmp_path) -> str:
+    file_name: str = str(tmp_path / "score.musicxml")
+    with open(file_name, "w") as score:
+        score.write(
+            "<score-partwise><part>"
+            + "".join(f"<measure>{measure}</measure>" for measure in test_measures)
+            + "</part></score-partwise>"
+        )
+    return file_name
+
+
+class TestMusicXMLParser:
+    def test_durations_in_ticks_across_division_changes(self, test_score):
+        composition = MusicXMLParser(test_score).to_composition()
+        assert Duration.SCALE == 6
+        assert composition.voices[1].raw_durations == [6, 6, 2, 2, 2, 6, 2, 4, 3, 3]
+        assert composition.voices[2].raw_durations == [12, 12, 6]
+        assert all(type(duration) is int for duration in composition.voices[1].raw_durations)
+
+    def test_default_rest_fills_measure(self, test_score):
+        composition = MusicXMLParser(test_score).to_composition()
+        assert composition.voices[2][1].is_rest()
+        assert composition.voices[2][1].duration.raw_duration == 12
+
+    def test_display_durations(self, test_score):
+        composition = MusicXMLParser(test_score).to_composition()
+        assert [repr(duration) for duration in composition.voices[1].durations[:3]] == ["1", "1", "1/4+1/16"]
+        assert composition.voices[1][8].duration.real_duration * 2 == 1
+
+    def test_skip_sequence_on_ticks(self, test_score):
+        composition = MusicXMLParser(test_score).to_composition()
+        skip_sequence = SkipSequence(composition.voices)
+        assert skip_sequence.next_moment(0, 2) == skip_sequence.next_moment(skip_sequence.next_moment(0, 1), 1)
@@ -0,0 +1,57 @@
+import random
+from decimal import Decimal
+
+import pytest
+
+from model.constants import EditDistanceEngine, Transformation
+from model.note import Note
+from model.note_sequence import NoteSequence
+from tests.workers.conftest import build_voice, subject_pitches, window_metrics, window_transformations
+from workers.stream_matcher import StreamMatcher
+from workers.task_executor import TaskExecutor
+from workers.window_evaluator import WindowEvaluator
+
+
+def serial_matches(stream_matchers, variants):
+    results = WindowEvaluator(window_metrics).run(
+        [
+            stream_matcher.propagate(variants, transformation)
+            for stream_matcher in stream_matchers.values()
+            for transformation in window_transformations
+        ]
+    )
+    return [
+        [(match.start, match.end, transformation, weight) for match, transformation, weight in matches]
+        for matches in results
+    ]
+
+
+class TestTaskExecutor:
+    @pytest.mark.parametrize("seed", range(2))
+    @pytest.mark.parametrize("overlap_patterns", [0, 8])
+    def test_identical_to_serial(self, seed, overlap_patterns, monkeypatch):
+        monkeypatch.setattr(TaskExecutor, "SEGMENT_PATTERNS", 2)
+        monkeypatch.setattr(TaskExecutor, "OVERLAP_PATTERNS", overlap_patterns)
+        rng = random.Random(seed)
+        subject = NoteSequence([Note.from_raw(pitch, Decimal(1)) for pitch in subject_pitches])
+        stream_matchers = {
+            voice: StreamMatcher(build_voice(rng, rng.randint(100, 200)), 0.3, 4, window_metrics, voice=voice)
+            for voice in range(3)
+        }
+        variants = StreamMatcher.subject_variants(subject, window_transformations)
+        expected = serial_matches(stream_matchers, variants)
+        executor = TaskExecutor(
+            stream_matchers, variants, window_transformations, window_metrics, EditDistanceEngine.NUMPY, jobs=2
+        )
+        voice_matches = executor.run()
+        actual = [
+            [(match.start, match.end, transformation, weight) for match, transformation, weight in voice_matches[voice]]
+            for voice in stream_matchers
+        ]
+        assert actual == [
+            [match for matches in expected[voice * 3 : voice * 3 + 3] for match in matches] for voice in range(3)
+        ]
+        assert all(match.voice == voice for voice in voice_matches for match, _, _ in voice_matches[voice])
+        assert len(executor.tasks()[(0, Transformation.DEFAULT)]) > 1
+        if overlap_patterns == 0:
+            assert executor.resumed_segments > 0
@@ -0,0 +1,129 @@
+import random
+from decimal import Decimal
+from fractions import Fraction
+
+import pytest
+
+from model.constants import EditDistanceEngine, Prefilter, Transformation
+from model.note import Note
+from model.note_sequence import NoteSequence
+from model.tagged.note import TaggedNote
+from tests.workers.conftest import (
+    build_varied_voice,
+    build_voice,
+    subject_pitches,
+    subject_rhythm,
+    window_metrics,
+    window_transformations,
+)
+from workers.stream_matcher import StreamMatcher
+from workers.window_evaluator import WindowEvaluator
+
+
+class TestWindowEvaluator:
+    @staticmethod
+    def flatten(results):
+        return [
+            (match.raw_intervals, transformation, weight)
+            for matches in results
+            for match, transformation, weight in matches
+        ]
+
+    @pytest.mark.parametrize("seed", range(3))
+    def test_cross_voice_batch_identical_to_serial(self, seed):
+        rng = random.Random(seed)
+        subject = NoteSequence([Note.from_raw(pitch, Decimal(1)) for pitch in subject_pitches])
+        voices = [build_voice(rng, rng.randint(10, 30)) for _ in range(3)]
+
+        serial = [
+            StreamMatcher(voice, 0.3, 4, window_metrics, EditDistanceEngine.PYTHON).propagations(
+                subject, window_transformations
+            )
+            for voice in voices
+        ]
+        batched = [
+            StreamMatcher(voice, 0.3, 4, window_metrics, EditDistanceEngine.NUMPY).propagations(
+                subject, window_transformations
+            )
+            for voice in voices
+        ]
+        expected = [WindowEvaluator(window_metrics, EditDistanceEngine.PYTHON).run(voice) for voice in serial]
+        actual = WindowEvaluator(window_metrics, EditDistanceEngine.NUMPY).run(
+            [propagation for voice in batched for propagation in voice]
+        )
+        assert self.flatten(actual) == self.flatten([matches for voice in expected for matches in voice])
+        assert len(self.flatten(actual)) > 0
+
+    def test_second_run_allocates_nothing(self):
+        rng = random.Random(0)
+        subject = NoteSequence([Note.from_raw(pitch, Decimal(1)) for pitch in subject_pitches])
+        voice = build_voice(rng, 30)
+        window_evaluator = WindowEvaluator(window_metrics, EditDistanceEngine.NUMPY)
+        first = window_evaluator.run(
+            StreamMatcher(voice, 0.3, 4, window_metrics).propagations(subject, window_transformations)
+        )
+        allocations = window_evaluator.workspace.allocations
+        second = window_evaluator.run(
+            StreamMatcher(voice, 0.3, 4, window_metrics).propagations(subject, window_transformations)
+        )
+        assert self.flatten(first) == self.flatten(second)
+        assert window_evaluator.workspace.allocations == allocations
+        assert window_evaluator.workspace.reuses > 0
+
+    # Seeds need a budget of few errors: at 0.2 the subject fits none and seeds keep every start.
+    @pytest.mark.parametrize("seed", range(10))
+    @pytest.mark.parametrize(
+        "prefilter, sensitivity, min_match",
+        [(Prefilter.SCAN, 0.2, 4), (Prefilter.SCAN, 0.05, 1), (Prefilter.SEEDS, 0.05, 1)],
+    )
+    def test_prefilter_keeps_matches(self, seed, prefilter, sensitivity, min_match, monkeypatch):
+        rng = random.Random(seed)
+        subject = NoteSequence(
+            [Note.from_raw(pitch, Decimal(ticks)) for pitch, ticks in zip(subject_pitches, subject_rhythm)]
+        )
+        voice = build_varied_voice(rng, rng.randint(40, 80))
+        stream_matcher = StreamMatcher(voice, sensitivity, min_match, window_metrics, prefilter=prefilter)
+        actual = WindowEvaluator(window_metrics).run(stream_matcher.propagations(subject, window_transformations))
+        assert all(pruned_fraction > 0 for pruned_fraction in stream_matcher.pruned_fractions.values())
+        # Regions over the whole voice: an unfiltered run, accepting windows on the complete pattern only.
+        monkeypatch.setattr(
+            StreamMatcher, "error_budget", lambda self, variants, transformation: len(variants.pattern.intervals)
+        )
+        unfiltered = StreamMatcher(voice, sensitivity, min_match, window_metrics, prefilter=prefilter)
+        expected = WindowEvaluator(window_metrics).run(unfiltered.propagations(subject, window_transformations))
+        assert all(pruned_fraction == 0 for pruned_fraction in unfiltered.pruned_fractions.values())
+        # Rejected windows step over different starts once regions skip positions, so the prefiltered run may
+        # find more, never fewer matches.
+        matches = [
+            {
+                (match.start, match.end, transformation, weight)
+                for matches in run
+                for match, transformation, weight in matches
+            }
+            for run in (actual, expected)
+        ]
+        assert matches[1] <= matches[0]
+        assert len(matches[1]) > 0
+
+    @pytest.mark.parametrize(
+        "factor",
+        [Fraction(1, 3), Fraction(1, 2), Fraction(2, 3), Fraction(5, 4), Fraction(3, 2), Fraction(3), Fraction(6)],
+    )
+    @pytest.mark.parametrize("engine", [EditDistanceEngine.PYTHON, EditDistanceEngine.NUMPY])
+    def test_scaling_reports_factor(self, factor, engine):
+        rng = random.Random(0)
+        subject = NoteSequence(
+            [Note.from_raw(pitch, 12 * ticks) for pitch, ticks in zip(subject_pitches, subject_rhythm)]
+        )
+        pitches = [rng.randint(40, 80) for _ in range(12)] + subject_pitches + [rng.randint(40, 80) for _ in range(12)]
+        ticks = [12 * rng.choice([1, 2]) for _ in range(12)] + [int(12 * ticks * factor) for ticks in subject_rhythm]
+        ticks += [12 * rng.choice([1, 2]) for _ in range(12)]
+        notes = [TaggedNote.from_raw(pitch, ticks, [idx]) for idx, (pitch, ticks) in enumerate(zip(pitches, ticks))]
+        stream_matcher = StreamMatcher(NoteSequence(notes), 0.3, 6, window_metrics, engine)
+        default_matches, scaling_matches = WindowEvaluator(window_metrics, engine).run(
+            stream_matcher.propagations(subject, [Transformation.DEFAULT, Transformation.SCALING])
+        )
+        assert (12, 21) not in [(match.start, match.end) for match, _, _ in default_matches]
+        assert [(match.start, match.end, transformation) for match, transformation, _ in scaling_matches] == [
+            (12, 21, f"SCALING_{factor}")
+        ]
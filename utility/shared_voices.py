@@ -0,0 +1,79 @@
+from __future__ import annotations
+
+from collections import namedtuple
+from multiprocessing.shared_memory import SharedMemory
+from typing import Dict, List, Tuple
+
+import numpy as np
+
+from model.note_sequence import NoteSequence
+
+SharedColumn = namedtuple("SharedColumn", ("offset", "dtype", "length"))
+SharedVoice = namedtuple("SharedVoice", ("name", "columns"))
+
+
+class SharedVoices:
+    """
+    Voices exported once into shared memory, for processes to read without receiving a copy.
+
+    Each voice is one block holding its ``NoteSequence`` columns back to back, described by a small picklable
+    ``SharedVoice``. ``attach`` maps a block back into a read-only ``NoteSequence`` without copying, and keeps the
+    block open for the lifetime of the attaching process. The exporting process owns the blocks: ``close`` releases
+    them once no process needs them anymore.
+    """
+
+    COLUMNS: Tuple[str, ...] = ("pitches", "ticks", "rests", "note_ids", "id_offsets")
+    ALIGNMENT: int = 8
+
+    _attached: Dict[str, SharedMemory] = dict()
+
+    def __init__(self, voices: Dict[int, NoteSequence]) -> None:
+        self._blocks: List[SharedMemory] = list()
+        self.descriptors: Dict[int, SharedVoice] = {voice: self._export(sequence) for voice, sequence in voices.items()}
+
+    def __enter__(self) -> SharedVoices:
+        return self
+
+    def __exit__(self, *_) -> None:
+        self.close()
+
+    @property
+    def size(self) -> int:
+        return sum(block.size for block in self._blocks)
+
+    def _export(self, sequence: NoteSequence) -> SharedVoice:
+        columns: List[np.array] = [getattr(sequence, name) for name in self.COLUMNS]
+        offsets: List[int] = list()
+        size: int = 0
+        for column in columns:
+            offsets.append(size)
+            size += -(-column.nbytes // self.ALIGNMENT) * self.ALIGNMENT
+        block: SharedMemory = SharedMemory(create=True, size=max(size, 1))
+        self._blocks.append(block)
+        for column, offset in zip(columns, offsets):
+            np.ndarray(column.shape, column.dtype, buffer=block.buf, offset=offset)[:] = column
+        return SharedVoice(
+            block.name,
+            tuple(SharedColumn(offset, column.dtype.str, len(column)) for column, offset in zip(columns, offsets)),
+        )
+
+    @classmethod
+    def attach(cls, descriptor: SharedVoice) -> NoteSequence:
+        if descriptor.name not in cls._attached:
+            cls._attached[descriptor.name] = SharedMemory(descriptor.name)
+        block: SharedMemory = cls._attached[descriptor.name]
+        columns: List[np.array] = list()
+        for column in descriptor.columns:
+            values: np.array = np.ndarray(
+                (column.length,), np.dtype(column.dtype), buffer=block.buf, offset=column.offset
+            )
+            values.setflags(write=False)
+            columns.append(values)
+        pitches, ticks, rests, note_ids, id_offsets = columns
+        return NoteSequence.from_columns(pitches, ticks, rests, note_ids, id_offsets)
+
+    def close(self) -> None:
+        for block in self._blocks:
+            block.close()
+            block.unlink()
+        self._blocks = list()
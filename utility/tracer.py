@@ -0,0 +1,132 @@
+import os
+from typing import BinaryIO, List, Optional
+
+import numpy as np
+
+from model.constants import Transformation
+
+
+class Tracer:
+    """
+    Structured binary trace of window matching, replacing debug text.
+
+    Disabled by default: every entry point returns at once, and callers only build what an event needs once
+    ``Tracer.enabled`` is set. When opened, events are buffered as ``RECORD`` rows and written to the trace file,
+    memos are dumped as ``.npy`` files next to it, and the ``memo`` field of an event holds its dump number.
+    """
+
+    RECORD: np.dtype = np.dtype(
+        [
+            ("event", "u1"),
+            ("transformation", "u1"),
+            ("forward", "?"),
+            ("matcher", "<u4"),
+            ("stream_start", "<i4"),
+            ("stream_end", "<i4"),
+            ("limit", "<i4"),
+            ("weight", "<f8"),
+            ("memo", "<i4"),
+        ]
+    )
+    TRANSFORMATIONS: List[str] = [
+        Transformation.DEFAULT,
+        Transformation.REVERSAL,
+        Transformation.INVERSION,
+        Transformation.REVERSAL_INVERSION,
+        Transformation.AUGMENTATION,
+        Transformation.DIMINUTION,
+        Transformation.SCALING,
+    ]
+    BUFFER_SIZE: int = 4096
+
+    enabled: bool = False
+    memos: bool = False
+    _file: Optional[BinaryIO] = None
+    _memo_dir: Optional[str] = None
+    _records: List[tuple] = list()
+    _matchers: int = 0
+    _dumps: int = 0
+
+    @staticmethod
+    def memo_dir(path: str) -> str:
+        return f"{path}.memos"
+
+    @staticmethod
+    def open(path: str, memos: bool = False) -> None:
+        Tracer.close()
+        Tracer._file = open(path, "wb")
+        Tracer.enabled, Tracer.memos = True, memos
+        Tracer._records, Tracer._matchers, Tracer._dumps = list(), 0, 0
+        if memos:
+            Tracer._memo_dir = Tracer.memo_dir(path)
+            os.makedirs(Tracer._memo_dir, exist_ok=True)
+
+    @staticmethod
+    def close() -> None:
+        if Tracer._file is None:
+            return
+        Tracer.flush()
+        Tracer._file.close()
+        Tracer._file, Tracer._memo_dir = None, None
+        Tracer.enabled = Tracer.memos = False
+
+    @staticmethod
+    def flush() -> None:
+        if Tracer._records:
+            np.array(Tracer._records, dtype=Tracer.RECORD).tofile(Tracer._file)
+            Tracer._records = list()
+
+    @staticmethod
+    def next_matcher() -> int:
+        """Number identifying a transformation matcher in the trace, 0 when disabled."""
+        if not Tracer.enabled:
+            return 0
+        Tracer._matchers += 1
+        return Tracer._matchers
+
+    @staticmethod
+    def dump(memo: np.array) -> int:
+        if not Tracer.memos:
+            return -1
+        np.save(os.path.join(Tracer._memo_dir, f"{Tracer._dumps:07d}.npy"), memo)
+        Tracer._dumps += 1
+        return Tracer._dumps - 1
+
+    @staticmethod
+    def emit(
+        event: int,
+        transformation: str,
+        matcher: int,
+        stream_start: int,
+        stream_end: int = -1,
+        limit: int = -1,
+        weight: float = np.nan,
+        forward: bool = False,
+        memo: Optional[np.array] = None,
+    ) -> None:
+        if not Tracer.enabled:
+            return
+        memo_idx: int = -1 if memo is None else Tracer.dump(memo)
+        Tracer._records.append(
+            (
+                event,
+                Tracer.TRANSFORMATIONS.index(transformation),
+                forward,
+                matcher,
+                stream_start,
+                stream_end,
+                limit,
+                weight,
+                memo_idx,
+            )
+        )
+        if len(Tracer._records) >= Tracer.BUFFER_SIZE:
+            Tracer.flush()
+
+    @staticmethod
+    def read(path: str) -> np.array:
+        return np.fromfile(path, dtype=Tracer.RECORD)
+
+    @staticmethod
+    def read_memo(path: str, memo_idx: int) -> np.array:
+        return np.load(os.path.join(Tracer.memo_dir(path), f"{memo_idx:07d}.npy"))
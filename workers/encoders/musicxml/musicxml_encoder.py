@@ -1,14 +1,13 @@
 from __future__ import annotations
 
 import xml.etree.ElementTree as ET
-from functools import reduce
 from typing import TYPE_CHECKING, Dict, List, Tuple, Set
 
 from utility.colour_generator import ColourGenerator
 
 if TYPE_CHECKING:
     from model.constants import Transformation
-    from model.note_sequence import NoteSequence
+    from model.match_view import MatchView
     from model.note import Note
 
 
@@ -23,13 +22,11 @@ class MusicXMLEncoder:
     def _get_colour_map(self, transformations: Set[Transformation]) -> Dict[Transformation, str]:
         return {transformation: ColourGenerator.get_new_colour() for transformation in transformations}
 
-    def from_analysis(self, matches: Dict[int, List[Tuple[NoteSequence, Transformation]]], write=True) -> str:
+    def from_analysis(self, matches: Dict[int, List[Tuple[MatchView, Transformation]]], write=True) -> str:
         xml_root: ET.Element = ET.parse(self.file_name).getroot()
         measures: List[ET.Element] = xml_root.findall("part/measure")
         flattened_matches: Dict[int, List[Tuple[Note, Transformation]]] = {
-            voice: list(
-                reduce(lambda acc, item: acc + [(note, item[1]) for note in item[0].notes], matches[voice], list())
-            )
+            voice: [(note, transformation) for match, transformation in matches[voice] for note in match]
             for voice in matches
         }
         transformations: Set[Transformation] = {
@@ -1,30 +1,65 @@
 from __future__ import annotations
 
 import logging
+import math
 import os
-from typing import TYPE_CHECKING, Dict, List, Set, Tuple
+from typing import Callable, Dict, List, Optional, Set, Tuple
 
-from tqdm import tqdm
+import numpy as np
 
-from algorithm.model.distance_metrics import DistanceMetrics
+from algorithm.model.candidate_table import CandidateTable
+from algorithm.model.cost_tables import CostTables
+from algorithm.model.distance_metrics import DistanceMetrics, ScalingFunctions
+from algorithm.model.sequence_features import SequenceFeatures
+from algorithm.model.subject_variants import SubjectVariants
+from algorithm.semi_global_alignment import SemiGlobalAlignment
+from algorithm.workspace_pool import WorkspacePool
 from model.composition import Composition
+from model.constants import EditDistanceEngine, MatchingStrategy, Prefilter, Transformation
+from model.match_view import MatchView
 from model.note_sequence import NoteSequence
+from utility.tracer import Tracer
 from workers.fugal_element_extractor import FugalElementExtractor
 from workers.stream_matcher import StreamMatcher
-
-if TYPE_CHECKING:
-    from model.constants import Transformation
+from workers.task_executor import TaskExecutor
+from workers.window_evaluator import Propagation, WindowEvaluator
 
 logger = logging.getLogger(os.path.basename(__file__))
 
 
 class FugueAnalyzer:
-    def __init__(self, composition: Composition, sensitivity: float, min_match: int) -> None:
+    METRICS: List[Callable] = [
+        DistanceMetrics.replacement_with_penalty,
+        DistanceMetrics.insertion_without_expansion,
+        DistanceMetrics.insertion_with_expansion,
+        DistanceMetrics.deletion_without_compression,
+        DistanceMetrics.deletion_with_compression,
+    ]
+
+    def __init__(
+        self,
+        composition: Composition,
+        sensitivity: float,
+        min_match: int,
+        engine: EditDistanceEngine = EditDistanceEngine.NUMPY,
+        cutoff: bool = False,
+        strategy: MatchingStrategy = MatchingStrategy.WINDOWED,
+        prefilter: Prefilter = Prefilter.NONE,
+        jobs: int = 1,
+    ) -> None:
         assert sensitivity >= 0
         assert min_match >= 1
+        assert jobs >= 1
+        assert not cutoff or engine == EditDistanceEngine.PYTHON
         self.composition: Composition = composition
         self.sensitivity: float = sensitivity
         self.min_match: int = min_match
+        self.engine: EditDistanceEngine = engine
+        self.cutoff: bool = cutoff
+        self.strategy: MatchingStrategy = strategy
+        self.prefilter: Prefilter = prefilter
+        self.jobs: int = jobs
+        self.pruned_fractions: Dict[int, float] = dict()
         self._fugal_element_extractor: FugalElementExtractor = FugalElementExtractor(composition.voices)
 
     def extract_subject(self) -> NoteSequence:
@@ -32,18 +67,209 @@ class FugueAnalyzer:
 
     def match_subject(
         self, subject: NoteSequence, transformations: Set[Transformation]
-    ) -> Dict[int, List[Tuple[NoteSequence, Transformation]]]:
+    ) -> Dict[int, List[Tuple[MatchView, Transformation]]]:
         logger.debug(f"SUBJECT: {subject.raw_intervals}")
-        metrics = [
-            DistanceMetrics.replacement_with_penalty,
-            DistanceMetrics.insertion_without_expansion,
-            DistanceMetrics.insertion_with_expansion,
-            DistanceMetrics.deletion_without_compression,
-            DistanceMetrics.deletion_with_compression,
-        ]
-        all_results = dict()
-        for voice in tqdm(self.composition.voices.keys()):
+        stream_matchers: Dict[int, StreamMatcher] = self.stream_matchers(
+            self.sensitivity, self.min_match, self.cutoff, self.prefilter
+        )
+        variants: SubjectVariants = StreamMatcher.subject_variants(subject, transformations)
+        tables: Optional[CostTables] = self.cost_tables(stream_matchers, variants)
+        if self.strategy == MatchingStrategy.SEMI_GLOBAL:
+            voice_matches = self._align_voices(
+                stream_matchers, subject, list(transformations), self.METRICS, variants, tables
+            )
+        else:
+            voice_matches = self._propagate_windows(
+                stream_matchers, subject, transformations, self.METRICS, variants, tables
+            )
+        logger.debug(f"SUBJECT VIEWS: {subject.view_stats}")
+        return {voice: StreamMatcher.schedule(matches) for voice, matches in voice_matches.items()}
+
+    def stream_matchers(
+        self, sensitivity: float, min_match: int, cutoff: bool, prefilter: Prefilter
+    ) -> Dict[int, StreamMatcher]:
+        return {
+            voice: StreamMatcher(stream, sensitivity, min_match, self.METRICS, self.engine, cutoff, prefilter, voice)
+            for voice, stream in self.composition.voices.items()
+        }
+
+    def candidate_table(
+        self, subject: NoteSequence, transformations: Set[Transformation], sensitivity: float = math.inf
+    ) -> CandidateTable:
+        """
+        Candidates of ``match_subject`` for any min match and any sensitivity up to ``sensitivity``, found by
+        accepting every pulled back window within it. Windows are propagated in one process. Prefilter regions
+        depend on the sensitivity, so with a prefilter the table only holds for ``sensitivity`` itself.
+        """
+        logger.debug(f"SUBJECT: {subject.raw_intervals}")
+        stream_matchers: Dict[int, StreamMatcher] = self.stream_matchers(sensitivity, 1, self.cutoff, self.prefilter)
+        variants: SubjectVariants = StreamMatcher.subject_variants(subject, transformations)
+        tables: Optional[CostTables] = self.cost_tables(stream_matchers, variants)
+        if self.strategy == MatchingStrategy.SEMI_GLOBAL:
+            voice_matches = self._align_voices(
+                stream_matchers, subject, list(transformations), self.METRICS, variants, tables
+            )
+            reaches: Dict[int, List[int]] = {
+                voice: [len(match) for match, _, _ in matches] for voice, matches in voice_matches.items()
+            }
+        else:
+            voice_matches, reaches = self._record_windows(stream_matchers, transformations, variants, tables)
+        table: CandidateTable = CandidateTable.from_matches(
+            {voice: stream_matcher.stream for voice, stream_matcher in stream_matchers.items()}, voice_matches, reaches
+        )
+        logger.debug(f"CANDIDATES: {len(table)}")
+        return table
+
+    def _record_windows(
+        self,
+        stream_matchers: Dict[int, StreamMatcher],
+        transformations: Set[Transformation],
+        variants: SubjectVariants,
+        tables: Optional[CostTables],
+    ) -> Tuple[Dict[int, List[Tuple[MatchView, Transformation, float]]], Dict[int, List[int]]]:
+        """
+        Every window is started from the last position visited before its match, and propagation only visits
+        positions under the stream length less min match.
+        """
+        propagations: List[Propagation] = list()
+        visits: List[List[Tuple[int, int]]] = list()
+        for stream_matcher in stream_matchers.values():
+            for transformation in transformations:
+                visits.append(list())
+                propagations.append(stream_matcher.propagate(variants, transformation, visits=visits[-1]))
+        results = WindowEvaluator(self.METRICS, self.engine, tables).run(propagations, progress=True)
+        voice_matches: Dict[int, List[Tuple[MatchView, Transformation, float]]] = dict()
+        reaches: Dict[int, List[int]] = dict()
+        propagation_idx: int = 0
+        for voice, stream_matcher in stream_matchers.items():
+            voice_matches[voice], reaches[voice] = list(), list()
+            for _ in transformations:
+                matches = results[propagation_idx]
+                positions, counts = np.array(visits[propagation_idx], dtype=np.int64).reshape(-1, 2).T
+                starts: np.array = positions[np.searchsorted(counts, np.arange(len(matches)), side="right") - 1]
+                voice_matches[voice].extend(matches)
+                reaches[voice].extend(
+                    min(len(match), len(stream_matcher.stream) - int(start) - 1)
+                    for (match, _, _), start in zip(matches, starts)
+                )
+                propagation_idx += 1
+        return voice_matches, reaches
+
+    def candidate_tables(
+        self, subject: NoteSequence, transformations: Set[Transformation], sensitivities: List[float]
+    ) -> Dict[float, CandidateTable]:
+        """
+        ``candidate_table`` of every sensitivity: one per sensitivity when propagation is prefiltered, one shared
+        by all otherwise.
+        """
+        if self.prefilter != Prefilter.NONE and self.strategy == MatchingStrategy.WINDOWED:
+            return {
+                sensitivity: self.candidate_table(subject, transformations, sensitivity)
+                for sensitivity in sensitivities
+            }
+        table: CandidateTable = self.candidate_table(subject, transformations)
+        return {sensitivity: table for sensitivity in sensitivities}
+
+    @staticmethod
+    def sweep(
+        tables: Dict[float, CandidateTable], min_matches: List[int]
+    ) -> Dict[Tuple[float, int], Dict[int, List[Tuple[MatchView, Transformation]]]]:
+        """``match_subject`` over a grid of thresholds, from the candidates of ``candidate_tables``."""
+        return {
+            (sensitivity, min_match): {
+                voice: StreamMatcher.schedule(matches)
+                for voice, matches in table.accepted(sensitivity, min_match).items()
+            }
+            for sensitivity, table in tables.items()
+            for min_match in min_matches
+        }
+
+    @staticmethod
+    def cost_tables(stream_matchers: Dict[int, StreamMatcher], variants: SubjectVariants) -> Optional[CostTables]:
+        """
+        Cost tables covering every voice and transformed subject, built once from the current penalty factors.
+        Under ``Transformation.SCALING`` they also cover the ratio encoded voices, read forward and reversed.
+        """
+        features: List[SequenceFeatures] = [
+            stream_matcher.stream_features for stream_matcher in stream_matchers.values()
+        ] + [variants[transformation].features for transformation in variants]
+        if Transformation.SCALING in variants:
+            features.extend(
+                stream_features.transformed(Transformation.SCALING)
+                for stream_matcher in stream_matchers.values()
+                for stream_features in (stream_matcher.stream_features, stream_matcher.stream_features.reversed())
+            )
+        return CostTables.from_features(features, ScalingFunctions.sqrt)
+
+    def _propagate_windows(
+        self,
+        stream_matchers: Dict[int, StreamMatcher],
+        subject: NoteSequence,
+        transformations: Set[Transformation],
+        metrics: List[Callable],
+        variants: SubjectVariants,
+        tables: Optional[CostTables],
+    ) -> Dict[int, List[Tuple[MatchView, Transformation, float]]]:
+        """Runs in ``jobs`` processes unless tracing, which records windows in the order they are evaluated."""
+        if self.jobs > 1 and not Tracer.enabled:
+            voice_matches = TaskExecutor(
+                stream_matchers, variants, list(transformations), metrics, self.engine, self.jobs, tables
+            ).run()
+            if self.prefilter != Prefilter.NONE:
+                self.record_pruned_fractions(stream_matchers)
+            return voice_matches
+        propagations: Dict[int, List[Propagation]] = dict()
+        for voice, stream_matcher in stream_matchers.items():
+            logger.debug(f"VOICE START: {voice}")
+            propagations[voice] = stream_matcher.propagations(subject, transformations, variants)
+
+        window_evaluator: WindowEvaluator = WindowEvaluator(metrics, self.engine, tables)
+        transformation_results = window_evaluator.run(
+            [propagation for voice in propagations for propagation in propagations[voice]], progress=True
+        )
+        voice_matches = dict()
+        offset: int = 0
+        for voice in stream_matchers.keys():
+            transformation_matches = transformation_results[offset : offset + len(propagations[voice])]
+            voice_matches[voice] = [match for matches in transformation_matches for match in matches]
+            offset += len(propagations[voice])
+        if self.prefilter != Prefilter.NONE:
+            self.record_pruned_fractions(stream_matchers)
+        return voice_matches
+
+    def record_pruned_fractions(self, stream_matchers: Dict[int, StreamMatcher]) -> None:
+        """Share of each voice skipped by the prefilter, averaged over the transformations."""
+        for voice, stream_matcher in stream_matchers.items():
+            pruned_fractions: List[float] = list(stream_matcher.pruned_fractions.values())
+            self.pruned_fractions[voice] = sum(pruned_fractions) / len(pruned_fractions)
+            logger.info(f"VOICE {voice} PRUNED: {self.pruned_fractions[voice]:.1%}")
+
+    def _align_voices(
+        self,
+        stream_matchers: Dict[int, StreamMatcher],
+        subject: NoteSequence,
+        transformations: List[Transformation],
+        metrics: List[Callable],
+        variants: SubjectVariants,
+        tables: Optional[CostTables],
+    ) -> Dict[int, List[Tuple[MatchView, Transformation, float]]]:
+        """One semi-global pass per voice, over all its transformations, every pass reusing the same buffers."""
+        workspace: WorkspacePool = WorkspacePool()
+        voice_matches = dict()
+        for voice, stream_matcher in stream_matchers.items():
             logger.debug(f"VOICE START: {voice}")
-            stream_matcher = StreamMatcher(self.composition.voices[voice], self.sensitivity, self.min_match, metrics)
-            all_results[voice] = stream_matcher.match_all(subject, transformations)
-        return all_results
+            alignment: SemiGlobalAlignment = SemiGlobalAlignment(
+                stream_matcher.alignment_windows(subject, transformations, variants),
+                metrics,
+                ScalingFunctions.sqrt,
+                tables,
+                workspace,
+            )
+            voice_matches[voice] = [
+                match
+                for transformation_idx, transformation in enumerate(transformations)
+                for match in stream_matcher.accept_alignments(
+                    alignment.alignments(transformation_idx), transformation, variants
+                )
+            ]
+        return voice_matches
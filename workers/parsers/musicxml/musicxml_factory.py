@@ -1,7 +1,6 @@
 from __future__ import annotations
 
 import xml.etree.ElementTree as ET
-from decimal import Decimal
 from typing import TYPE_CHECKING
 
 from model.duration import Duration
@@ -15,8 +14,18 @@ if TYPE_CHECKING:
 
 
 class MusicXMLFactory:
-    def __init__(self, duration_scale: Decimal) -> None:
-        Duration.set_scale(duration_scale)
+    def __init__(self, ticks_per_quarter: int) -> None:
+        Duration.set_scale(ticks_per_quarter)
+        self.ticks_per_quarter: int = ticks_per_quarter
+        self._ticks_per_division: int = 1
+
+    def set_divisions(self, divisions: int) -> None:
+        """Divisions per quarter note in effect from here on; ``ticks_per_quarter`` must be a multiple of them."""
+        assert self.ticks_per_quarter % divisions == 0, f"{divisions} divisions do not divide the ticks per quarter!"
+        self._ticks_per_division = self.ticks_per_quarter // divisions
+
+    def build_ticks(self, note_element: ET.Element) -> int:
+        return int(note_element.find("duration").text) * self._ticks_per_division
 
     def build_note(self, note_element: ET.Element, note_id: int) -> Note:
         pitch_element: ET.Element = note_element.find("pitch")
@@ -24,17 +33,15 @@ class MusicXMLFactory:
         alter: int = 0 if pitch_element.find("alter") is None else int(pitch_element.find("alter").text)
         octave: int = int(pitch_element.find("octave").text)
         position: Position = NoteName.from_raw(step, alter).as_position(octave)
-        duration: Decimal = Decimal(note_element.find("duration").text)
-        return TaggedNote.from_raw(position.abs_position, duration, [note_id])
+        return TaggedNote.from_raw(position.abs_position, self.build_ticks(note_element), [note_id])
 
     def build_rest(self, note_element: ET.Element, note_id: int) -> Note:
-        duration: Decimal = Decimal(note_element.find("duration").text)
-        return TaggedNote.from_raw(None, duration, [note_id])
+        return TaggedNote.from_raw(None, self.build_ticks(note_element), [note_id])
 
     def build_default_rest(self, time_signature: TimeSignature) -> Note:
-        return Note.from_raw(None, time_signature.real_measure_duration * Duration.SCALE)
+        return Note.from_raw(None, time_signature.measure_ticks(self.ticks_per_quarter))
 
     def build_time_signature(self, time_element: ET.Element) -> TimeSignature:
         beat_count: int = int(time_element.find("beats").text)
-        raw_beat_duration: Decimal = Decimal(time_element.find("beat-type").text)
-        return TimeSignature.from_raw(beat_count, raw_beat_duration)
+        beat_type: int = int(time_element.find("beat-type").text)
+        return TimeSignature.from_raw(beat_count, beat_type)
@@ -1,9 +1,9 @@
 from __future__ import annotations
+import math
 import xml.etree.ElementTree as ET
 from collections import defaultdict
 from model.composition import Composition
 from model.note_sequence import NoteSequence
-from decimal import Decimal
 from typing import TYPE_CHECKING, Dict, List, Set
 from utility.id_generator import IdGenerator
 from workers.parsers.musicxml.musicxml_factory import MusicXMLFactory
@@ -28,6 +28,16 @@ class MusicXMLParser:
             for note_element in measure_element.findall("note")
         )
 
+    def _get_ticks_per_quarter(self, measure_elements: List[ET.Element]) -> int:
+        """LCM of every ``<divisions>`` of the score, so that every duration is a whole number of ticks."""
+        return math.lcm(
+            *(
+                int(divisions_element.text)
+                for measure_element in measure_elements
+                for divisions_element in measure_element.findall("attributes/divisions")
+            )
+        )
+
     def to_composition(self) -> Composition:
         xml_root: ET.Element = ET.parse(self.file_name).getroot()
         measures: List[ET.Element] = xml_root.findall("part/measure")
@@ -35,18 +45,22 @@ class MusicXMLParser:
         voices: Set[int] = self._get_voices(measures)
         voice_note_sequences: Dict[int, NoteSequence] = defaultdict(NoteSequence)
 
-        duration_scale: Decimal = Decimal(measures[0].find("attributes/divisions").text)
-
-        musicxml_factory: MusicXMLFactory = MusicXMLFactory(duration_scale)
+        musicxml_factory: MusicXMLFactory = MusicXMLFactory(self._get_ticks_per_quarter(measures))
         cur_time_signature: TimeSignature = musicxml_factory.build_time_signature(measures[0].find("attributes/time"))
 
         for measure_element in measures:
-            if (time_element := measure_element.find("attributes/time")) is not None:
-                cur_time_signature: TimeSignature = musicxml_factory.build_time_signature(time_element)
-
             voice_in_measure: Dict[int, bool] = {voice: False for voice in voices}
 
-            for note_element in measure_element.findall("note"):
+            for element in measure_element:
+                if element.tag == "attributes":
+                    if (divisions_element := element.find("divisions")) is not None:
+                        musicxml_factory.set_divisions(int(divisions_element.text))
+                    if (time_element := element.find("time")) is not None:
+                        cur_time_signature: TimeSignature = musicxml_factory.build_time_signature(time_element)
+                    continue
+                if element.tag != "note":
+                    continue
+                note_element: ET.Element = element
                 voice_idx: int = int(note_element.find("voice").text)
                 voice_in_measure[voice_idx] = True
                 note_id: int = self._note_id_generators[voice_idx].next_id()
@@ -1,36 +1,65 @@
 import logging
+import math
 import os
-from typing import Callable, List, Optional, Set, Tuple
+from typing import Callable, Dict, Generator, Iterable, List, Optional, Set, Tuple
 
+from algorithm.candidate_regions import CandidateRegions
+from algorithm.interval_index import IntervalIndex
+from algorithm.model.distance_metrics import DistanceMetrics, ScalingFunctions
+from algorithm.model.edit_window import EditWindow
+from algorithm.model.sequence_features import SequenceFeatures
+from algorithm.model.subject_variants import SubjectVariants
+from algorithm.semi_global_alignment import Alignment, SemiGlobalAlignment
 from algorithm.sequence_scheduler import SequenceScheduler
-from model.constants import Transformation
+from model.constants import EditDistanceEngine, Prefilter, TraceEvent, Transformation
+from model.match_view import MatchView
 from model.note_sequence import NoteSequence
+from utility.tracer import Tracer
 from workers.transformation_matcher import TransformationMatcher
+from workers.window_evaluator import WindowEvaluator, WindowRequest
 
 logger = logging.getLogger(os.path.basename(__file__))
 
 
 class StreamMatcher:
-    def __init__(self, stream: NoteSequence, sensitivity: float, min_match: int, metrics: List[Callable]) -> None:
+    SEED_SIZE: int = 4
+
+    def __init__(
+        self,
+        stream: NoteSequence,
+        sensitivity: float,
+        min_match: int,
+        metrics: List[Callable],
+        engine: EditDistanceEngine = EditDistanceEngine.NUMPY,
+        cutoff: bool = False,
+        prefilter: Prefilter = Prefilter.NONE,
+        voice: Optional[int] = None,
+    ) -> None:
         self.stream: NoteSequence = stream
+        self.voice: Optional[int] = voice
+        self._stream_features: SequenceFeatures = SequenceFeatures.from_sequence(stream)
         self.sensitivity: float = sensitivity
         self.min_match: int = min_match
         self._metrics: List[Callable] = metrics
+        self._engine: EditDistanceEngine = engine
+        self.cutoff: bool = cutoff
+        self.prefilter: Prefilter = prefilter
+        self._interval_indexes: Dict[int, IntervalIndex] = dict()
+        self._candidate_regions: Dict[Transformation, Tuple[SubjectVariants, CandidateRegions]] = dict()
+        self.pruned_fractions: Dict[Transformation, float] = dict()
 
-    def _push_forward(self, pattern: NoteSequence, transformation: Transformation, stream_start: int) -> int:
-        transformation_matcher: TransformationMatcher = TransformationMatcher(
-            self.stream, pattern, transformation, self._metrics
-        )
-        stream_step, _, _ = transformation_matcher.get_limit(stream_start, forward=True)
-        return stream_step
+    @property
+    def stream_features(self) -> SequenceFeatures:
+        return self._stream_features
+
+    @property
+    def settings(self) -> Tuple:
+        """Constructor arguments after the stream, to match another stream the same way."""
+        return self.sensitivity, self.min_match, self._metrics, self._engine, self.cutoff, self.prefilter
 
     def _pull_back(
-        self, pattern: NoteSequence, transformation: Transformation, stream_start: int
-    ) -> Tuple[int, NoteSequence, float]:
-        transformation_matcher: TransformationMatcher = TransformationMatcher(
-            self.stream, pattern, transformation, self._metrics
-        )
-        stream_step, weight, transformation = transformation_matcher.get_limit(stream_start, forward=False)
+        self, pattern: SequenceFeatures, stream_start: int, stream_step: int, weight: float
+    ) -> Tuple[int, Optional[MatchView], Optional[float]]:
         logger.debug(f"MATCH WEIGHT: {weight}")
         if stream_step == 0:
             logger.debug("NOT FOUND")
@@ -41,33 +70,242 @@ class StreamMatcher:
             logger.debug(f"--> {stream_step}")
             return stream_step + 1, None, None
         stream_end: int = stream_start + stream_step + 1
-        match_sequence: NoteSequence = NoteSequence(self.stream[stream_start:stream_end])
+        match_sequence: MatchView = MatchView(self.stream, stream_start, stream_end, self.voice)
         logger.debug(f"MATCHED: {match_sequence.raw_intervals}")
-        logger.debug(transformation)
         logger.debug(f"--> {stream_step}")
         return stream_step + 1, match_sequence, weight
 
-    def match_next(
-        self, pattern: NoteSequence, transformation: Transformation, stream_start: int
-    ) -> Tuple[Optional[NoteSequence], float, int]:
-        while (step := self._push_forward(pattern, transformation, stream_start)) and step > 0:
-            stream_start += step
-        step, match, weight = self._pull_back(pattern, transformation, stream_start)
-        return match, weight, stream_start + step
+    def trace_pull_back(
+        self, transformation_matcher: TransformationMatcher, stream_start: int, stream_step: int, weight: float
+    ) -> None:
+        """Same decision as ``_pull_back``."""
+        if stream_step == 0:
+            event: int = TraceEvent.NOT_FOUND
+        elif (weight > self.sensitivity) or (stream_step + 1 < self.min_match):
+            event: int = TraceEvent.SKIPPED
+        else:
+            event: int = TraceEvent.MATCHED
+        Tracer.emit(
+            event,
+            transformation_matcher.transformation,
+            transformation_matcher.trace_id,
+            stream_start,
+            stream_start + stream_step,
+            stream_step,
+            weight,
+        )
+
+    @staticmethod
+    def window_reach(pattern: SequenceFeatures) -> int:
+        """Most stream intervals of a window."""
+        return int(TransformationMatcher.PADDING_FACTOR * len(pattern.intervals)) - 1
 
-    def match_all(
-        self, pattern: NoteSequence, transformations: Set[Transformation]
-    ) -> List[Tuple[NoteSequence, Transformation]]:
-        matches = list()
-        for transformation in transformations:
-            cur_stream_pos: int = 0
-            while cur_stream_pos < len(self.stream) - self.min_match:
-                match, weight, cur_stream_pos = self.match_next(pattern, transformation, cur_stream_pos)
-                if match is not None:
-                    matches.append((match, transformation, weight))
+    def error_budget(self, variants: SubjectVariants, transformation: Transformation) -> int:
+        """
+        Most prefilter scan errors of a window accepted on the complete pattern at ``sensitivity``. Its cost is at
+        most ``sensitivity`` per stream note, and each scan error is an edit costing at least the cheapest one: a
+        replacement out of tolerance or of another duration, or an insertion or deletion of the shortest note.
+        """
+        pattern: SequenceFeatures = variants[transformation].features
+        stream: SequenceFeatures = (
+            self._stream_features.transformed(transformation)
+            if transformation == Transformation.SCALING
+            else self._stream_features
+        )
+        shortest: float = min(1.0, pattern.durations.min(initial=1.0), stream.durations.min(initial=1.0))
+        cheapest: float = variants.scale(DistanceMetrics.DURATION_WEIGHT * shortest)
+        if cheapest <= 0 or math.isinf(self.sensitivity):
+            return len(pattern.intervals)
+        return min(len(pattern.intervals), math.floor(self.sensitivity * (self.window_reach(pattern) + 1) / cheapest))
+
+    def candidate_regions(
+        self, variants: SubjectVariants, transformation: Transformation
+    ) -> Optional[CandidateRegions]:
+        """
+        Prefilter regions, holding every window start the complete pattern may be accepted from with the error
+        budget of ``sensitivity``. Seeds are as long as the budget leaves room for, and no longer than ``SEED_SIZE``.
+        Regions are kept for every propagation of the same variants, e.g. over several segments of the stream.
+        """
+        if transformation in self._candidate_regions and self._candidate_regions[transformation][0] is variants:
+            return self._candidate_regions[transformation][1]
+        if self.prefilter == Prefilter.NONE:
+            return None
+        pattern: SequenceFeatures = variants[transformation].features
+        errors: int = self.error_budget(variants, transformation)
+        if self.prefilter == Prefilter.SCAN:
+            candidate_regions: CandidateRegions = CandidateRegions.from_scan(
+                self._stream_features,
+                pattern,
+                errors,
+                DistanceMetrics.REPLACEMENT_TOLERANCE,
+                self.window_reach(variants.pattern),
+            )
+        else:
+            size: Optional[int] = IntervalIndex.seed_size(len(pattern.intervals), errors, self.SEED_SIZE)
+            candidate_regions: CandidateRegions = CandidateRegions.from_seeds(
+                self._stream_features,
+                None if size is None else self.interval_index(size),
+                pattern,
+                errors,
+                self.window_reach(variants.pattern),
+            )
+        self.pruned_fractions[transformation] = candidate_regions.pruned_fraction
+        self._candidate_regions[transformation] = (variants, candidate_regions)
+        logger.debug(f"{transformation} PRUNED: {candidate_regions.pruned_fraction}")
+        return candidate_regions
+
+    def interval_index(self, size: int) -> IntervalIndex:
+        """Built on first use of each seed size, then shared by all transformations."""
+        if size not in self._interval_indexes:
+            self._interval_indexes[size] = IntervalIndex(
+                self._stream_features, size, DistanceMetrics.REPLACEMENT_TOLERANCE
+            )
+        return self._interval_indexes[size]
+
+    @staticmethod
+    def _next_start(candidate_regions: Optional[CandidateRegions], stream_pos: int) -> Optional[int]:
+        if candidate_regions is None:
+            return stream_pos
+        return candidate_regions.next_start(stream_pos)
+
+    def propagate(
+        self,
+        variants: SubjectVariants,
+        transformation: Transformation,
+        start: int = 0,
+        stop: Optional[int] = None,
+        visits: Optional[List[Tuple[int, int]]] = None,
+    ) -> Generator[WindowRequest, Tuple[int, float], List[Tuple[MatchView, Transformation, float]]]:
+        """
+        Window propagation over the stream for one transformation, as a state machine: every window to be
+        evaluated is yielded as a ``WindowRequest`` and its ``(stream_limit, weight)`` is sent back.
+        Windows are pushed forward until the best alignment starts at the window start, then pulled back.
+        With the prefilter, propagation jumps over stream regions the pattern cannot match, and pulled back windows
+        are only accepted on the complete pattern, as windows matching its first notes only may lie anywhere.
+
+        Propagation starts at ``start`` and ends at the first position at or past ``stop``. Every position it passes
+        through is appended to ``visits`` with the number of matches found before it: propagation only depends on
+        its position, so runs passing through the same position continue identically.
+        """
+        pattern: SequenceFeatures = variants.pattern
+        transformation_matcher: TransformationMatcher = TransformationMatcher(
+            self._stream_features,
+            pattern,
+            transformation,
+            self._metrics,
+            self._engine,
+            self.cutoff,
+            variants[transformation],
+            self.prefilter != Prefilter.NONE,
+        )
+        candidate_regions: Optional[CandidateRegions] = self.candidate_regions(variants, transformation)
+        matches: List[Tuple[MatchView, Transformation, float]] = list()
+        cur_stream_pos: Optional[int] = self._next_start(candidate_regions, start)
+        while cur_stream_pos is not None and cur_stream_pos < len(self.stream) - self.min_match:
+            if visits is not None:
+                visits.append((cur_stream_pos, len(matches)))
+            if stop is not None and cur_stream_pos >= stop:
+                break
+            stream_start: int = cur_stream_pos
+            while (step := (yield WindowRequest(transformation_matcher, stream_start, True))[0]) and step > 0:
+                stream_start += step
+            stream_step, weight = yield WindowRequest(transformation_matcher, stream_start, False)
+            if Tracer.enabled:
+                self.trace_pull_back(transformation_matcher, stream_start, stream_step, weight)
+            step, match, weight = self._pull_back(pattern, stream_start, stream_step, weight)
+            if match is not None:
+                match_transformation: str = variants.reported(
+                    transformation, self._stream_features, match.start, match.end
+                )
+                logger.debug(match_transformation)
+                matches.append((match, match_transformation, weight))
+            cur_stream_pos = self._next_start(candidate_regions, stream_start + step)
+        if self.cutoff:
+            skipped_cells, total_cells = transformation_matcher.skipped_cells, transformation_matcher.total_cells
+            logger.debug(f"{transformation} SKIPPED CELLS: {skipped_cells}/{total_cells}")
+        transformation_matcher.workspace.log_counters()
+        return matches
+
+    @staticmethod
+    def schedule(matches: List[Tuple[MatchView, Transformation, float]]) -> List[Tuple[MatchView, Transformation]]:
         if len(matches) == 0:
             return list()
         sequence_scheduler: SequenceScheduler = SequenceScheduler(
             [(match_info[0], match_info[2]) for match_info in matches]
         )
         return [(matches[idx][0], matches[idx][1]) for idx in sequence_scheduler.get_schedule()]
+
+    @staticmethod
+    def subject_variants(pattern: NoteSequence, transformations: Iterable[Transformation]) -> SubjectVariants:
+        return SubjectVariants(SequenceFeatures.from_sequence(pattern), transformations, ScalingFunctions.sqrt)
+
+    def propagations(
+        self,
+        pattern: NoteSequence,
+        transformations: Set[Transformation],
+        variants: Optional[SubjectVariants] = None,
+    ) -> List[Generator[WindowRequest, Tuple[int, float], List[Tuple[MatchView, Transformation, float]]]]:
+        """``variants``, shared by all voices, must cover ``transformations``; built here when not given."""
+        variants = self.subject_variants(pattern, transformations) if variants is None else variants
+        return [self.propagate(variants, transformation) for transformation in transformations]
+
+    def match_all(
+        self, pattern: NoteSequence, transformations: Set[Transformation]
+    ) -> List[Tuple[MatchView, Transformation]]:
+        window_evaluator: WindowEvaluator = WindowEvaluator(self._metrics, self._engine)
+        transformation_matches = window_evaluator.run(self.propagations(pattern, transformations))
+        return self.schedule([match for matches in transformation_matches for match in matches])
+
+    def alignment_windows(
+        self,
+        pattern: NoteSequence,
+        transformations: List[Transformation],
+        variants: Optional[SubjectVariants] = None,
+    ) -> List[EditWindow]:
+        """Whole stream windows for ``SemiGlobalAlignment``, one per transformation."""
+        variants = self.subject_variants(pattern, transformations) if variants is None else variants
+        return [
+            EditWindow(
+                (
+                    self._stream_features.transformed(transformation)
+                    if transformation == Transformation.SCALING
+                    else self._stream_features
+                ),
+                variants[transformation].features,
+                variants[transformation].first_row,
+            )
+            for transformation in transformations
+        ]
+
+    def accept_alignments(
+        self, alignments: List[Alignment], transformation: Transformation, variants: SubjectVariants
+    ) -> List[Tuple[MatchView, Transformation, float]]:
+        matches: List[Tuple[MatchView, Transformation, float]] = list()
+        for alignment in alignments:
+            if (alignment.weight > self.sensitivity) or (alignment.end - alignment.start + 1 < self.min_match):
+                continue
+            match_sequence: MatchView = MatchView(self.stream, alignment.start, alignment.end + 1, self.voice)
+            if match_sequence.rests.all():
+                continue
+            match_transformation: str = variants.reported(
+                transformation, self._stream_features, match_sequence.start, match_sequence.end
+            )
+            logger.debug(f"ALIGNED: {match_sequence.raw_intervals} {match_transformation} {alignment.weight}")
+            matches.append((match_sequence, match_transformation, alignment.weight))
+        return matches
+
+    def align_all(
+        self, pattern: NoteSequence, transformations: Set[Transformation]
+    ) -> List[Tuple[MatchView, Transformation]]:
+        transformations: List[Transformation] = list(transformations)
+        variants: SubjectVariants = self.subject_variants(pattern, transformations)
+        alignment: SemiGlobalAlignment = SemiGlobalAlignment(
+            self.alignment_windows(pattern, transformations, variants), self._metrics, ScalingFunctions.sqrt
+        )
+        return self.schedule(
+            [
+                match
+                for idx, transformation in enumerate(transformations)
+                for match in self.accept_alignments(alignment.alignments(idx), transformation, variants)
+            ]
+        )
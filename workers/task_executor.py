@@ -0,0 +1,249 @@
+from __future__ import annotations
+
+import logging
+import math
+import os
+from collections import namedtuple
+from concurrent.futures import FIRST_COMPLETED, Future, ProcessPoolExecutor, wait
+from typing import Callable, Dict, List, Optional, Set, Tuple
+
+import numpy as np
+from tqdm import tqdm
+
+from algorithm.model.cost_tables import CostTables
+from algorithm.model.distance_metrics import DistanceMetrics
+from algorithm.model.subject_variants import SubjectVariants
+from model.constants import EditDistanceEngine, Transformation
+from model.match_view import MatchView
+from utility.shared_voices import SharedVoice, SharedVoices
+from workers.stream_matcher import StreamMatcher
+from workers.window_evaluator import WindowEvaluator
+
+logger = logging.getLogger(os.path.basename(__file__))
+
+Task = namedtuple("Task", ("voice", "transformation", "start", "stop"))
+SegmentRun = namedtuple("SegmentRun", ("visits", "matches", "pruned_fraction"))
+
+VISIT_DTYPE: np.dtype = np.dtype(np.int64)
+MATCH_DTYPE: np.dtype = np.dtype([("start", np.int64), ("end", np.int64), ("weight", np.float64)])
+
+
+class TaskExecutor:
+    """
+    Window propagation split into (voice, transformation, stream segment) tasks, run by a pool of processes.
+
+    Every segment is propagated from its start up to some way past the start of the next one. Propagation only
+    depends on its position, so once the run of a segment passes through a position the next segment visited,
+    both continue identically and the results of the next segment take over. A run that never meets the next
+    segment is resumed serially from where it stopped, so merged results are always those of a serial propagation.
+
+    Tasks are dealt, longest first, into more groups than there are processes, and idle processes take the next
+    group from the shared queue: long voices are spread over all processes instead of setting the makespan.
+    The tasks of a group are propagated in lockstep, as ``WindowEvaluator`` batches them.
+
+    Voices reach the processes through ``SharedVoices``, exported once per run, and runs come back as arrays:
+    visits as (position, match count) rows and matches as ``MATCH_DTYPE`` records, reported by the parent process as
+    ``SubjectVariants.reported``. Neither grows with more than the matches and positions of the segment.
+    """
+
+    SEGMENT_PATTERNS: int = 32
+    OVERLAP_PATTERNS: int = 8
+    GROUPS_PER_JOB: int = 2
+
+    _stream_matchers: Dict[int, StreamMatcher] = dict()
+    _variants: Optional[SubjectVariants] = None
+    _metrics: List[Callable] = list()
+    _engine: EditDistanceEngine = EditDistanceEngine.NUMPY
+    _tables: Optional[CostTables] = None
+
+    def __init__(
+        self,
+        stream_matchers: Dict[int, StreamMatcher],
+        variants: SubjectVariants,
+        transformations: List[Transformation],
+        metrics: List[Callable],
+        engine: EditDistanceEngine,
+        jobs: int,
+        tables: Optional[CostTables] = None,
+    ) -> None:
+        assert jobs >= 1
+        self.stream_matchers: Dict[int, StreamMatcher] = stream_matchers
+        self.variants: SubjectVariants = variants
+        self.transformations: List[Transformation] = transformations
+        self.metrics: List[Callable] = metrics
+        self.engine: EditDistanceEngine = engine
+        self.jobs: int = jobs
+        self.tables: Optional[CostTables] = tables
+        self.resumed_segments: int = 0
+
+    @classmethod
+    def initialize(
+        cls,
+        descriptors: Dict[int, SharedVoice],
+        settings: Tuple,
+        variants: SubjectVariants,
+        metrics: List[Callable],
+        engine: EditDistanceEngine,
+        factors: Tuple,
+        tables: Optional[CostTables],
+    ) -> None:
+        """Sets up a worker process on the shared voices, with the penalty factors and cost tables of the analysis."""
+        stream_matchers: Dict[int, StreamMatcher] = {
+            voice: StreamMatcher(SharedVoices.attach(descriptor), *settings, voice=voice)
+            for voice, descriptor in descriptors.items()
+        }
+        cls._setup(stream_matchers, variants, metrics, engine, factors, tables)
+
+    @classmethod
+    def _setup(
+        cls,
+        stream_matchers: Dict[int, StreamMatcher],
+        variants: SubjectVariants,
+        metrics: List[Callable],
+        engine: EditDistanceEngine,
+        factors: Tuple,
+        tables: Optional[CostTables],
+    ) -> None:
+        cls._stream_matchers, cls._variants, cls._metrics, cls._engine = stream_matchers, variants, metrics, engine
+        cls._tables = tables
+        (
+            DistanceMetrics.REST_PENALTY_FACTOR,
+            DistanceMetrics.INVERSION_PENALTY_FACTOR,
+            DistanceMetrics.REPLACEMENT_TOLERANCE,
+            DistanceMetrics.DURATION_WEIGHT,
+        ) = factors
+
+    @classmethod
+    def run_tasks(cls, tasks: List[Task]) -> List[SegmentRun]:
+        visits: List[List[Tuple[int, int]]] = [list() for _ in tasks]
+        propagations = [
+            cls._stream_matchers[task.voice].propagate(
+                cls._variants, task.transformation, task.start, task.stop, visits[idx]
+            )
+            for idx, task in enumerate(tasks)
+        ]
+        results = WindowEvaluator(cls._metrics, cls._engine, cls._tables).run(propagations)
+        return [
+            SegmentRun(
+                np.array(visits[idx], dtype=VISIT_DTYPE).reshape(-1, 2),
+                cls.records(matches),
+                cls._stream_matchers[task.voice].pruned_fractions.get(task.transformation),
+            )
+            for idx, (task, matches) in enumerate(zip(tasks, results))
+        ]
+
+    @staticmethod
+    def records(matches: List[Tuple[MatchView, Transformation, float]]) -> np.array:
+        return np.array([(match.start, match.end, weight) for match, _, weight in matches], dtype=MATCH_DTYPE)
+
+    def segment_length(self) -> int:
+        """Long enough for segments to meet well within the overlap, short enough to split the longest voice."""
+        longest: int = max((len(stream_matcher.stream) for stream_matcher in self.stream_matchers.values()), default=0)
+        pattern_length: int = len(self.variants.pattern)
+        return max(self.SEGMENT_PATTERNS * pattern_length, math.ceil(longest / self.jobs))
+
+    def tasks(self) -> Dict[Tuple[int, Transformation], List[Task]]:
+        """Segment tasks of every voice and transformation, in stream order."""
+        segment_length: int = self.segment_length()
+        overlap: int = self.OVERLAP_PATTERNS * len(self.variants.pattern)
+        tasks: Dict[Tuple[int, Transformation], List[Task]] = dict()
+        for voice, stream_matcher in self.stream_matchers.items():
+            starts: List[int] = list(range(0, max(len(stream_matcher.stream), 1), segment_length))
+            for transformation in self.transformations:
+                tasks[(voice, transformation)] = [
+                    Task(voice, transformation, start, None if idx == len(starts) - 1 else starts[idx + 1] + overlap)
+                    for idx, start in enumerate(starts)
+                ]
+        return tasks
+
+    def groups(self, tasks: List[Task]) -> List[List[Task]]:
+        """Tasks dealt longest first into groups of about the same work."""
+
+        def work(task: Task) -> int:
+            stop: int = len(self.stream_matchers[task.voice].stream) if task.stop is None else task.stop
+            return stop - task.start
+
+        group_count: int = min(len(tasks), self.jobs * self.GROUPS_PER_JOB)
+        ordered: List[Task] = sorted(tasks, key=work, reverse=True)
+        return [ordered[idx::group_count] for idx in range(group_count)]
+
+    def run(self) -> Dict[int, List[Tuple[MatchView, Transformation, float]]]:
+        """Matches of every voice, in the order of a serial propagation of ``transformations``."""
+        factors: Tuple = CostTables.current_factors()
+        self._setup(self.stream_matchers, self.variants, self.metrics, self.engine, factors, self.tables)
+        settings: Tuple = next(iter(self.stream_matchers.values())).settings
+        tasks: Dict[Tuple[int, Transformation], List[Task]] = self.tasks()
+        runs: Dict[Task, SegmentRun] = dict()
+        groups: List[List[Task]] = self.groups([task for segments in tasks.values() for task in segments])
+        with SharedVoices(
+            {voice: stream_matcher.stream for voice, stream_matcher in self.stream_matchers.items()}
+        ) as shared_voices:
+            logger.debug(f"SHARED VOICES: {shared_voices.size} bytes")
+            initargs: Tuple = (
+                shared_voices.descriptors,
+                settings,
+                self.variants,
+                self.metrics,
+                self.engine,
+                factors,
+                self.tables,
+            )
+            with ProcessPoolExecutor(self.jobs, initializer=self.initialize, initargs=initargs) as executor:
+                pending: Dict[Future, List[Task]] = {executor.submit(self.run_tasks, group): group for group in groups}
+                with tqdm(total=len(groups)) as progress_bar:
+                    while pending:
+                        done: Set[Future]
+                        done, _ = wait(pending, return_when=FIRST_COMPLETED)
+                        for future in done:
+                            runs.update(zip(pending.pop(future), future.result()))
+                            progress_bar.update()
+
+        voice_matches: Dict[int, List[Tuple[MatchView, Transformation, float]]] = dict()
+        for voice, stream_matcher in self.stream_matchers.items():
+            voice_matches[voice] = list()
+            for transformation in self.transformations:
+                segments: List[Task] = tasks[(voice, transformation)]
+                for start, end, weight in self.merge(segments, [runs[task] for task in segments]):
+                    voice_matches[voice].append(
+                        (
+                            MatchView(stream_matcher.stream, int(start), int(end), voice),
+                            self.variants.reported(transformation, stream_matcher.stream_features, start, end),
+                            weight,
+                        )
+                    )
+                pruned_fraction: Optional[float] = runs[segments[0]].pruned_fraction
+                if pruned_fraction is not None:
+                    stream_matcher.pruned_fractions[transformation] = pruned_fraction
+        logger.debug(f"RESUMED SEGMENTS: {self.resumed_segments}")
+        return voice_matches
+
+    def merge(self, segments: List[Task], runs: List[SegmentRun]) -> np.array:
+        """Follows the runs of consecutive segments from where they meet, resuming any that stopped before."""
+        matches: List[np.array] = list()
+        segment, visit = 0, 0
+        while True:
+            visits, run_matches = runs[segment].visits, runs[segment].matches
+            found: int = visits[visit, 1] if visit < len(visits) else len(run_matches)
+            following: Dict[int, int] = (
+                {int(position): idx for idx, position in enumerate(runs[segment + 1].visits[:, 0])}
+                if segment + 1 < len(runs)
+                else dict()
+            )
+            met: Optional[int] = next((idx for idx in range(visit, len(visits)) if visits[idx, 0] in following), None)
+            if met is not None:
+                matches.append(run_matches[found : visits[met, 1]])
+                segment, visit = segment + 1, following[int(visits[met, 0])]
+                continue
+            matches.append(run_matches[found:])
+            stop: Optional[int] = segments[segment].stop
+            if stop is None or not len(visits) or visits[-1, 0] < stop:
+                return np.concatenate(matches)
+            position: int = int(visits[-1, 0])
+            segment = next(
+                idx
+                for idx in range(segment + 1, len(segments))
+                if segments[idx].stop is None or segments[idx].stop > position
+            )
+            runs[segment] = self.run_tasks([segments[segment]._replace(start=position)])[0]
+            self.resumed_segments += 1
+            visit = 0
@@ -1,69 +1,146 @@
 import logging
 import os
-from typing import Callable, List, Optional, Tuple
+from typing import Callable, Dict, List, Optional, Tuple, Type
 
-from algorithm.adaptive_edit_distance import AdaptiveEditDistance
+import numpy as np
+
+from algorithm.adaptive_edit_distance import AdaptiveEditDistance, PreviousMemo
 from algorithm.model.distance_metrics import ScalingFunctions
 from algorithm.model.edit_window import EditWindow
-from model.constants import Transformation
-from model.note_sequence import NoteSequence
-from utility.string_format import format_array
+from algorithm.model.sequence_features import SequenceFeatures
+from algorithm.model.subject_variants import SubjectVariant, SubjectVariants
+from algorithm.vectorized_edit_distance import VectorizedEditDistance
+from algorithm.workspace_pool import WorkspacePool
+from model.constants import EditDistanceEngine, TraceEvent, Transformation
+from utility.tracer import Tracer
 
 logger = logging.getLogger(os.path.basename(__file__))
 
 
 class TransformationMatcher:
+    PADDING_FACTOR: float = 1.6
+
+    ENGINES: Dict[EditDistanceEngine, Type[AdaptiveEditDistance]] = {
+        EditDistanceEngine.PYTHON: AdaptiveEditDistance,
+        EditDistanceEngine.NUMPY: VectorizedEditDistance,
+    }
+
     def __init__(
         self,
-        stream: NoteSequence,
-        pattern: NoteSequence,
+        stream: SequenceFeatures,
+        pattern: SequenceFeatures,
         transformation: Transformation,
         metrics: List[Callable],
+        engine: EditDistanceEngine = EditDistanceEngine.NUMPY,
+        cutoff: bool = False,
+        variant: Optional[SubjectVariant] = None,
+        pattern_complete: bool = False,
     ) -> None:
-        self.stream: NoteSequence = stream
-        self.pattern: NoteSequence = pattern
+        self.stream: SequenceFeatures = stream
+        self.pattern: SequenceFeatures = pattern
         self._transformation: Transformation = transformation
+        self.variant: SubjectVariant = (
+            SubjectVariants.build_variant(pattern, transformation, ScalingFunctions.sqrt)
+            if variant is None
+            else variant
+        )
         self._metrics: List[Callable] = metrics
+        self._edit_distance: Type[AdaptiveEditDistance] = self.ENGINES[engine]
+        self._forward_memo: Optional[Tuple[int, np.array]] = None
+        self.cutoff: bool = cutoff
+        self.pattern_complete: bool = pattern_complete
+        self.total_cells: int = 0
+        self.skipped_cells: int = 0
+        self.workspace: WorkspacePool = WorkspacePool()
+        self.trace_id: int = Tracer.next_matcher()
 
-    def _extract_intervals(self, stream_start: int, padding_factor: float) -> EditWindow:
-        return EditWindow.build(self.stream, self.pattern, stream_start, padding_factor)
+    @property
+    def transformation(self) -> Transformation:
+        return self._transformation
 
-    def _get_transformation_limits(
-        self,
-        edit_window: EditWindow,
-        transformation: Transformation,
-        forward: bool,
-    ) -> Tuple[int, Transformation, float]:
-        edit_window.transform_pattern(transformation)
+    def build_window(self, stream_start: int, forward: bool = False) -> EditWindow:
+        """
+        Same window as ``EditWindow.build`` followed by ``transform_pattern``, with the precomputed variant.
+        Under ``Transformation.SCALING`` the stream window is ratio encoded as its variant is, after reversal.
+        """
+        stream_end: int = EditWindow.stream_end(self.stream, self.pattern, stream_start, self.PADDING_FACTOR)
+        stream_window: SequenceFeatures = self.stream.window(stream_start, stream_end)
+        if forward:
+            stream_window = stream_window.reversed()
+        if self._transformation == Transformation.SCALING:
+            stream_window = stream_window.ratio_encoded()
+        if forward:
+            return EditWindow(stream_window, self.variant.reversed, self.variant.reversed_first_row)
+        return EditWindow(stream_window, self.variant.features, self.variant.first_row)
+
+    def previous_memo(self, stream_start: int, forward: bool = False) -> Optional[PreviousMemo]:
+        """
+        Forward windows are reversed, so memo rows are anchored at the window end: when a window moves ahead,
+        the memo of the last forward window reappears shifted down by as many rows as the end moved.
+        """
+        if not forward or self._forward_memo is None:
+            return None
+        previous_end, memo = self._forward_memo
+        stream_end: int = EditWindow.stream_end(self.stream, self.pattern, stream_start, self.PADDING_FACTOR)
+        shift: int = stream_end - previous_end
+        if shift < 0 or stream_end - stream_start - shift > len(memo) - 1:
+            return None
+        return memo, shift
 
+    def remember(self, stream_start: int, memo: np.array, forward: bool = False) -> None:
+        """The memo is copied out of the workspace it was computed in, into a buffer of this matcher's own."""
         if forward:
-            logger.debug(f"FORWARD : {format_array(reversed(edit_window.stream_intervals))}")
-            logger.debug(f"FORWARD : {format_array(reversed(edit_window.stream_durations))}")
-            logger.debug(f"PATTERN : {format_array(reversed(edit_window.pattern_intervals))}")
-            logger.debug(f"PATTERN : {format_array(reversed(edit_window.pattern_durations))}")
-        else:
-            logger.debug(f"BACKWARD: {format_array(edit_window.stream_intervals)}")
-            logger.debug(f"BACKWARD: {format_array(edit_window.stream_durations)}")
-            logger.debug(f"PATTERN : {format_array(edit_window.pattern_intervals)}")
-            logger.debug(f"PATTERN : {format_array(edit_window.pattern_durations)}")
-
-        directional_edit_distance: AdaptiveEditDistance = AdaptiveEditDistance(
-            edit_window, self._metrics, ScalingFunctions.sqrt
-        )
-        directional_stream_limit, weight = directional_edit_distance.get_limits(pattern_complete=forward)
-        return directional_stream_limit, transformation, weight
+            stream_end: int = EditWindow.stream_end(self.stream, self.pattern, stream_start, self.PADDING_FACTOR)
+            self._forward_memo = (stream_end, self.workspace.keep("forward_memo", memo))
+
+    def window_cutoff(self, forward: bool = False) -> bool:
+        """Forward windows reuse previous memos instead, only pulled back windows are cut off."""
+        return self.cutoff and not forward
+
+    def window_pattern_complete(self, forward: bool = False) -> bool:
+        """Forward windows are always traced back on the complete pattern, pulled back windows when asked to."""
+        return self.pattern_complete or forward
+
+    def count_cells(self, edit_window: EditWindow, skipped_cells: int) -> None:
+        self.total_cells += len(edit_window.stream_intervals) * len(edit_window.pattern_intervals)
+        self.skipped_cells += skipped_cells
+
+    def resolve_limit(self, edit_window: EditWindow, directional_stream_limit: int, forward: bool = False) -> int:
+        if forward:
+            logger.debug(f"--> {len(edit_window.stream_intervals) - directional_stream_limit}")
+            return len(edit_window.stream_intervals) - directional_stream_limit
+        return directional_stream_limit
+
+    def trace(self, stream_start: int, stream_limit: int, weight: float, memo: np.array, forward: bool = False) -> None:
+        if Tracer.enabled:
+            stream_end: int = EditWindow.stream_end(self.stream, self.pattern, stream_start, self.PADDING_FACTOR)
+            Tracer.emit(
+                TraceEvent.WINDOW,
+                self._transformation,
+                self.trace_id,
+                stream_start,
+                stream_end,
+                stream_limit,
+                weight,
+                forward,
+                memo,
+            )
 
     def get_limit(self, stream_start: int, forward: bool = False) -> Tuple[int, float, Transformation]:
-        edit_window: EditWindow = EditWindow.build(
-            self.stream, self.pattern, stream_start, padding_factor=1.6, reverse=forward
+        edit_window: EditWindow = self.build_window(stream_start, forward)
+        directional_edit_distance: AdaptiveEditDistance = self._edit_distance(
+            edit_window,
+            self._metrics,
+            ScalingFunctions.sqrt,
+            self.previous_memo(stream_start, forward),
+            self.window_cutoff(forward),
+            self.workspace,
         )
-
-        logger.debug("")
-        best_stream_limit, best_transformation, best_weight = self._get_transformation_limits(
-            edit_window, self._transformation, forward
+        self.remember(stream_start, directional_edit_distance.memo, forward)
+        self.count_cells(edit_window, directional_edit_distance.skipped_cells)
+        directional_stream_limit, weight = directional_edit_distance.get_limits(
+            pattern_complete=self.window_pattern_complete(forward)
         )
-        if forward:
-            logger.debug(f"--> {len(edit_window.stream_intervals) - best_stream_limit}")
-            return len(edit_window.stream_intervals) - best_stream_limit, best_weight, best_transformation
-        else:
-            return best_stream_limit, best_weight, best_transformation
+        stream_limit: int = self.resolve_limit(edit_window, directional_stream_limit, forward)
+        self.trace(stream_start, stream_limit, weight, directional_edit_distance.memo, forward)
+        return stream_limit, weight, self._transformation
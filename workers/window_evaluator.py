@@ -0,0 +1,104 @@
+from __future__ import annotations
+
+import logging
+import os
+from collections import namedtuple
+from typing import TYPE_CHECKING, Any, Callable, Dict, Generator, List, Optional, Tuple
+
+from tqdm import tqdm
+
+from algorithm.batched_edit_distance import BatchedEditDistance
+from algorithm.model.distance_metrics import ScalingFunctions
+from algorithm.workspace_pool import WorkspacePool
+from model.constants import EditDistanceEngine
+
+if TYPE_CHECKING:
+    from algorithm.model.cost_tables import CostTables
+
+logger = logging.getLogger(os.path.basename(__file__))
+
+WindowRequest = namedtuple("WindowRequest", ("matcher", "stream_start", "forward"))
+Propagation = Generator[WindowRequest, Tuple[int, float], Any]
+
+
+class WindowEvaluator:
+    """
+    Drives window propagation state machines.
+
+    A propagation yields ``WindowRequest``s and is sent back the ``(stream_limit, weight)`` of each window, as
+    returned by ``TransformationMatcher.get_limit``. Propagations are advanced in lockstep: every round, the pending
+    window of each propagation, whatever its voice or transformation, is evaluated in a single stacked DP pass.
+    Windows are ragged (voice tails, padding factor), ``BatchedEditDistance`` pads and masks them.
+    All batches share one workspace, every round reusing the buffers of the previous one, and gather their costs
+    from ``tables`` when given.
+    """
+
+    def __init__(
+        self,
+        metrics: List[Callable],
+        engine: EditDistanceEngine = EditDistanceEngine.NUMPY,
+        tables: Optional[CostTables] = None,
+    ) -> None:
+        self._metrics: List[Callable] = metrics
+        self._engine: EditDistanceEngine = engine
+        self._tables: Optional[CostTables] = tables
+        self.workspace: WorkspacePool = WorkspacePool()
+
+    def evaluate(self, requests: List[WindowRequest]) -> List[Tuple[int, float]]:
+        if self._engine == EditDistanceEngine.PYTHON:
+            return [request.matcher.get_limit(request.stream_start, request.forward)[:2] for request in requests]
+        edit_windows = [request.matcher.build_window(request.stream_start, request.forward) for request in requests]
+        batch: BatchedEditDistance = BatchedEditDistance(
+            edit_windows,
+            self._metrics,
+            ScalingFunctions.sqrt,
+            [request.matcher.previous_memo(request.stream_start, request.forward) for request in requests],
+            [request.matcher.window_cutoff(request.forward) for request in requests],
+            workspace=self.workspace,
+            tables=self._tables,
+        )
+        outcomes: List[Tuple[int, float]] = list()
+        for idx, (request, edit_window) in enumerate(zip(requests, edit_windows)):
+            request.matcher.remember(request.stream_start, batch.memo(idx), request.forward)
+            request.matcher.count_cells(edit_window, batch.skipped_cells[idx])
+            directional_stream_limit, weight = batch.get_limits(
+                idx, pattern_complete=request.matcher.window_pattern_complete(request.forward)
+            )
+            stream_limit: int = request.matcher.resolve_limit(edit_window, directional_stream_limit, request.forward)
+            request.matcher.trace(request.stream_start, stream_limit, weight, batch.memo(idx), request.forward)
+            outcomes.append((stream_limit, weight))
+        return outcomes
+
+    @staticmethod
+    def _advance(propagation: Propagation, outcome: Optional[Tuple[int, float]]) -> Tuple[Optional[WindowRequest], Any]:
+        try:
+            return (next(propagation) if outcome is None else propagation.send(outcome)), None
+        except StopIteration as stop:
+            return None, stop.value
+
+    def run(self, propagations: List[Propagation], progress: bool = False) -> List[Any]:
+        """Returns the return value of each propagation, in order."""
+        results: List[Any] = [None] * len(propagations)
+        progress_bar: Optional[tqdm] = tqdm(total=len(propagations)) if progress else None
+        pending: Dict[int, WindowRequest] = dict()
+        for idx, propagation in enumerate(propagations):
+            request, results[idx] = self._advance(propagation, None)
+            if request is not None:
+                pending[idx] = request
+            elif progress_bar is not None:
+                progress_bar.update()
+        while pending:
+            indices: List[int] = list(pending.keys())
+            outcomes: List[Tuple[int, float]] = self.evaluate([pending[idx] for idx in indices])
+            for idx, outcome in zip(indices, outcomes):
+                request, results[idx] = self._advance(propagations[idx], outcome)
+                if request is None:
+                    del pending[idx]
+                    if progress_bar is not None:
+                        progress_bar.update()
+                else:
+                    pending[idx] = request
+        if progress_bar is not None:
+            progress_bar.close()
+        self.workspace.log_counters()
+        return results